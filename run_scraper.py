@@ -36,11 +36,8 @@ try:
         
         # If no --config argument is provided, inject the correct config path
         if '--config' not in sys.argv and '-c' not in sys.argv:
-            # Find the position to insert config argument
-            # Insert after the URL but before other options
-            insert_pos = 2 if len(sys.argv) > 1 else 1
-            sys.argv.insert(insert_pos, '--config')
-            sys.argv.insert(insert_pos + 1, config_path)
+            # Append so it can never split an option from its value (e.g. --resume SESSION_ID)
+            sys.argv.extend(['--config', config_path])
         
         # Call the actual main function
         runner_main()
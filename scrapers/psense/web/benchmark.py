@@ -0,0 +1,378 @@
+"""
+Repeatable crawl-throughput benchmark against a local synthetic site.
+
+The tests and the sample output crawl httpbin over the network, so timings
+vary with the network and say little about the scraper itself. This module
+serves a generated site from 127.0.0.1 (see SiteSpec: size, link fan-out,
+page weight, near-duplicate pages, injected latency and 429/5xx responses)
+and crawls it with WebScraper once per profile from config.json, merged the
+way run_scraper merges them (base `scraper` section, then the profile, then
+--options). Every crawl runs in a fresh process so peak RSS and CPU time
+belong to that crawl alone; the server stays in the parent.
+
+Per profile it reports pages/s, p50/p99 page fetch latency (including
+retries) and parse time, peak RSS and CPU time per page. Results are written
+as JSON; --compare checks them against an earlier file and exits non-zero
+when a profile regressed beyond --tolerance.
+
+    python -m scrapers.psense.web.benchmark --pages 300 --fanout 6 --latency-ms 20 \\
+        --rate-429 0.02 --rate-5xx 0.01 --output bench.json
+    python -m scrapers.psense.web.benchmark --profiles balanced enterprise \\
+        --options request_delay=0 --compare bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SYLLABLES = ("ta", "re", "gis", "tra", "in", "vo", "com", "pa", "ny", "cus", "tom", "ex", "ci", "se", "fi",
+             "ling", "dead", "pe", "nal", "ty", "au", "dit", "thre", "shold", "zo", "ne", "por", "tal", "gui", "de")
+
+# Files every crawl writes get its own temp dir; optional ones (a cache, a log) only when configured
+PATH_KEYS = ("output_path", "database_path", "frontier_db_path", "image_store_dir")
+OPTIONAL_PATH_KEYS = ("cache_dir", "log_file", "metrics_file")
+
+# Regression checks: (metric, True when higher is better)
+COMPARED = (
+    ("pages_per_sec", True),
+    ("fetch_p99_ms", False),
+    ("parse_p99_ms", False),
+    ("cpu_ms_per_page", False),
+    ("peak_rss_mb", False),
+)
+
+
+@dataclass
+class SiteSpec:
+    """
+    Shape of the synthetic site. Page n links to pages n*fanout+1 ..
+    n*fanout+fanout, so depth d reaches 1 + fanout + ... + fanout**d pages.
+    `duplicate_ratio` of the leaf pages repeat another page's text (simhash
+    near-duplicates). Each request waits latency_ms +/- jitter_ms and fails
+    with 429 or 503 at the given rates.
+    """
+    pages: int = 200
+    fanout: int = 5
+    page_kb: float = 20.0
+    duplicate_ratio: float = 0.1
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after: int = 0
+    seed: int = 0
+
+
+class SyntheticSite:
+    """Serves a SiteSpec site on 127.0.0.1 (HTTP/1.1 keep-alive) until close()"""
+
+    def __init__(self, spec: SiteSpec):
+        self.spec = spec
+        self.pages = self._generate(spec)
+        self.counts: Dict[str, int] = {"requests": 0, "429": 0, "5xx": 0}
+        self._rng = random.Random(spec.seed)
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; with Nagle on, delayed ACKs add ~40 ms to each
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                status, headers, body = site.respond(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, name="benchmark-site", daemon=True).start()
+
+    @staticmethod
+    def path(index: int) -> str:
+        return "/" if index == 0 else f"/p{index}"
+
+    @classmethod
+    def _generate(cls, spec: SiteSpec) -> Dict[str, bytes]:
+        rng = random.Random(spec.seed)
+        # Pages draw from their own slice of a large vocabulary, or simhash would see them all as alike
+        vocabulary = sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(6000)})
+        first_leaf = min(spec.pages, (spec.pages - 2) // max(spec.fanout, 1) + 1)
+        leaves = list(range(max(first_leaf, 1), spec.pages))
+        duplicates = set(rng.sample(leaves, int(len(leaves) * spec.duplicate_ratio)))
+        bodies: Dict[int, str] = {}
+        for index in range(spec.pages):
+            if index not in duplicates:
+                page_rng = random.Random(spec.seed * 1_000_003 + index)
+                bodies[index] = cls._body(page_rng, page_rng.sample(vocabulary, 150), spec.page_kb)
+        # Duplicates copy another leaf: whichever copy is crawled first, no page with links is dropped
+        originals = [index for index in leaves if index not in duplicates] or sorted(bodies)
+        pages = {}
+        for index in range(spec.pages):
+            body = bodies[index] if index in bodies else bodies[rng.choice(originals)]
+            children = range(index * spec.fanout + 1, min(index * spec.fanout + spec.fanout, spec.pages - 1) + 1)
+            links = "".join(f'<li><a href="{cls.path(child)}">Section {child}</a></li>' for child in children)
+            pages[cls.path(index)] = (
+                f"<!DOCTYPE html><html><head><title>Page {index}</title></head><body>"
+                f'<header><nav><a href="/">Home</a></nav></header><main><h1>Page {index}</h1>{body}'
+                f"<ul>{links}</ul></main><footer><p>Footer text</p></footer></body></html>"
+            ).encode("utf-8")
+        pages["/robots.txt"] = b"User-agent: *\nAllow: /\n"
+        return pages
+
+    @staticmethod
+    def _body(rng: random.Random, words: List[str], page_kb: float) -> str:
+        parts, size, section = [], 0, 0
+        while size < page_kb * 1024:
+            section += 1
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(40, 120)))
+            part = f"<h2>Section {section}</h2><p>{text}</p>"
+            if section % 4 == 0:
+                rows = "".join(f"<tr><td>{rng.choice(words)}</td><td>{rng.randint(1, 9999)}</td></tr>"
+                               for _ in range(5))
+                part += f"<table><tr><th>Item</th><th>Amount</th></tr>{rows}</table>"
+            parts.append(part)
+            size += len(part)
+        return "".join(parts)
+
+    def respond(self, path: str):
+        spec = self.spec
+        with self._lock:
+            self.counts["requests"] += 1
+            roll = self._rng.random()
+            delay = max(0.0, spec.latency_ms + self._rng.uniform(-spec.jitter_ms, spec.jitter_ms)) / 1000
+        if delay:
+            time.sleep(delay)
+        body = self.pages.get(path.split("?", 1)[0])
+        if body is None:
+            return 404, {}, b""
+        if path != "/robots.txt":
+            if roll < spec.rate_429:
+                with self._lock:
+                    self.counts["429"] += 1
+                return 429, {"Retry-After": str(spec.retry_after)}, b""
+            if roll < spec.rate_429 + spec.rate_5xx:
+                with self._lock:
+                    self.counts["5xx"] += 1
+                return 503, {"Retry-After": str(spec.retry_after)}, b""
+        content_type = "text/plain" if path == "/robots.txt" else "text/html; charset=utf-8"
+        return 200, {"Content-Type": content_type}, body
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def load_profiles(config_file: str) -> Dict[str, Any]:
+    with open(config_file, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def profile_config(config: Dict[str, Any], profile: str, url: str, workdir: Path,
+                   options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Base scraper section + profile + options, pointed at `url` and writing only under `workdir`"""
+    scraper = dict(config.get("scraper", {}))
+    scraper.update({k: v for k, v in config["profiles"][profile].items() if not k.startswith("_")})
+    scraper.update(options or {})
+    scraper.update({"url": url + "/", "allowed_domains": [], "verbose": False,
+                    "session_id": f"benchmark_{profile}"})
+    for key in PATH_KEYS + tuple(k for k in OPTIONAL_PATH_KEYS if scraper.get(k)):
+        scraper[key] = str(workdir / key)
+    return {"scraper": {k: v for k, v in scraper.items() if not k.startswith("_")}}
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile in milliseconds"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, max(0, int(q * len(ordered) + 0.5) - 1))] * 1000, 3)
+
+
+def _usage():
+    if resource is None:
+        return None, None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return usage.ru_utime + usage.ru_stime, rss_mb
+
+
+def crawl_once(config: Dict[str, Any]) -> Dict[str, Any]:
+    """One crawl in this process (run it in a fresh one); returns its measurements"""
+    import logging
+
+    logging.disable(logging.WARNING)
+    try:
+        from .scraper import WebScraper
+    except ImportError:
+        from scraper import WebScraper
+
+    samples: Dict[str, List[float]] = {"fetch": [], "parse": []}
+    with WebScraper(config) as scraper:
+        observe = scraper.metrics.observe
+
+        def recording(stage, seconds, host=None):
+            if stage in samples:
+                samples[stage].append(seconds)
+            observe(stage, seconds, host)
+
+        scraper.metrics.observe = recording
+        cpu_before, _ = _usage()
+        started = time.perf_counter()
+        scraper.crawl()
+        elapsed = time.perf_counter() - started
+        cpu_after, peak_rss = _usage()
+        failed = len(scraper.failed_urls)
+
+    pages = len(samples["parse"])
+    cpu = cpu_after - cpu_before if cpu_before is not None else None
+    return {
+        "pages": pages,
+        "fetches": len(samples["fetch"]),
+        "failed_urls": failed,
+        "elapsed_seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0.0,
+        "fetch_p50_ms": _percentile(samples["fetch"], 0.5),
+        "fetch_p99_ms": _percentile(samples["fetch"], 0.99),
+        "parse_p50_ms": _percentile(samples["parse"], 0.5),
+        "parse_p99_ms": _percentile(samples["parse"], 0.99),
+        "peak_rss_mb": round(peak_rss, 1) if peak_rss is not None else None,
+        "cpu_seconds": round(cpu, 3) if cpu is not None else None,
+        "cpu_ms_per_page": round(cpu / pages * 1000, 3) if cpu is not None and pages else None,
+    }
+
+
+def run_benchmark(spec: SiteSpec, profiles: Optional[List[str]] = None, config_file: str = "config.json",
+                  options: Optional[Dict[str, Any]] = None, log=print) -> Dict[str, Any]:
+    """Serve the site and crawl it once per profile (all profiles by default)"""
+    config = load_profiles(config_file)
+    profiles = profiles or list(config.get("profiles", {}))
+    site = SyntheticSite(spec)
+    results: Dict[str, Any] = {}
+    context = multiprocessing.get_context("spawn")
+    try:
+        for profile in profiles:
+            with tempfile.TemporaryDirectory(prefix=f"bench_{profile}_") as workdir:
+                crawl_config = profile_config(config, profile, site.base_url, Path(workdir), options)
+                before = dict(site.counts)
+                with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(crawl_once, crawl_config).result()
+                result["server"] = {k: site.counts[k] - before[k] for k in site.counts}
+                results[profile] = result
+                log(f"{profile:>28}: {result['pages']:5d} pages  {result['pages_per_sec']:8.2f} pages/s  "
+                    f"fetch p50/p99 {result['fetch_p50_ms']:.1f}/{result['fetch_p99_ms']:.1f} ms  "
+                    f"cpu/page {result['cpu_ms_per_page']} ms  peak RSS {result['peak_rss_mb']} MB")
+    finally:
+        site.close()
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config_file": config_file,
+        "options": options or {},
+        "site": asdict(spec),
+        "profiles": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.1) -> List[str]:
+    """Regressions of `current` against `baseline` beyond `tolerance` (a fraction), one line each"""
+    regressions = []
+    for profile, result in current.get("profiles", {}).items():
+        before = baseline.get("profiles", {}).get(profile)
+        if not before:
+            continue
+        for metric, higher_is_better in COMPARED:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{profile}: {metric} {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def _parse_options(pairs: List[str]) -> Dict[str, Any]:
+    options = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        try:
+            options[key] = json.loads(value)
+        except ValueError:
+            options[key] = value
+    return options
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark WebScraper profiles against a local synthetic site")
+    parser.add_argument("--config", "-c", default="config.json", help="Configuration file with the profiles")
+    parser.add_argument("--profiles", nargs="*", help="Profiles to run (default: all)")
+    parser.add_argument("--options", "-o", nargs="*", default=[], help="Overrides for every profile (KEY=VALUE)")
+    parser.add_argument("--pages", type=int, default=SiteSpec.pages)
+    parser.add_argument("--fanout", type=int, default=SiteSpec.fanout)
+    parser.add_argument("--page-kb", type=float, default=SiteSpec.page_kb)
+    parser.add_argument("--duplicate-ratio", type=float, default=SiteSpec.duplicate_ratio)
+    parser.add_argument("--latency-ms", type=float, default=SiteSpec.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=SiteSpec.jitter_ms)
+    parser.add_argument("--rate-429", type=float, default=SiteSpec.rate_429)
+    parser.add_argument("--rate-5xx", type=float, default=SiteSpec.rate_5xx)
+    parser.add_argument("--seed", type=int, default=SiteSpec.seed)
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results")
+    parser.add_argument("--compare", metavar="BASELINE", help="Earlier results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative change (default 0.1)")
+    args = parser.parse_args(argv)
+
+    spec = SiteSpec(pages=args.pages, fanout=args.fanout, page_kb=args.page_kb,
+                    duplicate_ratio=args.duplicate_ratio, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                    rate_429=args.rate_429, rate_5xx=args.rate_5xx, seed=args.seed)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    results = run_benchmark(spec, args.profiles, args.config, _parse_options(args.options))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        if baseline.get("site") != results["site"] or baseline.get("options") != results["options"]:
+            print("Note: the baseline used a different site or options; the comparison may not be meaningful")
+        regressions = compare(baseline, results, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
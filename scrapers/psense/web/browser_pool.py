@@ -0,0 +1,197 @@
+"""
+Pooled Playwright renderer for dynamic pages.
+
+Launching Chromium costs seconds, so instead of one browser per URL a single
+browser is kept alive for the whole crawl with `size` browser contexts that
+are handed out to render requests. A context is closed and replaced after
+`pages_per_context` pages, which bounds the memory a long-lived context
+accumulates.
+
+AsyncBrowserPool serves the asyncio crawl path directly. BrowserPool wraps it
+for synchronous callers: Playwright objects are bound to the loop that created
+them, so the pool lives on its own event-loop thread and worker threads submit
+render requests to it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    async_playwright = None
+    PLAYWRIGHT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class _ContextSlot:
+    __slots__ = ("context", "pages")
+
+    def __init__(self):
+        self.context = None
+        self.pages = 0
+
+
+class AsyncBrowserPool:
+    """
+    `size` reusable browser contexts on one browser. render() waits for a free
+    context, so at most `size` pages render at once. Pass an already launched
+    `browser` to manage the browser lifecycle yourself.
+    """
+
+    def __init__(self, size: int = 4, pages_per_context: int = 50, headless: bool = True,
+                 browser_type: str = "chromium", launch_options: Optional[Dict[str, Any]] = None,
+                 browser=None):
+        self.size = max(1, size)
+        self.pages_per_context = max(1, pages_per_context)
+        self.headless = headless
+        self.browser_type = browser_type
+        self.launch_options = launch_options or {}
+        self._browser = browser
+        self._owns_browser = browser is None
+        self._playwright = None
+        self._slots: Optional[asyncio.Queue] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self.pages_rendered = 0
+        self.contexts_created = 0
+        self.render_failures = 0
+
+    async def start(self):
+        if self._slots is not None:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._slots is not None:
+                return
+            if self._browser is None:
+                if not PLAYWRIGHT_AVAILABLE:
+                    raise RuntimeError("playwright is not installed")
+                self._playwright = await async_playwright().start()
+                launcher = getattr(self._playwright, self.browser_type)
+                self._browser = await launcher.launch(headless=self.headless, **self.launch_options)
+            slots = asyncio.Queue()
+            for _ in range(self.size):
+                slots.put_nowait(_ContextSlot())
+            self._slots = slots
+
+    async def _context_for(self, slot: _ContextSlot):
+        if slot.context is not None and slot.pages >= self.pages_per_context:
+            await self._discard_context(slot)
+        if slot.context is None:
+            slot.context = await self._browser.new_context()
+            slot.pages = 0
+            self.contexts_created += 1
+        return slot.context
+
+    @staticmethod
+    async def _discard_context(slot: _ContextSlot):
+        context, slot.context = slot.context, None
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Closing browser context failed: {e}")
+
+    async def render(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> str:
+        """Navigate to `url` in a pooled context and return the rendered HTML"""
+        await self.start()
+        slot = await self._slots.get()
+        try:
+            context = await self._context_for(slot)
+            page = await context.new_page()
+            try:
+                if headers:
+                    await page.set_extra_http_headers(headers)
+                await page.goto(url, timeout=int(timeout * 1000))
+                content = await page.content()
+            finally:
+                await page.close()
+            slot.pages += 1
+            self.pages_rendered += 1
+            return content
+        except Exception:
+            # A context that failed mid-render may be wedged; start the next request on a fresh one
+            self.render_failures += 1
+            if slot.context is not None:
+                await self._discard_context(slot)
+            raise
+        finally:
+            self._slots.put_nowait(slot)
+
+    async def close(self):
+        if self._slots is not None:
+            while not self._slots.empty():
+                slot = self._slots.get_nowait()
+                if slot.context is not None:
+                    await self._discard_context(slot)
+            self._slots = None
+        if self._owns_browser and self._browser is not None:
+            try:
+                await self._browser.close()
+            finally:
+                self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "pages_rendered": self.pages_rendered,
+            "contexts_created": self.contexts_created,
+            "render_failures": self.render_failures,
+        }
+
+
+class BrowserPool:
+    """
+    Thread-safe synchronous facade over AsyncBrowserPool. The event loop
+    thread starts on the first render() and stops in close().
+    """
+
+    def __init__(self, size: int = 4, pages_per_context: int = 50, headless: bool = True,
+                 browser_type: str = "chromium", launch_options: Optional[Dict[str, Any]] = None):
+        self._pool_args = dict(size=size, pages_per_context=pages_per_context, headless=headless,
+                               browser_type=browser_type, launch_options=launch_options)
+        self._pool: Optional[AsyncBrowserPool] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="BrowserPool", daemon=True)
+                thread.start()
+                self._pool = AsyncBrowserPool(**self._pool_args)
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def render(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> str:
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._pool.render(url, headers, timeout), loop)
+        return future.result()
+
+    def close(self):
+        with self._lock:
+            loop, thread, pool = self._loop, self._thread, self._pool
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(pool.close(), loop).result(timeout=30)
+        except Exception as e:
+            logger.debug(f"Browser pool shutdown failed: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=30)
+        loop.close()
+
+    def stats(self) -> Dict[str, int]:
+        return self._pool.stats() if self._pool is not None else {}
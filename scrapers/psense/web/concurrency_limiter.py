@@ -0,0 +1,198 @@
+"""
+Adaptive (AIMD) per-host concurrency limits.
+
+per_domain_max caps every host at the same fixed number of in-flight
+requests, so the profiles guess a value per site. With AdaptiveConcurrencyLimiter
+each host starts at `initial` and finds its own limit between `min_limit`
+and `max_limit`:
+
+- additive increase: every healthy response adds 1/limit, so the limit grows
+  by about one per round of `limit` requests, once a full window of
+  `latency_window` latencies has been measured;
+- multiplicative decrease: a throttling/overload signal (429/503, a timeout)
+  or a p95 fetch latency more than `latency_tolerance` times the host's best
+  p95 multiplies it by `decrease`.
+
+Only requests started after the last cut can cut again, so one burst of
+failures from the old limit counts once. When latency stays high at the
+minimum limit the host is simply slower now and that p95 becomes its baseline.
+
+Threads wait for a slot on a Condition; asyncio tasks await a future on their
+own loop, so one limiter serves safe_get threads and the frontier's workers
+alike.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Deque, Dict, List, Optional
+from urllib.parse import urlparse
+
+# Responses that mean "slow down" rather than "this page is bad"
+OVERLOAD_STATUSES = frozenset([429, 503])
+
+
+class _HostLimit:
+    def __init__(self, initial: float, latency_window: int):
+        self.limit = initial
+        self.in_flight = 0
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        self.baseline_p95: Optional[float] = None
+        self.last_decrease = float("-inf")
+        self.increases = 0
+        self.decreases = 0
+        self.waiters: List[tuple] = []  # (loop, future) of waiting asyncio tasks
+
+
+class AdaptiveConcurrencyLimiter:
+    """Per-host AIMD concurrency limit; slot()/slot_async() hold one in-flight request"""
+
+    def __init__(self, initial: int = 2, max_limit: int = 8, min_limit: int = 1, decrease: float = 0.5,
+                 latency_window: int = 20, latency_tolerance: float = 2.0):
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.initial = float(min(max(initial, self.min_limit), self.max_limit))
+        self.decrease = decrease
+        self.latency_window = latency_window
+        self.latency_tolerance = latency_tolerance
+        self._hosts: Dict[str, _HostLimit] = {}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _host(self, host: str) -> _HostLimit:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts.setdefault(host, _HostLimit(self.initial, self.latency_window))
+        return state
+
+    def limit(self, url: str) -> int:
+        """Current in-flight limit of `url`'s host"""
+        with self._lock:
+            return int(self._host(self.host_of(url)).limit)
+
+    # -------------------- slots --------------------
+    def acquire(self, url: str):
+        """Blocking: wait until `url`'s host is under its limit and take a slot"""
+        with self._cond:
+            state = self._host(self.host_of(url))
+            while state.in_flight >= int(state.limit):
+                self._cond.wait()
+            state.in_flight += 1
+
+    async def acquire_async(self, url: str):
+        """acquire() for the event loop: other tasks run while this one waits"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                state = self._host(self.host_of(url))
+                if state.in_flight < int(state.limit):
+                    state.in_flight += 1
+                    return
+                waiter = (loop, loop.create_future())
+                state.waiters.append(waiter)
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in state.waiters:
+                        state.waiters.remove(waiter)
+                    elif state.in_flight < int(state.limit):
+                        self._wake(state)  # we were woken for a slot we won't take
+                raise
+
+    def release(self, url: str):
+        with self._lock:
+            state = self._host(self.host_of(url))
+            state.in_flight -= 1
+            self._wake(state)
+
+    @contextmanager
+    def slot(self, url: str):
+        self.acquire(url)
+        try:
+            yield
+        finally:
+            self.release(url)
+
+    @asynccontextmanager
+    async def slot_async(self, url: str):
+        await self.acquire_async(url)
+        try:
+            yield
+        finally:
+            self.release(url)
+
+    def _wake(self, state: _HostLimit):
+        """Let waiters re-check their host's limit (lock held)"""
+        self._cond.notify_all()
+        waiters, state.waiters = state.waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    # -------------------- feedback --------------------
+    def record_success(self, url: str, latency: float, started: float):
+        """
+        A response from `url`'s host (a request begun at `started`, time.monotonic)
+        that took `latency` seconds: grows the limit unless latency is rising.
+        """
+        with self._lock:
+            state = self._host(self.host_of(url))
+            state.latencies.append(latency)
+            if len(state.latencies) < state.latencies.maxlen:
+                return  # no growth until a full window (since the start or the last cut) was measured
+            ordered = sorted(state.latencies)
+            p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+            if state.baseline_p95 is None or p95 < state.baseline_p95:
+                state.baseline_p95 = p95
+            elif p95 > state.baseline_p95 * self.latency_tolerance:
+                if state.limit <= self.min_limit:
+                    state.baseline_p95 = p95
+                else:
+                    self._decrease(state, started)
+                return
+            if state.limit < self.max_limit:
+                before = int(state.limit)
+                state.limit = min(self.max_limit, state.limit + 1.0 / state.limit)
+                if int(state.limit) > before:
+                    state.increases += 1
+                    self._wake(state)
+
+    def record_overload(self, url: str, started: float):
+        """`url`'s host throttled or timed out a request begun at `started`: cut its limit"""
+        with self._lock:
+            self._decrease(self._host(self.host_of(url)), started)
+
+    def _decrease(self, state: _HostLimit, started: float):
+        if started < state.last_decrease:
+            return  # sent under the old limit; that limit was already cut
+        state.limit = max(float(self.min_limit), state.limit * self.decrease)
+        state.last_decrease = time.monotonic()
+        state.latencies.clear()
+        state.decreases += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Limit, in-flight requests and adjustment counts per host"""
+        with self._lock:
+            return {
+                host: {
+                    "limit": int(state.limit),
+                    "in_flight": state.in_flight,
+                    "p95_baseline_ms": round(state.baseline_p95 * 1000, 1) if state.baseline_p95 else None,
+                    "increases": state.increases,
+                    "decreases": state.decreases,
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
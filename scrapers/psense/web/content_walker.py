@@ -0,0 +1,273 @@
+"""
+Single-pass content walk for document extraction.
+
+_parse_to_document used to `find_all` the content tags, then for every match
+call `get_text` on its subtree (once for the noise check and again for the
+element itself), `find_parent` up to the root for the header/footer check, and
+`find_all("li")` under each list. Nested lists, links and paragraphs were
+re-read once per enclosing match: O(nodes x depth x text).
+
+walk_content makes one depth-first walk. Every visible string is stripped
+once and appended to a shared list; each content block records where its text
+starts and joins its slice when the walk leaves it, which reproduces
+`get_text(strip=True)`. Blocks come out in document order (the order
+`find_all` matched them). Header/footer subtrees and subtrees of blocks whose
+id/class marks them as noise emit nothing; they are only walked for the text
+of an enclosing block, and skipped outright when there is none.
+
+walk_content_lxml does the same walk over an `lxml.html` tree (text and tail
+strings instead of string nodes) and yields the same blocks, holding lxml
+elements; the tag_* helpers read either kind of element.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from bs4 import CData, NavigableString, Tag
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    etree = lxml_html = None
+    LXML_AVAILABLE = False
+
+CONTENT_TAGS = frozenset(["h1", "h2", "h3", "p", "ul", "ol", "table", "img", "a"])
+LIST_TAGS = frozenset(["ul", "ol"])
+PRUNED_TAGS = frozenset(["header", "footer"])
+# get_text() only returns these; comments, scripts, styles and templates are other string types
+TEXT_TYPES = (NavigableString, CData)
+# Tags whose strings BeautifulSoup gives one of those other types (lxml trees have no string types)
+NON_TEXT_TAGS = frozenset(["script", "style", "template", "rt", "rp"])
+# Blocks with less text than this are noise (images are judged by id/class only)
+MIN_TEXT_LENGTH = 3
+
+
+@dataclass
+class ContentBlock:
+    """A content tag, its stripped text and, for ul/ol, the text of every li below it"""
+    tag: Any
+    text: str = ""
+    items: Optional[List[str]] = None
+    start: int = field(default=0, repr=False)
+
+
+class _ContentWalk:
+    """Block bookkeeping shared by the BeautifulSoup and lxml walks"""
+
+    def __init__(self, is_noisy: Callable[[Any], bool]):
+        self.is_noisy = is_noisy
+        self.blocks: List[ContentBlock] = []
+        self.pieces: List[str] = []
+        self.open_blocks: List[ContentBlock] = []
+        # (item list, index) slots for each open li, one per enclosing ul/ol
+        self.open_lists: List[List[str]] = []
+        self.open_items: List[tuple] = []
+        self.muted = 0
+
+    @property
+    def collecting(self) -> bool:
+        """Whether strings are part of some open block's text"""
+        return bool(self.open_blocks or self.open_items)
+
+    def enter(self, node, name: str):
+        """
+        Start a tag. Returns what leave() must undo, or False when the subtree
+        can be skipped (nothing inside is emitted or needed for a text).
+        """
+        block = item = None
+        mutes = False
+        if name in PRUNED_TAGS:
+            mutes = True
+        elif name in CONTENT_TAGS and not self.muted:
+            if self.is_noisy(node):
+                mutes = True
+            else:
+                block = ContentBlock(node, start=len(self.pieces))
+                self.blocks.append(block)
+                if name in LIST_TAGS:
+                    block.items = []
+        if name == "li" and self.open_lists:
+            slots = []
+            for items in self.open_lists:
+                slots.append((items, len(items)))
+                items.append("")
+            item = (len(self.pieces), slots)
+
+        if mutes and not self.collecting:
+            return False
+        if block is not None:
+            self.open_blocks.append(block)
+            if block.items is not None:
+                self.open_lists.append(block.items)
+        if item is not None:
+            self.open_items.append(item)
+        if mutes:
+            self.muted += 1
+        return block, item, mutes
+
+    def leave(self, record):
+        block, item, mutes = record
+        pieces = self.pieces
+        if block is not None:
+            self.open_blocks.pop()
+            if block.items is not None:
+                self.open_lists.pop()
+            block.text = "".join(pieces[block.start:])
+        if item is not None:
+            self.open_items.pop()
+            text = "".join(pieces[item[0]:])
+            for items, index in item[1]:
+                items[index] = text
+        if mutes:
+            self.muted -= 1
+        if not self.open_blocks and not self.open_items:
+            pieces.clear()
+
+    def result(self) -> List[ContentBlock]:
+        return [b for b in self.blocks if tag_name(b.tag) == "img" or len(b.text) >= MIN_TEXT_LENGTH]
+
+
+def walk_content(root, is_noisy: Callable[[Any], bool]) -> List[ContentBlock]:
+    """
+    Content blocks under a BeautifulSoup `root` in document order.
+    `is_noisy(tag)` judges a content tag by its attributes; noisy ones are
+    dropped with their subtree.
+    """
+    walk = _ContentWalk(is_noisy)
+    pieces = walk.pieces
+    # Each frame: children iterator and what to undo when the walk leaves the tag
+    stack = [(iter(root.contents), None)]
+    while stack:
+        node = next(stack[-1][0], None)
+        if node is None:
+            _, record = stack.pop()
+            if record is not None:
+                walk.leave(record)
+            continue
+        if type(node) in TEXT_TYPES:
+            if walk.open_blocks or walk.open_items:
+                text = node.strip()
+                if text:
+                    pieces.append(text)
+            continue
+        if not isinstance(node, Tag):
+            continue
+        record = walk.enter(node, node.name)
+        if record is False:
+            continue
+        if node.contents:
+            stack.append((iter(node.contents), record))
+        else:
+            walk.leave(record)
+    return walk.result()
+
+
+def walk_content_lxml(root, is_noisy: Callable[[Any], bool]) -> List[ContentBlock]:
+    """walk_content over an lxml.html element tree"""
+    walk = _ContentWalk(is_noisy)
+    pieces = walk.pieces
+    records = []
+    hidden = 0  # depth inside NON_TEXT_TAGS
+    walker = etree.iterwalk(root, events=("start", "end", "comment", "pi"))
+    for event, el in walker:
+        if event == "start":
+            name = el.tag
+            record = walk.enter(el, name)
+            if record is False:
+                walker.skip_subtree()
+            hides = name in NON_TEXT_TAGS
+            if hides:
+                hidden += 1
+            records.append((record, hides))
+            text = el.text
+        else:
+            if event == "end":
+                record, hides = records.pop()
+                if record:
+                    walk.leave(record)
+                if hides:
+                    hidden -= 1
+            # Comments and processing instructions only contribute their tail
+            text = el.tail
+        if text and not hidden and (walk.open_blocks or walk.open_items):
+            text = text.strip()
+            if text:
+                pieces.append(text)
+    return walk.result()
+
+
+def parse_lxml(html: str):
+    """lxml.html document tree for `html`, or None for an empty document"""
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        # str input with an XML encoding declaration; parse the encoded bytes instead
+        try:
+            return lxml_html.document_fromstring(html.encode("utf-8"),
+                                                 parser=lxml_html.HTMLParser(encoding="utf-8"))
+        except etree.ParserError:
+            return None
+    except etree.ParserError:
+        return None
+
+
+def iter_text_lxml(root):
+    """Visible strings of an lxml tree in document order (unstripped), like BeautifulSoup's"""
+    # Inside e.g. a <template>, BeautifulSoup would have typed every string as a template string
+    hidden = int(any(a.tag in NON_TEXT_TAGS for a in root.iterancestors()))
+    hiding = []
+    for event, el in etree.iterwalk(root, events=("start", "end", "comment", "pi")):
+        if event == "start":
+            hides = el.tag in NON_TEXT_TAGS
+            hiding.append(hides)
+            if hides:
+                hidden += 1
+            text = el.text
+        else:
+            if event == "end":
+                if hiding.pop():
+                    hidden -= 1
+                if el is root:
+                    break  # its tail is outside it
+            text = el.tail
+        if text and not hidden:
+            yield text
+
+
+def is_lxml_element(tag) -> bool:
+    return LXML_AVAILABLE and isinstance(tag, etree.ElementBase)
+
+
+def tag_name(tag) -> str:
+    return tag.tag if is_lxml_element(tag) else tag.name
+
+
+def tag_classes(tag) -> List[str]:
+    cls = tag.get("class")
+    if not cls:
+        return []
+    return cls.split() if isinstance(cls, str) else list(cls)
+
+
+def tag_text(tag) -> str:
+    """get_text(strip=True) for either kind of element"""
+    if is_lxml_element(tag):
+        return "".join(s.strip() for s in iter_text_lxml(tag))
+    return tag.get_text(strip=True)
+
+
+def tag_html(tag) -> str:
+    if is_lxml_element(tag):
+        return lxml_html.tostring(tag, encoding="unicode", with_tail=False)
+    return str(tag)
+
+
+def find_all_tags(tag, *names: str) -> List[Any]:
+    """Descendants of `tag` named any of `names`, in document order (like find_all)"""
+    if is_lxml_element(tag):
+        return [el for el in tag.iterdescendants(*names)]
+    return tag.find_all(list(names))
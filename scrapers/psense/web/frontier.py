@@ -0,0 +1,533 @@
+"""
+URL frontier for the frontier-based crawl engine.
+
+The frontier is an explicit priority queue of URLs to fetch. Each entry carries
+its own depth and parent, so the crawl no longer depends on the call stack and
+a worker never waits for a subtree to finish. PersistentFrontier journals the
+same state to SQLite so an interrupted crawl can be resumed, and
+SharedFrontier lets several crawl processes drain one journal, each owning a
+shard of the hosts.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    from .simhash_index import SIMHASH_SCHEMA, SimhashIndex
+except ImportError:
+    from simhash_index import SIMHASH_SCHEMA, SimhashIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FrontierEntry:
+    """A single URL scheduled for crawling"""
+    url: str
+    depth: int = 0
+    priority: float = 0.0
+    parent_key: Optional[str] = None
+    key: str = ""
+    lastmod: Optional[str] = None  # sitemap <lastmod>, when the URL came from a sitemap
+
+    def __post_init__(self):
+        if not self.key:
+            self.key = self.url
+
+
+class CrawlFrontier:
+    """
+    Thread-safe in-memory URL frontier.
+
+    Entries are served highest priority first, then shallowest depth, then in
+    insertion order (so equal-priority crawls are breadth-first). A URL key is
+    only ever accepted once; it then moves queued -> in-flight -> done. An
+    in-flight entry whose host is throttled can be deferred: it counts as
+    queued again but is not served until its ready time.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, int, FrontierEntry]] = []
+        self._seq = itertools.count()
+        self._seen: Set[str] = set()
+        self._in_flight: Dict[str, FrontierEntry] = {}
+        self._deferred: List[Tuple[float, int, FrontierEntry]] = []
+        self._done_count = 0
+        self._failed_count = 0
+        self._producers = 0
+        self._lock = threading.Lock()
+
+    def push(self, url: str, depth: int = 0, priority: float = 0.0,
+             parent_key: Optional[str] = None, key: Optional[str] = None) -> bool:
+        """Queue a URL. Returns False if the key was already seen."""
+        entry = FrontierEntry(url=url, depth=depth, priority=priority,
+                              parent_key=parent_key, key=key or url)
+        return self.push_many([entry]) == 1
+
+    def push_many(self, entries: List[FrontierEntry]) -> int:
+        """Queue several entries at once. Returns how many were new."""
+        added = 0
+        with self._lock:
+            for entry in entries:
+                if entry.key in self._seen:
+                    continue
+                self._seen.add(entry.key)
+                heapq.heappush(self._heap, (-entry.priority, entry.depth, next(self._seq), entry))
+                self._on_push(entry)
+                added += 1
+            if added:
+                self._commit()
+        return added
+
+    def pop(self) -> Optional[FrontierEntry]:
+        """Take the next entry and mark it in-flight, or None if nothing is queued."""
+        with self._lock:
+            self._release_deferred()
+            if not self._heap:
+                return None
+            entry = heapq.heappop(self._heap)[-1]
+            self._in_flight[entry.key] = entry
+            self._on_pop(entry)
+            self._commit()
+            return entry
+
+    def mark_done(self, entry: FrontierEntry, failed: bool = False):
+        """Release an in-flight entry once it has been processed."""
+        with self._lock:
+            self._in_flight.pop(entry.key, None)
+            if failed:
+                self._failed_count += 1
+            else:
+                self._done_count += 1
+            self._on_done(entry, failed)
+            self._commit()
+
+    def defer(self, entry: FrontierEntry, delay: float):
+        """Hand an in-flight entry back, to be served again after `delay` seconds"""
+        with self._lock:
+            self._in_flight.pop(entry.key, None)
+            heapq.heappush(self._deferred, (time.monotonic() + delay, next(self._seq), entry))
+            self._on_defer(entry)
+            self._commit()
+
+    def _release_deferred(self):
+        now = time.monotonic()
+        while self._deferred and self._deferred[0][0] <= now:
+            entry = heapq.heappop(self._deferred)[-1]
+            heapq.heappush(self._heap, (-entry.priority, entry.depth, next(self._seq), entry))
+
+    def next_ready_in(self) -> Optional[float]:
+        """Seconds until the earliest deferred entry is due, or None if none are deferred"""
+        with self._lock:
+            if not self._deferred:
+                return None
+            return max(0.0, self._deferred[0][0] - time.monotonic())
+
+    @contextmanager
+    def producing(self, name: str):
+        """Keep the frontier from counting as exhausted while an outside producer (e.g. sitemap seeding) runs"""
+        with self._lock:
+            self._producers += 1
+            self._on_producer(name, True)
+            self._commit()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._producers -= 1
+                self._on_producer(name, False)
+                self._commit()
+
+    # Hooks for subclasses, called with the lock held
+    def _on_push(self, entry: FrontierEntry):
+        pass
+
+    def _on_pop(self, entry: FrontierEntry):
+        pass
+
+    def _on_done(self, entry: FrontierEntry, failed: bool):
+        pass
+
+    def _on_defer(self, entry: FrontierEntry):
+        pass
+
+    def _on_producer(self, name: str, active: bool):
+        pass
+
+    def _commit(self):
+        pass
+
+    def is_seen(self, key: str) -> bool:
+        with self._lock:
+            return key in self._seen
+
+    @property
+    def queued_count(self) -> int:
+        with self._lock:
+            return len(self._heap) + len(self._deferred)
+
+    @property
+    def in_flight_count(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def is_exhausted(self) -> bool:
+        """True when nothing is queued, deferred or in flight (and no producer is running)"""
+        with self._lock:
+            return not self._heap and not self._deferred and not self._in_flight and not self._producers
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "queued": len(self._heap) + len(self._deferred),
+                "deferred": len(self._deferred),
+                "in_flight": len(self._in_flight),
+                "done": self._done_count,
+                "failed": self._failed_count,
+                "seen": len(self._seen),
+            }
+
+
+FRONTIER_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS crawl_frontier (
+        session_id TEXT,
+        url_key TEXT,
+        url TEXT,
+        depth INTEGER,
+        priority REAL,
+        parent_key TEXT,
+        state TEXT,
+        updated_at TIMESTAMP,
+        lastmod TEXT,
+        shard INTEGER,
+        PRIMARY KEY (session_id, url_key)
+    );
+
+    CREATE TABLE IF NOT EXISTS crawl_checkpoints (
+        session_id TEXT PRIMARY KEY,
+        checkpoint_time TIMESTAMP,
+        config TEXT,
+        stats TEXT
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_frontier_state ON crawl_frontier(session_id, state);
+"""
+
+# Created after the column migration in PersistentFrontier.__init__
+FRONTIER_SHARD_INDEX = "CREATE INDEX IF NOT EXISTS idx_frontier_shard ON crawl_frontier(session_id, shard, state)"
+
+# Frontier row states
+QUEUED, IN_FLIGHT, DONE, FAILED = "queued", "in_flight", "done", "failed"
+
+
+class PersistentFrontier(CrawlFrontier):
+    """
+    CrawlFrontier journaled to SQLite so an interrupted crawl can resume.
+
+    Every push/pop/done is written to the crawl_frontier table and committed
+    straight away (WAL mode keeps that cheap, and no write transaction is left
+    open to block the DatabaseManager on the same file). Dedup state
+    (simhashes) is checkpointed every `checkpoint_interval` seconds through
+    `state_provider`, a callable returning {"simhashes": [...new hashes...]}.
+    """
+
+    def __init__(self, db_path: str, session_id: str, checkpoint_interval: float = 60.0,
+                 config: Optional[dict] = None, state_provider: Optional[Callable[[], dict]] = None):
+        super().__init__()
+        self.db_path = db_path
+        self.session_id = session_id
+        self.checkpoint_interval = checkpoint_interval
+        self.state_provider = state_provider
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(FRONTIER_SCHEMA)
+        self._conn.executescript(SIMHASH_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(crawl_frontier)")}
+        # Journals created before sitemap lastmod / host shards were tracked
+        if "lastmod" not in columns:
+            self._conn.execute("ALTER TABLE crawl_frontier ADD COLUMN lastmod TEXT")
+        if "shard" not in columns:
+            self._conn.execute("ALTER TABLE crawl_frontier ADD COLUMN shard INTEGER")
+        self._conn.execute(FRONTIER_SHARD_INDEX)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO crawl_checkpoints (session_id, checkpoint_time, config) VALUES (?, ?, ?)",
+            (session_id, datetime.now(), json.dumps(config or {}, default=str))
+        )
+        self._conn.commit()
+        self._last_checkpoint = time.time()
+
+    # -------------------- Journal (called with the lock held) --------------------
+    def _write(self, sql: str, params: tuple):
+        self._conn.execute(sql, params)
+
+    def _commit(self):
+        self._conn.commit()
+
+    def _on_push(self, entry: FrontierEntry):
+        self._write(
+            """INSERT OR IGNORE INTO crawl_frontier
+               (session_id, url_key, url, depth, priority, parent_key, state, updated_at, lastmod)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (self.session_id, entry.key, entry.url, entry.depth, entry.priority,
+             entry.parent_key, QUEUED, datetime.now(), entry.lastmod)
+        )
+
+    def _on_pop(self, entry: FrontierEntry):
+        self._set_state(entry.key, IN_FLIGHT)
+
+    def _on_done(self, entry: FrontierEntry, failed: bool):
+        self._set_state(entry.key, FAILED if failed else DONE)
+
+    def _on_defer(self, entry: FrontierEntry):
+        self._set_state(entry.key, QUEUED)
+
+    def mark_done(self, entry: FrontierEntry, failed: bool = False):
+        super().mark_done(entry, failed)
+        self.maybe_checkpoint()
+
+    def _set_state(self, key: str, state: str):
+        self._write(
+            "UPDATE crawl_frontier SET state = ?, updated_at = ? WHERE session_id = ? AND url_key = ?",
+            (state, datetime.now(), self.session_id, key)
+        )
+
+    # -------------------- Checkpoints --------------------
+    def maybe_checkpoint(self):
+        if time.time() - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Persist dedup state and commit everything journaled so far"""
+        state = self.state_provider() if self.state_provider else {}
+        with self._lock:
+            hashes = state.get("simhashes") or []
+            if hashes:
+                SimhashIndex.save_hashes(self._conn, self.session_id, hashes)
+            stats = {
+                "queued": len(self._heap) + len(self._deferred),
+                "in_flight": len(self._in_flight),
+                "done": self._done_count,
+                "failed": self._failed_count,
+            }
+            self._conn.execute(
+                "UPDATE crawl_checkpoints SET checkpoint_time = ?, stats = ? WHERE session_id = ?",
+                (datetime.now(), json.dumps(stats), self.session_id)
+            )
+            self._conn.commit()
+            self._last_checkpoint = time.time()
+        logger.debug("Frontier checkpoint for %s: %s", self.session_id, stats)
+
+    def resume(self) -> Dict[str, Any]:
+        """
+        Reload a session: fetched URLs are marked seen (never refetched) and
+        queued, interrupted in-flight and failed URLs are queued again.
+        Returns {"done_keys": [...], "simhashes": [...]}.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url_key, url, depth, priority, parent_key, state, lastmod FROM crawl_frontier "
+                "WHERE session_id = ?",
+                (self.session_id,)
+            ).fetchall()
+            done_keys = []
+            requeued = 0
+            for key, url, depth, priority, parent_key, state, lastmod in rows:
+                if key in self._seen:
+                    continue
+                self._seen.add(key)
+                if state == DONE:
+                    done_keys.append(key)
+                    self._done_count += 1
+                    continue
+                entry = FrontierEntry(url=url, depth=depth, priority=priority or 0.0,
+                                      parent_key=parent_key, key=key, lastmod=lastmod)
+                heapq.heappush(self._heap, (-entry.priority, depth, next(self._seq), entry))
+                requeued += 1
+            if requeued:
+                self._conn.execute(
+                    "UPDATE crawl_frontier SET state = ? WHERE session_id = ? AND state IN (?, ?)",
+                    (QUEUED, self.session_id, IN_FLIGHT, FAILED)
+                )
+                self._conn.commit()
+            simhashes = SimhashIndex.load_hashes(self._conn, self.session_id)
+        logger.info("Resumed session %s: %d done, %d queued, %d simhashes",
+                    self.session_id, len(done_keys), requeued, len(simhashes))
+        return {"done_keys": done_keys, "simhashes": simhashes}
+
+    def close(self):
+        """Final checkpoint and close the journal connection"""
+        try:
+            self.checkpoint()
+        finally:
+            with self._lock:
+                self._conn.close()
+
+    @staticmethod
+    def load_session_config(db_path: str, session_id: str) -> Optional[dict]:
+        """Config a session was started with, used by `run_scraper.py --resume`"""
+        try:
+            with sqlite3.connect(db_path) as conn:
+                row = conn.execute(
+                    "SELECT config FROM crawl_checkpoints WHERE session_id = ?", (session_id,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]) if row and row[0] else None
+
+
+class SharedFrontier(PersistentFrontier):
+    """
+    One shard of a frontier shared by several crawl processes.
+
+    All processes journal to the same crawl_frontier table, which is the
+    shared dedup store: a URL key is accepted by whichever process inserts
+    it first. Every row is tagged with the shard that owns its host
+    (`shard_of(url)`), and this process only serves rows of `shard_index`:
+    its own pushes go straight onto the local heap, rows pushed by other
+    processes are pulled in batches of `refill_size` when the local heap runs
+    dry. The crawl is exhausted once no row of the session is queued or in
+    flight in any shard, checked at most every `poll_interval` seconds.
+    """
+
+    def __init__(self, db_path: str, session_id: str, shard_of: Callable[[str], int], shard_index: int,
+                 poll_interval: float = 0.2, refill_size: int = 500, **kwargs):
+        super().__init__(db_path, session_id, **kwargs)
+        self.shard_of = shard_of
+        self.shard_index = shard_index
+        self.poll_interval = poll_interval
+        self.refill_size = refill_size
+        # Keys of this shard held locally (heap, deferred or in flight)
+        self._local_keys: Set[str] = set()
+        self._last_refill = 0.0
+        self._last_active_check = 0.0
+        self._active_elsewhere = True
+
+    def push_many(self, entries: List[FrontierEntry]) -> int:
+        added = 0
+        with self._lock:
+            try:
+                added = self._insert_entries(entries)
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+            # Always: even an all-ignored batch opened a write transaction that would lock out the other shards
+            self._commit()
+        return added
+
+    def _insert_entries(self, entries: List[FrontierEntry]) -> int:
+        """INSERT OR IGNORE each entry (lock held); keeps the ones this shard owns"""
+        added = 0
+        for entry in entries:
+            if entry.key in self._seen:
+                continue
+            self._seen.add(entry.key)
+            shard = self.shard_of(entry.url)
+            cursor = self._conn.execute(
+                """INSERT OR IGNORE INTO crawl_frontier
+                   (session_id, url_key, url, depth, priority, parent_key, state, updated_at, lastmod, shard)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (self.session_id, entry.key, entry.url, entry.depth, entry.priority,
+                 entry.parent_key, QUEUED, datetime.now(), entry.lastmod, shard)
+            )
+            if cursor.rowcount != 1:
+                continue  # another process got there first
+            added += 1
+            if shard == self.shard_index:
+                self._local_keys.add(entry.key)
+                heapq.heappush(self._heap, (-entry.priority, entry.depth, next(self._seq), entry))
+        return added
+
+    def pop(self) -> Optional[FrontierEntry]:
+        entry = super().pop()
+        if entry is None and self._refill():
+            entry = super().pop()
+        return entry
+
+    def _refill(self) -> bool:
+        """Pull queued rows of this shard pushed by other processes; True if any were added"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_refill < self.poll_interval / 2:
+                return False
+            self._last_refill = now
+            rows = self._conn.execute(
+                "SELECT url_key, url, depth, priority, parent_key, lastmod FROM crawl_frontier "
+                "WHERE session_id = ? AND shard = ? AND state = ? ORDER BY priority DESC, depth LIMIT ?",
+                (self.session_id, self.shard_index, QUEUED, self.refill_size + len(self._local_keys))
+            ).fetchall()
+            added = 0
+            for key, url, depth, priority, parent_key, lastmod in rows:
+                if key in self._local_keys:
+                    continue
+                self._seen.add(key)
+                self._local_keys.add(key)
+                entry = FrontierEntry(url=url, depth=depth, priority=priority or 0.0,
+                                      parent_key=parent_key, key=key, lastmod=lastmod)
+                heapq.heappush(self._heap, (-entry.priority, depth, next(self._seq), entry))
+                added += 1
+            return added > 0
+
+    def _on_done(self, entry: FrontierEntry, failed: bool):
+        super()._on_done(entry, failed)
+        self._local_keys.discard(entry.key)
+
+    def _on_producer(self, name: str, active: bool):
+        # A placeholder row keeps the other processes from finishing while this one still produces URLs
+        key = f"#producer:{self.shard_index}:{name}"
+        self._write(
+            """INSERT OR REPLACE INTO crawl_frontier (session_id, url_key, url, state, updated_at, shard)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (self.session_id, key, key, IN_FLIGHT if active else DONE, datetime.now(), -1)
+        )
+
+    def is_exhausted(self) -> bool:
+        if not super().is_exhausted():
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_active_check >= self.poll_interval:
+                self._last_active_check = now
+                self._active_elsewhere = self._conn.execute(
+                    "SELECT 1 FROM crawl_frontier WHERE session_id = ? AND state IN (?, ?) LIMIT 1",
+                    (self.session_id, QUEUED, IN_FLIGHT)
+                ).fetchone() is not None
+            return not self._active_elsewhere
+
+    def next_ready_in(self) -> Optional[float]:
+        # Other processes may hand this shard work at any time, so never sleep longer than a poll
+        ready_in = super().next_ready_in()
+        return self.poll_interval if ready_in is None else min(ready_in, self.poll_interval)
+
+    def resume(self) -> Dict[str, Any]:
+        """Requeue this shard's interrupted and failed rows; the rest is pulled in by pop() as usual"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE crawl_frontier SET state = ? WHERE session_id = ? AND shard = ? AND state IN (?, ?)",
+                (QUEUED, self.session_id, self.shard_index, IN_FLIGHT, FAILED)
+            )
+            self._conn.commit()
+            simhashes = SimhashIndex.load_hashes(self._conn, self.session_id)
+        return {"done_keys": [], "simhashes": simhashes}
+
+    @staticmethod
+    def finished_keys(db_path: str, session_id: str) -> List[str]:
+        """Keys of every URL the session's processes fetched (or gave up on)"""
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute(
+                "SELECT url_key FROM crawl_frontier WHERE session_id = ? AND state IN (?, ?) AND shard >= 0",
+                (session_id, DONE, FAILED)
+            ).fetchall()
+        return [key for (key,) in rows]
@@ -0,0 +1,211 @@
+"""
+HTTP connection pooling sized to the crawl's concurrency.
+
+requests' HTTPAdapter keeps 10 connections per host pool by default. With 12-32
+crawl threads plus the image workers sharing one Session, connections beyond
+the tenth are closed as soon as they are returned and the next request pays a
+new TCP (and TLS) handshake. PooledHTTPAdapter is sized from the crawl's
+settings and counts how often a request got a kept-alive connection and how
+often it had to open one (or throw one away because the pool was full).
+
+urllib3 resolves the host again for every new connection. Given a TTL,
+PooledHTTPAdapter resolves through a DNSCache instead, so the connections
+opened past the pool size (or after a keep-alive ends) skip the lookup.
+
+The asyncio crawl uses one aiohttp session per crawl, with a DNS cache on its
+connector; `aiohttp_trace_config` feeds the same kind of counters.
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError
+from urllib3.util.connection import allowed_gai_family
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class ConnectionStats:
+    """Thread-safe connection reuse counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    def add(self, name: str, n: int = 1):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + n
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self._counts)
+        for name in ("requests", "reused_connections", "new_connections", "discarded_connections"):
+            counts.setdefault(name, 0)
+        return counts
+
+
+def pool_sizes(concurrency: int, per_domain_max: int, extra_threads: int = 0) -> Tuple[int, int]:
+    """
+    (pool_connections, pool_maxsize) for a requests Session used by
+    `concurrency` crawl threads plus `extra_threads` other threads (image and
+    sitemap workers). pool_connections is the number of per-host pools kept;
+    pool_maxsize the idle connections kept per host, which must cover every
+    thread that can hit one host at once or returned connections get dropped.
+    """
+    threads = max(1, concurrency) + max(0, extra_threads)
+    return max(10, concurrency), max(10, per_domain_max, threads)
+
+
+class DNSCache:
+    """
+    Thread-safe getaddrinfo cache: a host's addresses are kept for `ttl`
+    seconds. Failed lookups are not cached. Hits and misses go to `stats`.
+    """
+
+    def __init__(self, ttl: float, stats: Optional[ConnectionStats] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.stats = stats
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """Addresses of `host`, in getaddrinfo order; raises socket.gaierror"""
+        key = (host, port)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self._count("dns_cache_hits")
+            return entry[1]
+        self._count("dns_cache_misses")
+        # Resolve outside the lock: one slow host must not block lookups of the others
+        infos = socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self._entries[key] = (now + self.ttl, addresses)
+        return addresses
+
+    def _count(self, name: str):
+        if self.stats is not None:
+            self.stats.add(name)
+
+
+def _pooled_connection(base, on_connect: Optional[Callable[[str, float], None]], dns_cache: Optional[DNSCache]):
+    class PooledConnection(base):
+        if on_connect is not None:
+            def connect(self):
+                start = time.perf_counter()
+                super().connect()
+                on_connect(self.host, time.perf_counter() - start)
+
+        if dns_cache is not None:
+            def _new_conn(self):
+                host = self._dns_host
+                try:
+                    addresses = dns_cache.resolve(host, self.port)
+                except socket.gaierror as e:
+                    raise NameResolutionError(self.host, self, e) from e
+                error = None
+                for address in addresses:
+                    # urllib3 connects to _dns_host; TLS (SNI, certificate) uses the name again after this
+                    self._dns_host = address
+                    try:
+                        return super()._new_conn()
+                    except ConnectTimeoutError as e:  # and NewConnectionError: try the next address
+                        error = e
+                    finally:
+                        self._dns_host = host
+                raise error
+
+    PooledConnection.__name__ = f"Pooled{base.__name__}"
+    return PooledConnection
+
+
+def _counting_pool(base, stats: ConnectionStats, on_connect: Optional[Callable[[str, float], None]] = None,
+                   dns_cache: Optional[DNSCache] = None):
+    class CountingPool(base):
+        if on_connect is not None or dns_cache is not None:
+            ConnectionCls = _pooled_connection(base.ConnectionCls, on_connect, dns_cache)
+
+        def _get_conn(self, timeout=None):
+            conn = super()._get_conn(timeout=timeout)
+            stats.add("requests")
+            # A kept-alive connection still has its socket; new (and dropped) ones connect first
+            stats.add("reused_connections" if getattr(conn, "sock", None) is not None else "new_connections")
+            return conn
+
+        def _put_conn(self, conn):
+            if conn is not None and self.pool is not None and self.pool.full():
+                stats.add("discarded_connections")
+            return super()._put_conn(conn)
+
+    CountingPool.__name__ = f"Counting{base.__name__}"
+    return CountingPool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connection pools report reuse to `self.stats`.
+    `on_connect(host, seconds)` is called for every new connection (DNS,
+    TCP and TLS). With `dns_cache_ttl` new connections resolve their host
+    through a DNSCache kept that many seconds.
+    """
+
+    def __init__(self, *args, on_connect: Optional[Callable[[str, float], None]] = None,
+                 dns_cache_ttl: Optional[float] = None, **kwargs):
+        self.stats = ConnectionStats()
+        self.on_connect = on_connect
+        self.dns_cache = DNSCache(dns_cache_ttl, self.stats) if dns_cache_ttl else None
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self.stats, self.on_connect, self.dns_cache),
+            "https": _counting_pool(HTTPSConnectionPool, self.stats, self.on_connect, self.dns_cache),
+        }
+
+    def __setstate__(self, state):
+        # HTTPAdapter pickles only its __attrs__; init_poolmanager needs these
+        self.stats = ConnectionStats()
+        self.on_connect = None
+        self.dns_cache = None
+        super().__setstate__(state)
+
+
+def aiohttp_trace_config(stats: ConnectionStats):
+    """aiohttp TraceConfig counting connection reuse and DNS cache hits into `stats`"""
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_start(session, ctx, params):
+        stats.add("requests")
+
+    async def on_connection_create_end(session, ctx, params):
+        stats.add("new_connections")
+
+    async def on_connection_reuseconn(session, ctx, params):
+        stats.add("reused_connections")
+
+    async def on_dns_cache_hit(session, ctx, params):
+        stats.add("dns_cache_hits")
+
+    async def on_dns_cache_miss(session, ctx, params):
+        stats.add("dns_cache_misses")
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace.on_dns_cache_hit.append(on_dns_cache_hit)
+    trace.on_dns_cache_miss.append(on_dns_cache_miss)
+    return trace
@@ -0,0 +1,322 @@
+"""
+Concurrent, deduplicated image stage for the scraper.
+
+Images used to be downloaded one by one during DOM traversal, re-encoded to a
+temp file and OCR'd on the spot, so a logo repeated on every page was fetched
+and OCR'd once per page. ImagePipeline instead:
+
+- fetches all images of a page concurrently, with a per-image size cap;
+- remembers every URL for the whole crawl and every content hash, so repeated
+  images are fetched once and stored once;
+- keeps the original bytes in a content-addressed ImageStore
+  (`<root>/ab/<sha256>.<ext>`), written atomically;
+- runs OCR, when enabled, once per distinct image on a separate worker pool in
+  batches, off the crawl path. Results land on a shared OcrResult that every
+  StoredImage referencing that content reads when it is serialized.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image as PILImage
+    PIL_AVAILABLE = True
+except ImportError:
+    PILImage = None
+    PIL_AVAILABLE = False
+
+
+class ImageTooLargeError(Exception):
+    """Raised when an image exceeds the pipeline's size cap"""
+
+
+class ImageStore:
+    """Content-addressed image bytes on disk"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.{ext}")
+
+    def put(self, data: bytes, ext: str) -> str:
+        """Store `data` under its sha256; returns the path (existing content is not rewritten)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, ext)
+        if os.path.exists(path):
+            return path
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return path
+
+
+@dataclass
+class OcrResult:
+    """OCR text for one distinct image, filled in by the OCR pool"""
+    text: Optional[str] = None
+    done: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class ImageAsset:
+    """One distinct image (by content) and where it lives"""
+    digest: str
+    path: str
+    format: str
+    size: int
+    url: str
+    ocr: OcrResult = field(default_factory=OcrResult)
+
+
+class StoredImage:
+    """Document content element for an image held in the ImageStore"""
+
+    def __init__(self, src: str, alt: str = "", caption: str = "", url: str = "",
+                 asset: Optional[ImageAsset] = None):
+        self.src = src
+        self.alt = alt
+        self.caption = caption
+        self.url = url
+        self.asset = asset
+
+    @property
+    def ocr_data(self) -> Optional[Dict[str, str]]:
+        if self.asset is None or not self.asset.ocr.text:
+            return None
+        return {"ocr_text": self.asset.ocr.text}
+
+    def to_dict(self):
+        data = {
+            "type": "image",
+            "src": self.src,
+            "alt": self.alt,
+            "caption": self.caption,
+            "url": self.url,
+        }
+        if self.asset is not None:
+            data["content_hash"] = self.asset.digest
+            data["format"] = self.asset.format
+            if self.asset.ocr.text:
+                data["ocr_text"] = self.asset.ocr.text
+        return data
+
+    def to_text(self):
+        text = f"[Image: {self.caption or self.alt or self.url}]"
+        ocr = self.ocr_data
+        return f"{text} {ocr['ocr_text']}" if ocr else text
+
+
+class ImagePipeline:
+    """
+    Fetches, dedupes and stores images; optionally OCRs them in the background.
+
+    `ocr_func(path) -> text` is called from the OCR pool in batches of
+    `ocr_batch_size`; leave it None to skip OCR.
+    """
+
+    def __init__(self, session, store: ImageStore, max_bytes: int = 5 * 1024 * 1024,
+                 workers: int = 8, timeout: float = 30.0,
+                 convert_svg: Optional[Callable[[bytes], bytes]] = None,
+                 ocr_func: Optional[Callable[[str], Optional[str]]] = None,
+                 ocr_workers: int = 1, ocr_batch_size: int = 8):
+        self.session = session
+        self.store = store
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.convert_svg = convert_svg
+        self.ocr_func = ocr_func
+        self.ocr_batch_size = max(1, ocr_batch_size)
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers),
+                                                               thread_name_prefix="images")
+        self._ocr_executor = (concurrent.futures.ThreadPoolExecutor(max_workers=max(1, ocr_workers),
+                                                                    thread_name_prefix="ocr")
+                              if ocr_func else None)
+        self._lock = threading.Lock()
+        # A URL's future lives only while it is fetched; then just its digest (or failure) is kept
+        self._in_flight: Dict[str, concurrent.futures.Future] = {}
+        self._url_digest: Dict[str, str] = {}
+        self._failed_urls: Set[str] = set()
+        self._by_digest: Dict[str, ImageAsset] = {}
+        self._ocr_pending: List[ImageAsset] = []
+        self._ocr_futures: List[concurrent.futures.Future] = []
+        self.downloads = 0
+        self.bytes_downloaded = 0
+        self.url_hits = 0
+        self.content_hits = 0
+        self.failures = 0
+
+    # -------------------- Fetching --------------------
+    def fetch_many(self, urls: Iterable[str]) -> Dict[str, Optional[ImageAsset]]:
+        """Assets for `urls` (None where an image failed), fetching only unseen URLs"""
+        results: Dict[str, Optional[ImageAsset]] = {}
+        futures = {}
+        with self._lock:
+            for url in urls:
+                if url in results or url in futures:
+                    continue
+                if url in self._url_digest:
+                    results[url] = self._by_digest[self._url_digest[url]]
+                elif url in self._failed_urls:
+                    results[url] = None
+                elif url in self._in_flight:
+                    futures[url] = self._in_flight[url]
+                else:
+                    futures[url] = self._in_flight[url] = self._executor.submit(self._fetch_url, url)
+                    continue
+                self.url_hits += 1
+        for url, future in futures.items():
+            try:
+                results[url] = future.result()
+            except Exception:
+                results[url] = None  # logged once by _fetch_url
+        return results
+
+    def _fetch_url(self, url: str) -> Optional[ImageAsset]:
+        """_fetch, then swap the URL's future for its digest so futures don't pile up over a crawl"""
+        try:
+            asset = self._fetch(url)
+        except Exception as e:
+            # A failed URL is remembered, not retried, and reported once rather than per page
+            logger.warning(f"Image processing failed for {url}: {e}")
+            with self._lock:
+                self._failed_urls.add(url)
+                self._in_flight.pop(url, None)
+            raise
+        with self._lock:
+            self._url_digest[url] = asset.digest
+            self._in_flight.pop(url, None)
+        return asset
+
+    def _download(self, url: str) -> bytes:
+        with self.session.get(url, timeout=self.timeout, stream=True) as resp:
+            resp.raise_for_status()
+            length = resp.headers.get("Content-Length")
+            if length and length.isdigit() and int(length) > self.max_bytes:
+                raise ImageTooLargeError(f"{length} bytes exceeds the {self.max_bytes} byte cap")
+            chunks, total = [], 0
+            for chunk in resp.iter_content(64 * 1024):
+                total += len(chunk)
+                if total > self.max_bytes:
+                    raise ImageTooLargeError(f"more than {self.max_bytes} bytes")
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _fetch(self, url: str) -> Optional[ImageAsset]:
+        try:
+            data = self._download(url)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        with self._lock:
+            self.downloads += 1
+            self.bytes_downloaded += len(data)
+
+        if self.convert_svg and url.lower().endswith(".svg"):
+            try:
+                data = self.convert_svg(data)
+            except Exception as e:
+                logger.debug("SVG conversion failed: %s", e)
+
+        fmt = self._sniff_format(data)
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            existing = self._by_digest.get(digest)
+            if existing is not None:
+                self.content_hits += 1
+                return existing
+        path = self.store.put(data, fmt)
+        asset = ImageAsset(digest=digest, path=path, format=fmt, size=len(data), url=url)
+        with self._lock:
+            existing = self._by_digest.setdefault(digest, asset)
+            if existing is not asset:
+                self.content_hits += 1
+                return existing
+            if self._ocr_executor is not None:
+                self._ocr_pending.append(asset)
+                if len(self._ocr_pending) >= self.ocr_batch_size:
+                    self._submit_ocr_batch_locked()
+        return asset
+
+    @staticmethod
+    def _sniff_format(data: bytes) -> str:
+        """Image format from the bytes themselves; raises if they are not an image"""
+        if PIL_AVAILABLE:
+            with PILImage.open(BytesIO(data)) as img:
+                return (img.format or "png").lower()
+        if data.lstrip()[:5] in (b"<?xml", b"<svg ") or b"<svg" in data[:512]:
+            return "svg"
+        return "bin"
+
+    # -------------------- OCR --------------------
+    def _submit_ocr_batch_locked(self):
+        batch, self._ocr_pending = self._ocr_pending, []
+        if batch:
+            self._ocr_futures.append(self._ocr_executor.submit(self._run_ocr_batch, batch))
+
+    def _run_ocr_batch(self, batch: List[ImageAsset]):
+        for asset in batch:
+            try:
+                asset.ocr.text = self.ocr_func(asset.path)
+            except Exception as e:
+                asset.ocr.error = str(e)
+                logger.debug(f"OCR failed for {asset.url}: {e}")
+            finally:
+                asset.ocr.done = True
+
+    def drain(self, timeout: Optional[float] = None):
+        """Submit any partial OCR batch and wait for all OCR to finish"""
+        if self._ocr_executor is None:
+            return
+        with self._lock:
+            self._submit_ocr_batch_locked()
+            futures, self._ocr_futures = self._ocr_futures, []
+        concurrent.futures.wait(futures, timeout=timeout)
+
+    def assets(self) -> List[ImageAsset]:
+        with self._lock:
+            return list(self._by_digest.values())
+
+    def close(self):
+        self.drain()
+        self._executor.shutdown(wait=True)
+        if self._ocr_executor is not None:
+            self._ocr_executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "urls_seen": len(self._in_flight) + len(self._url_digest) + len(self._failed_urls),
+                "distinct_images": len(self._by_digest),
+                "downloads": self.downloads,
+                "bytes_downloaded": self.bytes_downloaded,
+                "url_dedup_hits": self.url_hits,
+                "content_dedup_hits": self.content_hits,
+                "failures": self.failures,
+                "ocr_done": sum(1 for a in self._by_digest.values() if a.ocr.done),
+            }
@@ -0,0 +1,63 @@
+"""
+Multi-keyword occurrence counting for content classification.
+
+ContentClassifier scores a page by how often each of its keywords occurs in
+the page text and class names. KeywordMatcher counts all of them in one sweep:
+with an Aho-Corasick automaton when the `pyahocorasick` package is installed,
+otherwise with one alternation regex of every keyword, longest first.
+
+Both paths count the same matches: scanning left to right, the longest
+keyword starting at the leftmost position wins and the scan resumes after it,
+so matches never overlap, even across keywords ("tagged" counts as "tagged",
+not also as "tag", when both are keywords). Occurrences inside longer words
+that are not keywords still count ("tag" in "tags").
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Iterable, List
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+AHOCORASICK_AVAILABLE = ahocorasick is not None
+
+
+class KeywordMatcher:
+    """Counts occurrences of a fixed keyword list; `counts()` is ordered like `keywords`"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(k for k in keywords if k))
+        self._automaton = None
+        self._pattern = None
+        if not self.keywords:
+            return
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for index, keyword in enumerate(self.keywords):
+                automaton.add_word(keyword, (index, len(keyword)))
+            automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            # Alternatives are tried in order, so longest first picks the longest keyword at a position
+            self._pattern = re.compile("|".join(map(re.escape, sorted(self.keywords, key=len, reverse=True))))
+
+    def counts(self, text: str) -> List[int]:
+        if not text or not self.keywords:
+            return [0] * len(self.keywords)
+        if self._automaton is None:
+            found = Counter(self._pattern.findall(text))
+            return [found[keyword] for keyword in self.keywords]
+        # The automaton reports every match, by end position; keep the leftmost-longest, non-overlapping ones
+        matches = sorted((end - length + 1, -length, index) for end, (index, length) in self._automaton.iter(text))
+        counts = [0] * len(self.keywords)
+        position = 0
+        for start, negative_length, index in matches:
+            if start >= position:
+                counts[index] += 1
+                position = start - negative_length
+        return counts
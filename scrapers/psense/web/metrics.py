@@ -0,0 +1,294 @@
+"""
+Live crawl metrics.
+
+The performance summary printed at the end of a run only says how many pages
+per second the whole crawl managed, not where the time went. CrawlMetrics
+keeps a latency histogram for each crawl stage (connect, fetch, robots,
+dedup, parse, multilingual, image, db_write), overall and per host, plus
+byte counts and gauges such as frontier queue depth. Stages nest: parse
+covers the dedup, multilingual and image stages of the same page.
+
+A MetricsReporter publishes snapshots while the crawl runs, as a JSON file
+rewritten every `interval` seconds and/or a local HTTP endpoint
+(GET /metrics on 127.0.0.1).
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; the last bucket is everything slower
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+OTHER_HOSTS = "(other)"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (not thread-safe; CrawlMetrics locks around it)"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (max for the last bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 6),
+            "buckets": {("+Inf" if i == len(BUCKETS) else str(BUCKETS[i])): n
+                        for i, n in enumerate(self.counts) if n},
+        }
+
+
+class CrawlMetrics:
+    """
+    Thread-safe stage timings, byte counts and gauges for one crawl. Hosts are
+    keyed by host name (URLs are reduced to theirs). Hosts beyond the first
+    `max_hosts` are folded into one "(other)" entry so a wide crawl cannot
+    grow the per-host tables without bound.
+    """
+
+    def __init__(self, max_hosts: int = 500, clock: Callable[[], float] = time.monotonic):
+        self.max_hosts = max_hosts
+        self.clock = clock
+        self.started = clock()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._hosts: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self._host_bytes: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+        self.bytes = 0
+
+    def _host_key(self, host: Optional[str]) -> Optional[str]:
+        if not host:
+            return None
+        if "/" in host:
+            host = urlparse(host).hostname or host
+        if host in self._hosts or len(self._hosts) < self.max_hosts:
+            return host
+        return OTHER_HOSTS
+
+    def observe(self, stage: str, seconds: float, host: Optional[str] = None):
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = LatencyHistogram()
+            hist.observe(seconds)
+            key = self._host_key(host)
+            if key is not None:
+                per_host = self._hosts.setdefault(key, {})
+                hist = per_host.get(stage)
+                if hist is None:
+                    hist = per_host[stage] = LatencyHistogram()
+                hist.observe(seconds)
+
+    @contextmanager
+    def timed(self, stage: str, host: Optional[str] = None):
+        """Time a block as `stage` (host may be a host name or a URL); tracks how many are in progress"""
+        with self._lock:
+            self._active[stage] = self._active.get(stage, 0) + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._active[stage] -= 1
+            self.observe(stage, elapsed, host)
+
+    def add_bytes(self, n: int, host: Optional[str] = None):
+        with self._lock:
+            self.bytes += n
+            key = self._host_key(host)
+            if key is not None:
+                self._hosts.setdefault(key, {})
+                self._host_bytes[key] = self._host_bytes.get(key, 0) + n
+
+    def register_gauge(self, name: str, read: Callable[[], Any]):
+        """`read()` is called for every snapshot (e.g. frontier queue depth)"""
+        with self._lock:
+            self._gauges[name] = read
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state; reading it changes nothing, so any number of readers can poll"""
+        now = self.clock()
+        with self._lock:
+            gauges = dict(self._gauges)
+            elapsed = max(now - self.started, 1e-9)
+            snap = {
+                "uptime_seconds": round(now - self.started, 3),
+                "bytes": self.bytes,
+                "bytes_per_sec": round(self.bytes / elapsed, 1),
+                "in_progress": {stage: n for stage, n in self._active.items() if n},
+                "stages": {stage: hist.to_dict() for stage, hist in sorted(self._stages.items())},
+                "hosts": {
+                    host: {
+                        "bytes": self._host_bytes.get(host, 0),
+                        "stages": {stage: hist.to_dict() for stage, hist in sorted(stages.items())},
+                    } for host, stages in sorted(self._hosts.items())
+                },
+            }
+        snap["gauges"] = {}
+        for name, read in gauges.items():
+            try:
+                snap["gauges"][name] = read()
+            except Exception as e:
+                logger.debug("Metrics gauge %s failed: %s", name, e)
+        return snap
+
+    def aiohttp_trace_config(self):
+        """aiohttp TraceConfig timing new connections (DNS + TCP/TLS) as the connect stage"""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.metrics_host = params.url.host
+
+        async def on_connection_create_start(session, ctx, params):
+            ctx.metrics_connect_start = time.perf_counter()
+
+        async def on_connection_create_end(session, ctx, params):
+            start = getattr(ctx, "metrics_connect_start", None)
+            if start is not None:
+                self.observe("connect", time.perf_counter() - start, getattr(ctx, "metrics_host", None))
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_start.append(on_connection_create_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        return trace
+
+
+class MetricsReporter:
+    """
+    Publishes CrawlMetrics snapshots while a crawl runs: rewrites `path`
+    every `interval` seconds (atomically, so readers never see a partial
+    file) and/or serves them on http://127.0.0.1:`port`/metrics.
+    Port 0 picks a free port (see `port` after start()). When the port is
+    taken, start() logs a warning and serves nothing instead of failing.
+    """
+
+    def __init__(self, metrics: CrawlMetrics, path: Optional[str] = None, interval: float = 5.0,
+                 port: Optional[int] = None):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.port = port
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        # (uptime, bytes) of the previous snapshot each output published
+        self._previous: Dict[str, tuple] = {}
+        self._previous_lock = threading.Lock()
+
+    def snapshot(self, output: str) -> Dict[str, Any]:
+        """A metrics snapshot plus recent_bytes_per_sec since `output`'s previous one"""
+        snap = self.metrics.snapshot()
+        uptime, total = snap["uptime_seconds"], snap["bytes"]
+        with self._previous_lock:
+            last_uptime, last_bytes = self._previous.get(output, (0.0, 0))
+            self._previous[output] = (uptime, total)
+        # What the crawl is doing now, not on average
+        snap["recent_bytes_per_sec"] = round((total - last_bytes) / max(uptime - last_uptime, 1e-9), 1)
+        return snap
+
+    def start(self):
+        if self.port is not None:
+            reporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = json.dumps(reporter.snapshot("http"), default=str).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            try:
+                self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+            except OSError as e:
+                # A busy port must not stop the crawl; the metrics file (if any) still works
+                logger.warning("Metrics endpoint disabled, cannot listen on port %s: %s", self.port, e)
+            else:
+                self.port = self._server.server_address[1]
+                threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+                logger.info("Crawl metrics at http://127.0.0.1:%d/metrics", self.port)
+        if self.path:
+            self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot("file"), f, default=str)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to write metrics snapshot: %s", e)
+
+    def stop(self):
+        """Stop publishing; the file is left with a final snapshot"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -229,13 +229,14 @@ class MultilingualProcessor:
             encoding=detected_language.encoding
         )
     
-    def extract_multilingual_content(self, html_content: str, soup) -> Dict[str, Any]:
+    def extract_multilingual_content(self, html_content: str, soup, main_text: Optional[str] = None) -> Dict[str, Any]:
         """
         Extract and process multilingual content from HTML
         
         Args:
             html_content (str): Raw HTML content
             soup: BeautifulSoup object
+            main_text (str): Page text already extracted by the caller (skips a full-tree walk)
             
         Returns:
             Dict[str, Any]: Extracted multilingual content
@@ -243,7 +244,8 @@ class MultilingualProcessor:
         content_by_language = {}
         
         # Extract main text
-        main_text = soup.get_text(separator=" ", strip=True)
+        if main_text is None:
+            main_text = soup.get_text(separator=" ", strip=True)
         if main_text:
             processed = self.process_text(main_text)
             lang_code = processed.language.code
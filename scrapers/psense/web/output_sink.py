@@ -0,0 +1,95 @@
+"""
+Streaming output sinks for crawls.
+
+In tree mode the whole site is held in memory as one Document tree and dumped
+at the end. A sink instead receives each page as soon as it is parsed, writes
+it out and lets the Document go, so crawl memory stays flat however large the
+site is. Pages reference each other by ID (the normalized URL) rather than by
+nesting.
+"""
+
+from __future__ import annotations
+
+import abc
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+# output_mode values
+TREE, NDJSON, PAGES = "tree", "ndjson", "pages"
+
+
+class OutputSink(abc.ABC):
+    """Base sink: write() one page record at a time, close() at the end"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def write(self, record: Dict[str, Any]):
+        """Write one page record; called from crawl threads"""
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _dumps(record: Dict[str, Any], indent: Optional[int] = None) -> str:
+        return json.dumps(record, indent=indent, default=str, ensure_ascii=False)
+
+
+class NDJSONSink(OutputSink):
+    """One JSON object per line in a single file"""
+
+    def __init__(self, path: str, append: bool = False):
+        super().__init__(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        line = self._dumps(record) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class DirectorySink(OutputSink):
+    """One `<sha1(id)>.json` file per page in a directory, written atomically"""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        os.makedirs(path, exist_ok=True)
+
+    def file_for(self, page_id: str) -> str:
+        return os.path.join(self.path, hashlib.sha1(page_id.encode("utf-8")).hexdigest() + ".json")
+
+    def write(self, record: Dict[str, Any]):
+        target = self.file_for(record["id"])
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self._dumps(record, indent=2))
+        os.replace(tmp, target)
+        with self._lock:
+            self.count += 1
+
+
+def open_output_sink(mode: str, path: str, append: bool = False) -> Optional[OutputSink]:
+    """The sink for an output_mode, or None for tree mode"""
+    if mode == NDJSON:
+        return NDJSONSink(path, append=append)
+    if mode == PAGES:
+        return DirectorySink(path)
+    if mode == TREE:
+        return None
+    raise ValueError(f"Unknown output_mode: {mode}")
@@ -0,0 +1,338 @@
+"""
+On-disk page cache with HTTP revalidation support.
+
+Each entry keeps the response body together with its validators (ETag,
+Last-Modified) and a content hash. Expired entries are not discarded: their
+validators turn the refetch into a conditional request, and a 304 (or an
+identical body) lets the crawler reuse both the cached body and the cached
+parse result instead of downloading and parsing the page again.
+
+Storage is sharded by hash prefix (`ab/cd/<sha256>.entry`) so no directory
+grows past a few thousand files, bodies are compressed (zstd when the
+`zstandard` package is installed, gzip otherwise), the total size is kept
+under `max_bytes` by least-recently-used eviction, and every write goes to a
+temp file that is renamed into place so concurrent readers never see a torn
+entry.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PSC1"
+HEADER = struct.Struct(">4sI")
+ENTRY_SUFFIX = ".entry"
+PARSED_SUFFIX = ".parsed"
+TMP_SUFFIX = ".tmp"
+# A temp file this old was left by a writer that died before its rename
+STALE_TMP_SECONDS = 3600
+
+
+def content_hash(body: str) -> str:
+    return hashlib.md5(body.encode("utf-8", errors="replace")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    body: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: str = ""
+    stored_at: float = field(default_factory=time.time)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers that make a refetch conditional on this entry"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    Sharded, compressed, size-bounded cache of page bodies and parse results.
+
+    The LRU index lives in memory and is rebuilt from file mtimes on start-up
+    (reads bump the mtime), so recency survives restarts. That rebuild stats
+    every file, so opening a cache of N entries costs N stat calls before the
+    first lookup; it also removes temp files orphaned by a crashed writer.
+    Several processes may share a directory; each evicts against its own view
+    of the total, which keeps the directory near the budget rather than
+    exactly on it.
+    """
+
+    def __init__(self, cache_dir: str, ttl: float = 24 * 3600, max_bytes: int = 1024 ** 3,
+                 compression: Optional[str] = None, compression_level: int = 3):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        if compression is None:
+            compression = "zstd" if ZSTD_AVAILABLE else "gzip"
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed; page cache falls back to gzip")
+            compression = "gzip"
+        if compression not in ("zstd", "gzip", "none"):
+            raise ValueError(f"Unknown cache compression: {compression}")
+        self.compression = compression
+        self.compression_level = compression_level
+
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # path -> size, oldest first
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    # -------------------- Layout --------------------
+    def path_for(self, url: str, suffix: str = ENTRY_SUFFIX) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key[2:4], key + suffix)
+
+    def _load_index(self):
+        files = []
+        now = time.time()
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                is_tmp = name.endswith(TMP_SUFFIX)
+                if not is_tmp and not name.endswith((ENTRY_SUFFIX, PARSED_SUFFIX)):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                    if is_tmp:
+                        # Recent ones may belong to another process still writing
+                        if now - st.st_mtime > STALE_TMP_SECONDS:
+                            os.unlink(path)
+                        continue
+                except OSError:
+                    continue
+                files.append((st.st_mtime, path, st.st_size))
+        files.sort()
+        for _, path, size in files:
+            self._index[path] = size
+            self._total_bytes += size
+
+    # -------------------- Encoding --------------------
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=self.compression_level).compress(data)
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=min(max(self.compression_level, 1), 9))
+        return data
+
+    @staticmethod
+    def _decompress(codec: str, data: bytes) -> bytes:
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise ValueError("entry is zstd-compressed but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        if codec == "gzip":
+            return gzip.decompress(data)
+        return data
+
+    def _encode(self, meta: Dict[str, Any], payload: bytes) -> bytes:
+        meta = dict(meta, codec=self.compression)
+        header = json.dumps(meta).encode("utf-8")
+        return HEADER.pack(MAGIC, len(header)) + header + self._compress(payload)
+
+    @staticmethod
+    def _split(data: bytes) -> Tuple[Dict[str, Any], bytes]:
+        magic, header_len = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a page cache entry")
+        start = HEADER.size
+        meta = json.loads(data[start:start + header_len].decode("utf-8"))
+        return meta, data[start + header_len:]
+
+    # -------------------- File I/O --------------------
+    def _read(self, path: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            meta, payload = self._split(data)
+            payload = self._decompress(meta.get("codec", "none"), payload)
+        except FileNotFoundError:
+            self._forget(path)
+            return None
+        except Exception as e:
+            logger.debug(f"Dropping unreadable cache file {path}: {e}")
+            self._remove(path)
+            return None
+        self._touch_lru(path)
+        return meta, payload
+
+    def _write(self, path: str, data: bytes):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=TMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self._total_bytes += len(data) - self._index.pop(path, 0)
+            self._index[path] = len(data)
+        self._evict()
+
+    def _touch_lru(self, path: str):
+        with self._lock:
+            if path in self._index:
+                self._index.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _forget(self, path: str):
+        with self._lock:
+            self._total_bytes -= self._index.pop(path, 0)
+
+    def _remove(self, path: str):
+        self._forget(path)
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used files until the cache is back under budget"""
+        if not self.max_bytes:
+            return
+        victims = []
+        with self._lock:
+            while self._total_bytes > self.max_bytes and self._index:
+                path, size = self._index.popitem(last=False)
+                self._total_bytes -= size
+                victims.append(path)
+            self.evictions += len(victims)
+        for path in victims:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    # -------------------- Bodies --------------------
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """The cached entry for `url` regardless of age, or None"""
+        record = self._read(self.path_for(url))
+        with self._lock:
+            if record is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if record is None:
+            return None
+        meta, payload = record
+        body = payload.decode("utf-8")
+        return CacheEntry(
+            body=body,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            content_hash=meta.get("content_hash") or content_hash(body),
+            stored_at=meta.get("stored_at", time.time()),
+        )
+
+    def get_fresh(self, url: str) -> Optional[str]:
+        """The cached body if it is younger than the TTL"""
+        entry = self.get(url)
+        if entry is None or entry.age > self.ttl:
+            return None
+        return entry.body
+
+    def put(self, url: str, body: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> CacheEntry:
+        entry = CacheEntry(body=body, etag=etag, last_modified=last_modified, content_hash=content_hash(body))
+        self._put_entry(url, entry)
+        return entry
+
+    def touch(self, url: str, entry: CacheEntry):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        entry.stored_at = time.time()
+        self._put_entry(url, entry)
+
+    def _put_entry(self, url: str, entry: CacheEntry):
+        meta = {
+            "url": url,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "content_hash": entry.content_hash,
+            "stored_at": entry.stored_at,
+        }
+        self._write(self.path_for(url), self._encode(meta, entry.body.encode("utf-8")))
+
+    # -------------------- Parse results --------------------
+    def get_parsed(self, url: str, expected_hash: str) -> Optional[Any]:
+        """A stored parse result, only if it was produced from `expected_hash` content"""
+        record = self._read(self.path_for(url, PARSED_SUFFIX))
+        if record is None:
+            return None
+        meta, payload = record
+        if meta.get("content_hash") != expected_hash:
+            return None
+        try:
+            return pickle.loads(payload)
+        except Exception:
+            return None
+
+    def put_parsed(self, url: str, body_hash: str, payload: Any):
+        try:
+            data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Parse result for {url} is not cacheable: {e}")
+            return
+        self._write(self.path_for(url, PARSED_SUFFIX), self._encode({"url": url, "content_hash": body_hash}, data))
+
+    # -------------------- Introspection --------------------
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "files": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "compression": self.compression,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
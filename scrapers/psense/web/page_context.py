@@ -0,0 +1,176 @@
+"""
+Parse-once page context.
+
+A fetched page used to be parsed by BeautifulSoup three or four times (crawl,
+dedup, content classification, multilingual extraction). PageContext holds the
+raw content, a single parsed tree and the derived views every stage needs
+(visible text, class tokens, links, title, content blocks), each computed at
+most once.
+
+With parser="lxml" the page is parsed by lxml.html instead of BeautifulSoup
+and every view is read from that tree; `soup` is then only built if some
+caller still asks for it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Callable, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+try:
+    from .content_walker import ContentBlock, iter_text_lxml, parse_lxml, walk_content, walk_content_lxml
+except ImportError:
+    from content_walker import ContentBlock, iter_text_lxml, parse_lxml, walk_content, walk_content_lxml
+
+# Containers whose text is never visible page content
+INVISIBLE_TAGS = frozenset(["script", "style"])
+TEXT_TYPES = (NavigableString, CData)
+
+
+class PageContext:
+    """One fetched page and its lazily computed, cached views"""
+
+    def __init__(self, url: str, html: Optional[str] = None, raw: Optional[bytes] = None,
+                 soup: Optional[BeautifulSoup] = None, encoding: str = "utf-8",
+                 status_code: Optional[int] = None, parser: str = "bs4"):
+        self.url = url
+        self._html = html
+        self._raw = raw
+        self._soup = soup
+        self.encoding = encoding
+        self.status_code = status_code
+        # An already parsed soup decides the backend
+        self.parser = "bs4" if soup is not None else parser
+        self._tree = None
+        self._tree_parsed = False
+        self._visible_text: Optional[str] = None
+        self._class_tokens: Optional[List[str]] = None
+        self._links: Optional[List[str]] = None
+        # Filled in by near-duplicate detection
+        self.simhash: Optional[int] = None
+
+    @classmethod
+    def from_soup(cls, soup: BeautifulSoup, url: str) -> "PageContext":
+        """Wrap an already parsed tree (for callers that only hold a soup)"""
+        return cls(url, soup=soup)
+
+    # -------------------- Content --------------------
+    @property
+    def html(self) -> str:
+        if self._html is None:
+            if self._raw is not None:
+                self._html = self._raw.decode(self.encoding, errors="replace")
+            elif self._soup is not None:
+                self._html = str(self._soup)
+            else:
+                self._html = ""
+        return self._html
+
+    @property
+    def raw(self) -> bytes:
+        if self._raw is None:
+            self._raw = self.html.encode(self.encoding, errors="replace")
+        return self._raw
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.md5(self.raw).hexdigest()
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """The single parsed tree shared by all stages"""
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, "lxml")
+        return self._soup
+
+    @property
+    def tree(self):
+        """The lxml.html document tree (None for an empty page); parser="lxml" only"""
+        if not self._tree_parsed:
+            self._tree = parse_lxml(self.html)
+            self._tree_parsed = True
+        return self._tree
+
+    # -------------------- Derived views --------------------
+    def _scan(self):
+        """One walk over the tree collecting visible text, class tokens and links"""
+        if self.parser == "lxml":
+            self._scan_lxml()
+            return
+        texts, classes, links = [], [], []
+        for node in self.soup.descendants:
+            if isinstance(node, Tag):
+                cls = node.get("class")
+                if cls:
+                    classes.extend(cls if isinstance(cls, list) else cls.split())
+                if node.name == "a":
+                    href = node.get("href")
+                    if href:
+                        links.append(urljoin(self.url or "", href.split("#")[0]))
+            elif type(node) in TEXT_TYPES:
+                parent = node.parent
+                if parent is not None and parent.name in INVISIBLE_TAGS:
+                    continue
+                text = node.strip()
+                if text:
+                    texts.append(text)
+        self._visible_text = " ".join(texts)
+        self._class_tokens = classes
+        self._links = links
+
+    def _scan_lxml(self):
+        texts, classes, links = [], [], []
+        root = self.tree
+        if root is not None:
+            for text in iter_text_lxml(root):
+                text = text.strip()
+                if text:
+                    texts.append(text)
+            for cls in root.xpath("//@class"):
+                classes.extend(cls.split())
+            for href in root.xpath("//a/@href"):
+                if href:
+                    links.append(urljoin(self.url or "", href.split("#")[0]))
+        self._visible_text = " ".join(texts)
+        self._class_tokens = classes
+        self._links = links
+
+    @property
+    def visible_text(self) -> str:
+        """Page text without scripts, styles or comments, whitespace-separated"""
+        if self._visible_text is None:
+            self._scan()
+        return self._visible_text
+
+    @property
+    def class_tokens(self) -> List[str]:
+        if self._class_tokens is None:
+            self._scan()
+        return self._class_tokens
+
+    @property
+    def links(self) -> List[str]:
+        """Absolute hrefs of every <a href> in document order, fragments removed"""
+        if self._links is None:
+            self._scan()
+        return self._links
+
+    @property
+    def title(self) -> Optional[str]:
+        """Stripped text of the first <title>, or None when there is none"""
+        if self.parser == "lxml":
+            root = self.tree
+            title = root.find(".//title") if root is not None else None
+            return "".join(s.strip() for s in iter_text_lxml(title)) if title is not None else None
+        title = self.soup.find("title")
+        return title.get_text(strip=True) if title is not None else None
+
+    def content_blocks(self, is_noisy: Callable[[Any], bool]) -> List[ContentBlock]:
+        """Content blocks in document order (see content_walker); not cached, `is_noisy` may vary"""
+        if self.parser == "lxml":
+            root = self.tree
+            return walk_content_lxml(root, is_noisy) if root is not None else []
+        return walk_content(self.soup, is_noisy)
@@ -0,0 +1,132 @@
+"""
+Per-host token-bucket rate limiting.
+
+Each host gets a bucket refilled at `rate` tokens per second holding at most
+`burst` tokens; a request spends one token. Waiting happens outside any
+concurrency slot, and callers that can do other work (the asyncio frontier)
+ask `delay_for()` first and schedule a throttled URL for later instead of
+sleeping on it. A robots.txt Crawl-delay caps a host's rate at 1/delay.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. reserve() always succeeds and returns how long
+    the caller must wait; reservations queue up as token debt, so concurrent
+    callers are spaced 1/rate apart instead of all waking at once.
+    A rate of 0 (or less) means unlimited.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def delay(self) -> float:
+        """Seconds until a token would be free, without taking one"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def set_rate(self, rate: float, burst: Optional[float] = None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if burst is not None:
+                self.burst = max(burst, 1.0)
+                self._tokens = min(self._tokens, self.burst)
+
+
+class HostRateLimiter:
+    """
+    One TokenBucket per host (netloc). `crawl_delay_provider(host)` is asked
+    for a robots Crawl-delay when a host is first seen; set_crawl_delay()
+    applies one learned later.
+    """
+
+    def __init__(self, rate: float = 0.0, burst: float = 1.0,
+                 crawl_delay_provider: Optional[Callable[[str], Optional[float]]] = None):
+        self.rate = rate
+        self.burst = burst
+        self.crawl_delay_provider = crawl_delay_provider
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is not None:
+            return bucket
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[host] = bucket
+        if self.crawl_delay_provider is not None:
+            delay = self.crawl_delay_provider(host)
+            if delay:
+                self.set_crawl_delay(host, delay)
+        return bucket
+
+    def set_crawl_delay(self, host: str, delay: float):
+        """Never go faster than one request per `delay` seconds on this host"""
+        if not delay or delay <= 0:
+            return
+        bucket = self._new_bucket(host)
+        robots_rate = 1.0 / delay
+        rate = robots_rate if self.rate <= 0 else min(self.rate, robots_rate)
+        bucket.set_rate(rate, burst=1.0)
+
+    def _new_bucket(self, host: str) -> TokenBucket:
+        """Get or create a bucket without consulting the crawl-delay provider"""
+        with self._lock:
+            return self._buckets.setdefault(host, TokenBucket(self.rate, self.burst))
+
+    def delay_for(self, url: str) -> float:
+        """Seconds until `url`'s host has a free token (nothing is reserved)"""
+        return self.bucket(self.host_of(url)).delay()
+
+    def acquire(self, url: str):
+        """Blocking: wait for a token on `url`'s host"""
+        wait = self.bucket(self.host_of(url)).reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str):
+        """Non-blocking for the event loop: other tasks run while this one waits"""
+        wait = self.bucket(self.host_of(url)).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current rate per host"""
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self._buckets.items()}
@@ -0,0 +1,179 @@
+"""
+Incremental recrawl scheduling.
+
+Every run used to refetch and reparse the whole site, even though most pages
+had not changed since the previous night. RecrawlScheduler reads each URL's
+visit history from `crawled_urls` (crawl_time + content_hash), estimates how
+often the page changes and only lets a URL through when it is due. A sitemap
+<lastmod> newer than the last visit makes a URL due at once; one older than
+the last visit keeps it off the schedule. Pages that come back with the same
+content hash are recorded as cheap "seen" visits instead of being parsed and
+written out again.
+
+The change rate uses the Cho & Garcia-Molina estimator for pages polled at
+(roughly) regular intervals: with n intervals between visits of which X saw
+a change, over a span T,
+
+    rate = -ln((n - X + 0.5) / (n + 0.5)) / (T / n)
+
+which, unlike X / T, does not underestimate pages that change more than once
+between visits.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Tuple
+
+try:
+    from .sitemap import parse_lastmod
+except ImportError:
+    from sitemap import parse_lastmod
+
+# content_type recorded for a revisit whose content hash did not change
+UNCHANGED = "unchanged"
+
+
+@dataclass
+class UrlHistory:
+    """Summary of a URL's previous visits"""
+    visits: int
+    changes: int
+    first_seen: datetime
+    last_seen: datetime
+    last_hash: Optional[str]
+    interval: float  # estimated seconds between changes, clamped
+
+
+def estimate_change_rate(intervals: int, changes: int, span: float) -> float:
+    """Changes per second from `changes` observed over `intervals` visits spanning `span` seconds"""
+    if intervals <= 0 or span <= 0:
+        return 0.0
+    changes = min(changes, intervals)
+    return -math.log((intervals - changes + 0.5) / (intervals + 0.5)) / (span / intervals)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # crawl_time is stored as naive local time (datetime.now())
+    return value.astimezone(timezone.utc)
+
+
+def _parse_crawl_time(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class RecrawlScheduler:
+    """
+    `history(url)` returns the URL's previous visits as (crawl_time,
+    content_hash) pairs, oldest first. URLs without history are always due;
+    a URL seen once is due after `default_interval`; otherwise its estimated
+    change interval, clamped to [min_interval, max_interval], is used. The
+    last `max_cached` summaries are kept in memory. A URL is counted in the
+    statistics once, however often it is checked (links and crawl history
+    both ask about the same URLs).
+    """
+
+    def __init__(self, history: Callable[[str], List[Tuple[object, Optional[str]]]],
+                 min_interval: float = 3600, max_interval: float = 30 * 86400,
+                 default_interval: float = 86400, max_cached: int = 100000,
+                 clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)):
+        self.history_source = history
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.default_interval = default_interval
+        self.max_cached = max_cached
+        self.clock = clock
+        self._cache: "OrderedDict[str, Optional[UrlHistory]]" = OrderedDict()
+        self._counted: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.new_urls = 0
+        self.due_urls = 0
+        self.skipped_urls = 0
+        self.unchanged_pages = 0
+
+    def _summarize(self, visits: List[Tuple[object, Optional[str]]]) -> Optional[UrlHistory]:
+        parsed = [(t, h) for t, h in ((_parse_crawl_time(t), h) for t, h in visits) if t is not None]
+        if not parsed:
+            return None
+        changes = sum(1 for (_, prev), (_, cur) in zip(parsed, parsed[1:]) if cur != prev)
+        first, last = _as_utc(parsed[0][0]), _as_utc(parsed[-1][0])
+        intervals = len(parsed) - 1
+        if intervals == 0:
+            interval = self.default_interval
+        else:
+            rate = estimate_change_rate(intervals, changes, (last - first).total_seconds())
+            interval = 1.0 / rate if rate > 0 else self.max_interval
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        return UrlHistory(visits=len(parsed), changes=changes, first_seen=first, last_seen=last,
+                          last_hash=parsed[-1][1], interval=interval)
+
+    def history(self, url: str) -> Optional[UrlHistory]:
+        """Summary of the URL's previous visits (None when it was never crawled)"""
+        with self._lock:
+            if url in self._cache:
+                self._cache.move_to_end(url)
+                return self._cache[url]
+        summary = self._summarize(self.history_source(url))
+        with self._lock:
+            self._cache[url] = summary
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return summary
+
+    def next_due(self, url: str, lastmod: Optional[str] = None) -> Optional[datetime]:
+        """When the URL should next be fetched; None if it was never crawled"""
+        summary = self.history(url)
+        if summary is None:
+            return None
+        modified = parse_lastmod(lastmod)
+        if modified is not None:
+            if modified > summary.last_seen:
+                return summary.last_seen  # changed since our visit: due now
+            # The sitemap says nothing changed since our visit; still check in occasionally
+            return summary.last_seen + timedelta(seconds=self.max_interval)
+        return summary.last_seen + timedelta(seconds=summary.interval)
+
+    def is_due(self, url: str, lastmod: Optional[str] = None) -> bool:
+        due_at = self.next_due(url, lastmod)
+        if due_at is None:
+            due, counter = True, "new_urls"
+        elif due_at <= self.clock():
+            due, counter = True, "due_urls"
+        else:
+            due, counter = False, "skipped_urls"
+        with self._lock:
+            if url not in self._counted:
+                self._counted[url] = None
+                while len(self._counted) > self.max_cached:
+                    self._counted.popitem(last=False)
+                setattr(self, counter, getattr(self, counter) + 1)
+        return due
+
+    def is_unchanged(self, url: str, content_hash: Optional[str]) -> bool:
+        """True if `content_hash` matches the URL's last recorded visit"""
+        if not content_hash:
+            return False
+        summary = self.history(url)
+        if summary is None or summary.last_hash != content_hash:
+            return False
+        with self._lock:
+            self.unchanged_pages += 1
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "new_urls": self.new_urls,
+                "due_urls": self.due_urls,
+                "skipped_not_due": self.skipped_urls,
+                "unchanged_pages": self.unchanged_pages,
+            }
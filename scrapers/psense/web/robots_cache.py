@@ -0,0 +1,203 @@
+"""
+Per-host robots.txt cache.
+
+The scraper used to read one robots.txt (for base_url's host) in __init__ and
+apply it to every URL, whatever its host. RobotsCache keeps one parsed
+robots.txt per origin (scheme + host) with a TTL, fetches it the first time
+an origin is seen (synchronously for thread callers, with aiohttp for the
+asyncio crawl) and memoizes per-URL decisions, so repeated checks of the same
+URL cost a dict lookup. Crawl-delay values are handed to a callback (the rate
+limiter) as soon as they are known.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib import robotparser
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RobotsEntry:
+    parser: robotparser.RobotFileParser
+    expires_at: float
+    crawl_delay: Optional[float] = None
+    sitemaps: List[str] = field(default_factory=list)
+    status: Optional[int] = None
+    decisions: Dict[str, bool] = field(default_factory=dict)
+
+
+class RobotsCache:
+    """
+    `fetch(robots_url) -> (status, text)` does the synchronous download;
+    status None means the request failed. Unreachable or 5xx robots.txt
+    allows everything and is retried after `error_ttl`; 401/403 disallows
+    everything; other 4xx allow everything (as urllib.robotparser does).
+    `headers_factory()` gives the request headers of the aiohttp download, so
+    robots.txt is asked for with the crawl's own User-Agent.
+    """
+
+    def __init__(self, fetch: Callable[[str], Tuple[Optional[int], str]], user_agent: str = "*",
+                 ttl: float = 24 * 3600, error_ttl: float = 600, timeout: float = 10.0,
+                 on_crawl_delay: Optional[Callable[[str, float], None]] = None,
+                 max_decisions_per_host: int = 100000,
+                 headers_factory: Optional[Callable[[], Dict[str, str]]] = None):
+        self.fetch = fetch
+        self.headers_factory = headers_factory
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.timeout = timeout
+        self.on_crawl_delay = on_crawl_delay
+        self.max_decisions_per_host = max_decisions_per_host
+        self._entries: Dict[str, RobotsEntry] = {}
+        self._lock = threading.Lock()
+        self._origin_locks: Dict[str, threading.Lock] = {}
+        self._async_fetches: Dict[str, "asyncio.Future"] = {}
+        self.fetches = 0
+        self.decision_hits = 0
+
+    @staticmethod
+    def origin(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+    # -------------------- Entries --------------------
+    def _fresh(self, origin: str) -> Optional[RobotsEntry]:
+        entry = self._entries.get(origin)
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry
+        return None
+
+    def _build(self, origin: str, status: Optional[int], text: str) -> RobotsEntry:
+        parser = robotparser.RobotFileParser(origin + "/robots.txt")
+        ttl = self.ttl
+        if status is None or status >= 500:
+            parser.allow_all = True
+            ttl = self.error_ttl
+        elif status in (401, 403):
+            parser.disallow_all = True
+        elif status >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(text.splitlines())
+        parser.modified()
+        delay = None
+        try:
+            delay = parser.crawl_delay(self.user_agent)
+        except Exception:
+            pass
+        return RobotsEntry(
+            parser=parser,
+            expires_at=time.monotonic() + ttl,
+            crawl_delay=float(delay) if delay else None,
+            sitemaps=list(parser.site_maps() or []),
+            status=status,
+        )
+
+    def _store(self, origin: str, entry: RobotsEntry) -> RobotsEntry:
+        with self._lock:
+            self._entries[origin] = entry
+            self.fetches += 1
+        if entry.crawl_delay and self.on_crawl_delay is not None:
+            self.on_crawl_delay(urlparse(origin).netloc, entry.crawl_delay)
+        return entry
+
+    def get(self, url: str) -> RobotsEntry:
+        """The origin's entry, fetching it (once, across threads) if missing or expired"""
+        origin = self.origin(url)
+        entry = self._fresh(origin)
+        if entry is not None:
+            return entry
+        with self._lock:
+            origin_lock = self._origin_locks.setdefault(origin, threading.Lock())
+        with origin_lock:
+            entry = self._fresh(origin)
+            if entry is not None:
+                return entry
+            try:
+                status, text = self.fetch(origin + "/robots.txt")
+            except Exception as e:
+                logger.debug(f"robots.txt fetch failed for {origin}: {e}")
+                status, text = None, ""
+            return self._store(origin, self._build(origin, status, text))
+
+    async def get_async(self, url: str, session) -> RobotsEntry:
+        """Like get(), but downloads with an aiohttp session without blocking the loop"""
+        origin = self.origin(url)
+        entry = self._fresh(origin)
+        if entry is not None:
+            return entry
+        pending = self._async_fetches.get(origin)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._async_fetches[origin] = future
+        try:
+            try:
+                headers = self.headers_factory() if self.headers_factory is not None else None
+                async with session.get(origin + "/robots.txt", headers=headers, timeout=self.timeout) as resp:
+                    status, text = resp.status, await resp.text(errors="replace")
+            except Exception as e:
+                logger.debug(f"robots.txt fetch failed for {origin}: {e}")
+                status, text = None, ""
+            entry = self._store(origin, self._build(origin, status, text))
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._async_fetches.pop(origin, None)
+
+    # -------------------- Decisions --------------------
+    def _decide(self, entry: RobotsEntry, url: str) -> bool:
+        decision = entry.decisions.get(url)
+        if decision is not None:
+            self.decision_hits += 1
+            return decision
+        try:
+            decision = entry.parser.can_fetch(self.user_agent, url)
+        except Exception:
+            decision = True
+        if len(entry.decisions) >= self.max_decisions_per_host:
+            entry.decisions.clear()
+        entry.decisions[url] = decision
+        return decision
+
+    def allowed(self, url: str) -> bool:
+        return self._decide(self.get(url), url)
+
+    async def allowed_async(self, url: str, session) -> bool:
+        return self._decide(await self.get_async(url, session), url)
+
+    def allowed_cached(self, url: str) -> Optional[bool]:
+        """Decision from an already fetched robots.txt, or None if the origin is not known yet"""
+        entry = self._fresh(self.origin(url))
+        return None if entry is None else self._decide(entry, url)
+
+    def crawl_delay(self, host: str) -> Optional[float]:
+        """Known Crawl-delay for a host (any scheme); never triggers a fetch"""
+        for scheme in ("https", "http"):
+            entry = self._fresh(f"{scheme}://{host}")
+            if entry is not None and entry.crawl_delay:
+                return entry.crawl_delay
+        return None
+
+    def sitemaps(self, url: str) -> List[str]:
+        return list(self.get(url).sitemaps)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "origins": len(self._entries),
+                "fetches": self.fetches,
+                "decision_cache_hits": self.decision_hits,
+            }
@@ -10,6 +10,10 @@ Examples:
     python run_scraper.py https://tax.gov.ae/en/taxes/corporate.tax/faqs.aspx --profile tax_gov_ae
     python run_scraper.py https://example.com --profile quick
     python run_scraper.py https://example.com --profile balanced --options concurrency=20 request_delay=0.1
+    python run_scraper.py --resume session_1700000000_enterprise
+    python run_scraper.py https://example.com --profile comprehensive --incremental
+    python run_scraper.py https://example.com --profile comprehensive --processes 4
+    python run_scraper.py https://example.com --profile comprehensive --metrics-port 9108
 """
 
 import sys, io
@@ -68,6 +72,37 @@ except ImportError as e:
         print("❌ Could not import any scraper")
         sys.exit(1)
 
+# Options that only the full-featured scraper implements, with their do-nothing defaults
+FULL_SCRAPER_OPTIONS = {
+    "crawl_mode": "recursive",
+    "persistent_frontier": False,
+    "resume": False,
+    "output_mode": "tree",
+    "incremental": False,
+    "crawl_processes": 1,
+    "metrics_port": None,
+    "metrics_file": None,
+    "parser_backend": "bs4",
+    "adaptive_concurrency": False,
+}
+
+
+def get_full_scraper():
+    """Full-featured scraper, needed for frontier crawls and resumable sessions"""
+    from scrapers.psense.web.scraper import WebScraper as FullWebScraper
+    return FullWebScraper
+
+
+def select_scraper_class(scraper_config: Dict[str, Any]):
+    """Use the full scraper whenever the config asks for something the standalone one lacks"""
+    needs_full = any(scraper_config.get(option, default) not in (default, None)
+                     for option, default in FULL_SCRAPER_OPTIONS.items())
+    if needs_full and WebScraper.__name__ != "WebScraper":
+        print("ℹ️  Switching to sophisticated scraper (options the standalone scraper lacks)")
+        return get_full_scraper()
+    return WebScraper
+
+
 # Enable multilingual support with lazy loading
 MULTILINGUAL_AVAILABLE = True
 MultilingualProcessor = None
@@ -153,6 +188,31 @@ class ConfigManager:
         
         return final_config
     
+    def build_resume_config(self, session_id: str, url: Optional[str] = None, profile: Optional[str] = None,
+                            custom_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Configuration for continuing an interrupted session from its last checkpoint"""
+        from scrapers.psense.web.frontier import PersistentFrontier
+
+        base = self.config.get("scraper", {})
+        options = custom_options or {}
+        db_path = options.get("frontier_db_path") or options.get("database_path") \
+            or base.get("frontier_db_path") or base.get("database_path", "scraper_data.db")
+
+        saved = PersistentFrontier.load_session_config(db_path, session_id)
+        if saved and "scraper" in saved:
+            final_config = saved
+            final_config["scraper"].update(options)
+        elif url:
+            final_config = self.build_config(url, profile, custom_options)
+        else:
+            raise ValueError(f"No checkpoint found for session '{session_id}' in {db_path}; pass the URL to start it")
+
+        final_config["scraper"]["session_id"] = session_id
+        final_config["scraper"]["resume"] = True
+        final_config["scraper"]["persistent_frontier"] = True
+        final_config["scraper"]["crawl_mode"] = "frontier"
+        return final_config
+
     def _apply_domain_optimizations(self, config: Dict[str, Any], url: str):
         """Apply domain-specific optimizations based on URL patterns"""
         domain_configs = self.config.get("domain_specific", {})
@@ -280,6 +340,26 @@ def print_performance_summary(scraper: WebScraper, start_time: float, profile: O
             print("📑 Content Types:")
             for content_type, count in content_dist.items():
                 print(f"   - {content_type}: {count}")
+        
+        recrawl = stats.get('recrawl')
+        if recrawl:
+            print(f"🔁 Recrawl: {recrawl['new_urls']} new, {recrawl['due_urls']} due, "
+                  f"{recrawl['skipped_not_due']} not due, {recrawl['unchanged_pages']} unchanged")
+
+        stages = stats.get('metrics', {}).get('stages')
+        if stages:
+            print("⏱️  Stage latencies (count, p50 / p95, total):")
+            for stage, hist in sorted(stages.items(), key=lambda item: -item[1]['total_seconds']):
+                print(f"   - {stage}: {hist['count']}, {hist['p50'] * 1000:.0f} / {hist['p95'] * 1000:.0f} ms, "
+                      f"{hist['total_seconds']:.1f}s")
+
+        http_pool = stats.get('http_pool')
+        if http_pool:
+            for kind in ("sync", "async"):
+                pool = http_pool[kind]
+                if pool["requests"]:
+                    print(f"🔌 Connections ({kind}): {pool['reused_connections']} reused, "
+                          f"{pool['new_connections']} opened for {pool['requests']} requests")
     
     print("="*60)
 
@@ -301,6 +381,15 @@ Examples:
   
   # Custom configuration with multiple options
   python run_scraper.py https://example.com --options max_depth=3 request_delay=0.1 concurrency=15
+  
+  # Continue an interrupted crawl from its last checkpoint
+  python run_scraper.py --resume session_1700000000_enterprise
+  
+  # Nightly recrawl: only fetch pages that are due, based on their change history
+  python run_scraper.py https://example.com --profile comprehensive --incremental
+  
+  # Watch per-stage latencies while crawling (curl http://127.0.0.1:9108/metrics)
+  python run_scraper.py https://example.com --profile comprehensive --metrics-port 9108
         """
     )
     
@@ -311,6 +400,15 @@ Examples:
     parser.add_argument("--list-profiles", action="store_true", help="List available profiles and exit")
     parser.add_argument("--show-profile", help="Show details of a specific profile")
     parser.add_argument("--dry-run", action="store_true", help="Show configuration without running scraper")
+    parser.add_argument("--resume", metavar="SESSION_ID", help="Resume an interrupted crawl from its last checkpoint")
+    parser.add_argument("--processes", type=int, metavar="N",
+                        help="Crawl with N worker processes, each owning a shard of the hosts")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Recrawl only URLs due according to their change history in the crawl database")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="Serve live crawl metrics as JSON on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="Rewrite a JSON snapshot of the live crawl metrics to PATH every few seconds")
     
     args = parser.parse_args()
     
@@ -331,17 +429,28 @@ Examples:
         return
     
     # Validate URL is provided for scraping operations
-    if not args.url:
+    if not args.url and not args.resume:
         print("❌ URL is required for scraping operations")
         parser.print_help()
         sys.exit(1)
     
     # Parse custom options
     custom_options = parse_custom_options(args.options)
+    if args.incremental:
+        custom_options["incremental"] = True
+    if args.processes:
+        custom_options["crawl_processes"] = args.processes
+    if args.metrics_port is not None:
+        custom_options["metrics_port"] = args.metrics_port
+    if args.metrics_file:
+        custom_options["metrics_file"] = args.metrics_file
     
     # Build configuration
     try:
-        config = config_manager.build_config(args.url, args.profile, custom_options)
+        if args.resume:
+            config = config_manager.build_resume_config(args.resume, args.url, args.profile, custom_options)
+        else:
+            config = config_manager.build_config(args.url, args.profile, custom_options)
     except Exception as e:
         print(f"❌ Configuration error: {e}")
         sys.exit(1)
@@ -349,7 +458,11 @@ Examples:
     # Print configuration summary
     print("🚀 WEB SCRAPER CONFIGURATION")
     print("=" * 40)
-    print(f"🌐 Target URL: {args.url}")
+    print(f"🌐 Target URL: {config['scraper'].get('url')}")
+    if args.resume:
+        print(f"♻️  Resuming session: {args.resume}")
+    if config['scraper'].get('incremental'):
+        print("🔁 Incremental recrawl: only pages due for a revisit are fetched")
     if args.profile:
         config_manager.print_profile_info(args.profile)
     
@@ -383,7 +496,8 @@ Examples:
     
     try:
         # Initialize and run scraper
-        scraper = WebScraper(config)
+        scraper_class = select_scraper_class(config["scraper"])
+        scraper = scraper_class(config)
         result = scraper.crawl()
         
         if result:
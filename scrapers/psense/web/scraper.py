@@ -21,8 +21,9 @@ import logging
 import tempfile
 import requests
 import backoff
-import pandas as pd
 import json
+import copy
+import itertools
 import random
 import threading
 import hashlib
@@ -31,23 +32,21 @@ import asyncio
 import xml.etree.ElementTree as ET
 from collections import defaultdict
 from urllib.parse import urljoin, urlparse, parse_qs, urlencode
-from io import BytesIO
 from datetime import datetime, timedelta
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Sequence
 from enum import Enum
 from dataclasses import dataclass
 import sqlite3
+import queue
 import pickle
 from pathlib import Path
 from typing import TYPE_CHECKING
 from aiohttp import ClientSession
 
 
-from bs4 import BeautifulSoup, Comment
+from bs4 import BeautifulSoup
 from simhash import Simhash
-from PIL import Image as PILImage, UnidentifiedImageError
 
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import concurrent.futures
 
@@ -232,6 +231,120 @@ except ImportError:
     MultilingualProcessor = None
     MULTILINGUAL_AVAILABLE = False
 
+# URL frontier used by the asyncio crawl engine
+try:
+    from .frontier import CrawlFrontier, FrontierEntry, PersistentFrontier, SharedFrontier
+except ImportError:
+    from frontier import CrawlFrontier, FrontierEntry, PersistentFrontier, SharedFrontier
+
+# Parse-once page context shared by dedup, classification and parsing
+try:
+    from .page_context import PageContext
+except ImportError:
+    from page_context import PageContext
+
+# Banded simhash index for near-duplicate detection
+try:
+    from .simhash_index import SimhashIndex
+except ImportError:
+    from simhash_index import SimhashIndex
+
+# In-memory prefilter for cross-session URL dedup
+try:
+    from .url_filter import UrlBloomFilter
+except ImportError:
+    from url_filter import UrlBloomFilter
+
+# Page cache with ETag / Last-Modified revalidation
+try:
+    from .page_cache import CacheEntry, PageCache, content_hash
+except ImportError:
+    from page_cache import CacheEntry, PageCache, content_hash
+
+# Pooled Playwright renderer for dynamic_rendering
+try:
+    from .browser_pool import AsyncBrowserPool, BrowserPool, PLAYWRIGHT_AVAILABLE
+except ImportError:
+    from browser_pool import AsyncBrowserPool, BrowserPool, PLAYWRIGHT_AVAILABLE
+
+# Single-pass walk emitting content blocks in document order
+try:
+    from .content_walker import find_all_tags, tag_classes, tag_name, tag_text
+except ImportError:
+    from content_walker import find_all_tags, tag_classes, tag_name, tag_text
+
+# Table extraction from the parsed tree (pandas.read_html as a fallback)
+try:
+    from .table_extractor import extract_table, read_html_table
+except ImportError:
+    from table_extractor import extract_table, read_html_table
+
+# Multi-keyword counting for content classification
+try:
+    from .keyword_matcher import KeywordMatcher
+except ImportError:
+    from keyword_matcher import KeywordMatcher
+
+# Per-host token-bucket rate limiting
+try:
+    from .rate_limiter import HostRateLimiter
+except ImportError:
+    from rate_limiter import HostRateLimiter
+
+# Adaptive (AIMD) per-host concurrency limits
+try:
+    from .concurrency_limiter import OVERLOAD_STATUSES, AdaptiveConcurrencyLimiter
+except ImportError:
+    from concurrency_limiter import OVERLOAD_STATUSES, AdaptiveConcurrencyLimiter
+
+# Per-host robots.txt cache with memoized decisions
+try:
+    from .robots_cache import RobotsCache
+except ImportError:
+    from robots_cache import RobotsCache
+
+# Streaming sitemap reader (iterparse, gzip, concurrent child sitemaps)
+try:
+    from .sitemap import SitemapEntry, SitemapReader, http_opener
+except ImportError:
+    from sitemap import SitemapEntry, SitemapReader, http_opener
+
+# Change-history driven incremental recrawls
+try:
+    from .recrawl import UNCHANGED, RecrawlScheduler
+except ImportError:
+    from recrawl import UNCHANGED, RecrawlScheduler
+
+# Streaming per-page output
+try:
+    from .output_sink import NDJSON, TREE, open_output_sink
+except ImportError:
+    from output_sink import NDJSON, TREE, open_output_sink
+
+# Host-sharded multi-process crawls over a shared frontier
+try:
+    from .sharding import HostShardRing, run_sharded_crawl
+except ImportError:
+    from sharding import HostShardRing, run_sharded_crawl
+
+# Connection pools sized to the crawl's concurrency, with reuse counters
+try:
+    from .http_pool import ConnectionStats, PooledHTTPAdapter, aiohttp_trace_config, pool_sizes
+except ImportError:
+    from http_pool import ConnectionStats, PooledHTTPAdapter, aiohttp_trace_config, pool_sizes
+
+# Per-stage latency histograms, published live while crawling
+try:
+    from .metrics import CrawlMetrics, MetricsReporter
+except ImportError:
+    from metrics import CrawlMetrics, MetricsReporter
+
+# Concurrent, deduplicated image fetching with deferred OCR
+try:
+    from .image_pipeline import ImagePipeline, ImageStore, StoredImage
+except ImportError:
+    from image_pipeline import ImagePipeline, ImageStore, StoredImage
+
 if TYPE_CHECKING:
     import aiohttp
 
@@ -250,33 +363,99 @@ class CircuitBreakerConfig:
     expected_exception: type = requests.exceptions.RequestException
 
 
+class CircuitBreakerOpenError(Exception):
+    """Raised when a call is rejected because the host's breaker is open"""
+
+
+class FetchFailedError(Exception):
+    """A frontier URL could not be fetched (error, open breaker, robots block); already logged"""
+
+
 class CircuitBreaker:
-    """Circuit breaker pattern implementation for resilient network operations"""
+    """
+    Circuit breaker pattern implementation for resilient network operations.
+
+    The lock only guards state transitions; it is never held while the wrapped
+    call runs, so concurrent fetches through one breaker proceed in parallel.
+    """
     
-    def __init__(self, config: CircuitBreakerConfig):
+    def __init__(self, config: CircuitBreakerConfig, name: str = ""):
         self.config = config
+        self.name = name
         self.state = CircuitBreakerState.CLOSED
         self.failure_count = 0
         self.last_failure_time = None
         self.lock = threading.Lock()
+        self._trial_in_flight = False
     
     def __call__(self, func):
         def wrapper(*args, **kwargs):
-            with self.lock:
-                if self.state == CircuitBreakerState.OPEN:
-                    if self._should_attempt_reset():
-                        self.state = CircuitBreakerState.HALF_OPEN
-                    else:
-                        raise Exception("Circuit breaker is OPEN")
-                
-                try:
-                    result = func(*args, **kwargs)
-                    self._on_success()
-                    return result
-                except self.config.expected_exception as e:
-                    self._on_failure()
-                    raise e
+            trial = self.before_call()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if isinstance(e, self.config.expected_exception) and not self.counts_as_failure(e):
+                    self.record_success()
+                else:
+                    # Unexpected errors count against the host too (and end a HALF_OPEN trial)
+                    self.record_failure()
+                raise
+            except BaseException:
+                if trial:
+                    self.release_trial()
+                raise
+            self.record_success()
+            return result
         return wrapper
+
+    def before_call(self) -> bool:
+        """
+        Admit a call or raise CircuitBreakerOpenError. Lock-free while CLOSED.
+        Returns True if the call is the HALF_OPEN trial, which must end in
+        record_success, record_failure or release_trial.
+        """
+        if self.state == CircuitBreakerState.CLOSED:
+            return False
+        with self.lock:
+            if self.state == CircuitBreakerState.OPEN:
+                if not self._should_attempt_reset():
+                    raise CircuitBreakerOpenError(f"Circuit breaker is OPEN for {self.name or 'host'}")
+                self.state = CircuitBreakerState.HALF_OPEN
+                self._trial_in_flight = True
+            elif self.state == CircuitBreakerState.HALF_OPEN:
+                # Only one trial request probes a recovering host
+                if self._trial_in_flight:
+                    raise CircuitBreakerOpenError(f"Circuit breaker is HALF_OPEN for {self.name or 'host'}")
+                self._trial_in_flight = True
+            else:
+                return False
+            return True
+
+    def record_success(self):
+        if self.state == CircuitBreakerState.CLOSED and self.failure_count == 0:
+            return
+        with self.lock:
+            self._on_success()
+
+    def record_failure(self):
+        with self.lock:
+            self._on_failure()
+
+    def release_trial(self):
+        """The trial call ended without an outcome (e.g. cancelled); let the next call probe instead"""
+        with self.lock:
+            self._trial_in_flight = False
+
+    @staticmethod
+    def counts_as_failure(exc: BaseException) -> bool:
+        """Client errors (404, 403...) say nothing about host health; 429 and 5xx do"""
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+        if status is None:
+            status = getattr(exc, "status", None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+        return True
     
     def _should_attempt_reset(self):
         return (
@@ -287,13 +466,47 @@ class CircuitBreaker:
     def _on_success(self):
         self.failure_count = 0
         self.state = CircuitBreakerState.CLOSED
+        self._trial_in_flight = False
     
     def _on_failure(self):
         self.failure_count += 1
         self.last_failure_time = time.time()
-        if self.failure_count >= self.config.failure_threshold:
+        self._trial_in_flight = False
+        if self.state == CircuitBreakerState.HALF_OPEN or self.failure_count >= self.config.failure_threshold:
             self.state = CircuitBreakerState.OPEN
 
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "failure_count": self.failure_count,
+            "last_failure_time": self.last_failure_time,
+        }
+
+
+class CircuitBreakerRegistry:
+    """One CircuitBreaker per host, so a failing domain never trips the others"""
+
+    def __init__(self, config: CircuitBreakerConfig):
+        self.config = config
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> CircuitBreaker:
+        host = host.lower()
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(host, CircuitBreaker(self.config, name=host))
+        return breaker
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        return self.get(urlparse(url).netloc)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.snapshot() for host, breaker in breakers.items()}
+
 
 # Phase 2: Content Intelligence - Advanced Content Classification
 class ContentType(Enum):
@@ -318,17 +531,31 @@ class ContentClassifier:
             ContentType.FORUM: ["forum", "thread", "reply", "member"],
             ContentType.DOCUMENTATION: ["docs", "api", "reference", "guide"]
         }
+        # One matcher for every keyword; each keyword adds to the types listing it
+        self.matcher = KeywordMatcher(k for keywords in self.patterns.values() for k in keywords)
+        self._keyword_types = [
+            [content_type for content_type, keywords in self.patterns.items() if keyword in keywords]
+            for keyword in self.matcher.keywords
+        ]
     
-    def classify_content(self, soup: BeautifulSoup, url: str) -> ContentType:
-        """Classify content based on structure and text patterns"""
-        text = soup.get_text().lower()
-        classes = " ".join([tag.get("class", []) for tag in soup.find_all() if tag.get("class")])
+    def classify_content(self, soup: BeautifulSoup, url: str, text: Optional[str] = None,
+                         class_tokens: Optional[List[str]] = None) -> ContentType:
+        """
+        Classify content based on structure and text patterns.
+        Pass the page's already extracted text/class tokens to avoid re-walking the tree.
+        """
+        text = (text if text is not None else soup.get_text()).lower()
+        if class_tokens is None:
+            class_tokens = [c for tag in soup.find_all(class_=True) for c in tag.get("class", [])]
+        text_counts = self.matcher.counts(text)
+        class_counts = self.matcher.counts(" ".join(class_tokens))
         
         scores = {content_type: 0 for content_type in ContentType}
         
-        for content_type, keywords in self.patterns.items():
-            for keyword in keywords:
-                scores[content_type] += text.count(keyword) + classes.count(keyword)
+        for content_types, in_text, in_classes in zip(self._keyword_types, text_counts, class_counts):
+            if in_text or in_classes:
+                for content_type in content_types:
+                    scores[content_type] += in_text + in_classes
         
         # URL-based classification
         url_lower = url.lower()
@@ -345,11 +572,48 @@ class ContentClassifier:
 
 # Phase 3: Database Integration for Scalability
 class DatabaseManager:
-    """SQLite-based persistence layer for crawl data"""
+    """
+    SQLite-based persistence layer for crawl data.
+
+    Writes are queued to a single writer thread that batches them into one
+    transaction per flush, so crawl workers never wait on a commit. Reads use
+    one persistent connection per thread (with sqlite3's prepared-statement
+    cache), all in WAL mode so readers and the writer do not block each other.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-16000",
+        "PRAGMA busy_timeout=5000",
+    )
+    _STOP = object()
     
-    def __init__(self, db_path: str = "scraper_data.db"):
+    def __init__(self, db_path: str = "scraper_data.db", batch_size: int = 500,
+                 flush_interval: float = 0.5, queue_size: int = 10000,
+                 metrics: Optional[CrawlMetrics] = None):
         self.db_path = db_path
+        self.metrics = metrics
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
         self._init_database()
+
+        self._local = threading.local()
+        self._read_conns = []
+        self._read_conns_lock = threading.Lock()
+        self._closed = False
+        self.url_filter: Optional[UrlBloomFilter] = None
+        # Bounded: a stalled disk applies back-pressure instead of growing memory
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(target=self._writer_loop, name="DatabaseManager-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
     
     def _init_database(self):
         """Initialize database schema"""
@@ -387,59 +651,214 @@ class DatabaseManager:
                 
                 CREATE INDEX IF NOT EXISTS idx_url_hash ON crawled_urls(content_hash);
                 CREATE INDEX IF NOT EXISTS idx_session_url ON crawled_urls(session_id, url);
+                CREATE INDEX IF NOT EXISTS idx_crawled_url ON crawled_urls(url);
             """)
-    
+
+    # -------------------- Writer thread --------------------
+    def _submit(self, sql: str, params: tuple):
+        if self._closed:
+            # Late writes after close() still land, just synchronously
+            with self._connect() as conn:
+                conn.execute(sql, params)
+            return
+        self._queue.put((sql, params))
+
+    def _writer_loop(self):
+        conn = self._connect()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size and batch[-1] is not self._STOP \
+                        and not isinstance(batch[-1], threading.Event):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                writes = [item for item in batch if isinstance(item, tuple)]
+                if writes:
+                    self._write_batch(conn, writes)
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                if batch[-1] is self._STOP:
+                    return
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, writes: List[Tuple[str, tuple]]):
+        """One transaction per batch; runs of the same statement use executemany"""
+        if self.metrics is None:
+            return self._write_batch_timed(conn, writes)
+        with self.metrics.timed("db_write"):
+            self._write_batch_timed(conn, writes)
+
+    def _write_batch_timed(self, conn: sqlite3.Connection, writes: List[Tuple[str, tuple]]):
+        try:
+            with conn:
+                start = 0
+                while start < len(writes):
+                    end = start
+                    while end < len(writes) and writes[end][0] == writes[start][0]:
+                        end += 1
+                    conn.executemany(writes[start][0], [params for _, params in writes[start:end]])
+                    start = end
+        except sqlite3.Error as e:
+            logger.warning(f"Batched database write failed ({e}); retrying statements individually")
+            for sql, params in writes:
+                try:
+                    with conn:
+                        conn.execute(sql, params)
+                except sqlite3.Error as row_error:
+                    logger.warning(f"Dropping database write: {row_error}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every write queued so far is committed"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Flush pending writes, stop the writer and close read connections"""
+        if self._closed:
+            return
+        self._queue.put(self._STOP)
+        self._writer.join()
+        self._closed = True
+        with self._read_conns_lock:
+            for conn in self._read_conns:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._read_conns.clear()
+
+    # -------------------- Reads --------------------
+    def _read_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._read_conns_lock:
+                self._read_conns.append(conn)
+        return conn
+
+    def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run a read-only query on this thread's persistent connection"""
+        if self._closed:
+            with sqlite3.connect(self.db_path) as conn:
+                return conn.execute(sql, params).fetchall()
+        return self._read_conn().execute(sql, params).fetchall()
+
+    # -------------------- Crawl records --------------------
     def start_session(self, session_id: str, config: dict):
         """Start a new crawl session"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO crawl_sessions (session_id, start_time, config) VALUES (?, ?, ?)",
-                (session_id, datetime.now(), json.dumps(config))
-            )
+        self._submit(
+            "INSERT OR REPLACE INTO crawl_sessions (session_id, start_time, config) VALUES (?, ?, ?)",
+            (session_id, datetime.now(), json.dumps(config))
+        )
     
     def end_session(self, session_id: str):
         """End a crawl session"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "UPDATE crawl_sessions SET end_time = ? WHERE session_id = ?",
-                (datetime.now(), session_id)
-            )
+        self._submit(
+            "UPDATE crawl_sessions SET end_time = ? WHERE session_id = ?",
+            (datetime.now(), session_id)
+        )
     
     def log_crawled_url(self, session_id: str, url: str, content_type: str, 
                        status_code: int, content_hash: str, response_size: int):
         """Log a successfully crawled URL"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """INSERT INTO crawled_urls 
-                   (session_id, url, content_type, status_code, content_hash, crawl_time, response_size)
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (session_id, url, content_type, status_code, content_hash, datetime.now(), response_size)
-            )
+        if self.url_filter is not None:
+            self.url_filter.add(url)
+        self._submit(
+            """INSERT INTO crawled_urls 
+               (session_id, url, content_type, status_code, content_hash, crawl_time, response_size)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (session_id, url, content_type, status_code, content_hash, datetime.now(), response_size)
+        )
     
     def log_failed_url(self, session_id: str, url: str, error_message: str, attempt_count: int):
         """Log a failed URL attempt"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """INSERT OR REPLACE INTO failed_urls 
-                   (session_id, url, error_message, attempt_count, last_attempt)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (session_id, url, error_message, attempt_count, datetime.now())
-            )
+        self._submit(
+            """INSERT OR REPLACE INTO failed_urls 
+               (session_id, url, error_message, attempt_count, last_attempt)
+               VALUES (?, ?, ?, ?, ?)""",
+            (session_id, url, error_message, attempt_count, datetime.now())
+        )
     
-    def is_url_crawled(self, url: str, content_hash: Optional[str] = None) -> bool:
-        """Check if URL was already crawled"""
+    def preload_url_filter(self, error_rate: float = 0.01, max_bytes: int = 64 * 1024 * 1024,
+                           headroom: int = 100000) -> UrlBloomFilter:
+        """
+        Load every crawled URL into an in-memory Bloom filter so is_url_crawled
+        only queries the database when the filter reports a (possible) hit.
+        """
+        self.flush()
+        count = self.query("SELECT COUNT(*) FROM crawled_urls")[0][0]
+        url_filter = UrlBloomFilter(count + headroom, error_rate=error_rate, max_bytes=max_bytes)
         with sqlite3.connect(self.db_path) as conn:
-            if content_hash:
-                result = conn.execute(
-                    "SELECT 1 FROM crawled_urls WHERE url = ? OR content_hash = ?",
-                    (url, content_hash)
-                ).fetchone()
-            else:
-                result = conn.execute(
-                    "SELECT 1 FROM crawled_urls WHERE url = ?",
-                    (url,)
-                ).fetchone()
-            return result is not None
+            cursor = conn.execute("SELECT url FROM crawled_urls")
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                url_filter.update(url for (url,) in rows if url)
+        self.url_filter = url_filter
+        logger.info(
+            f"Preloaded {len(url_filter)} crawled URLs into a {url_filter.size_bytes / 1048576:.1f} MB filter "
+            f"(~{url_filter.estimated_error_rate:.2%} false positives)"
+        )
+        return url_filter
+
+    def is_url_crawled(self, url: str, content_hash: Optional[str] = None) -> bool:
+        """Check if URL was already crawled (writes still queued may not be visible yet)"""
+        if self.url_filter is not None and not content_hash and url not in self.url_filter:
+            return False
+        conn = self._read_conn() if not self._closed else None
+        if conn is None:
+            with sqlite3.connect(self.db_path) as conn:
+                return self._is_url_crawled(conn, url, content_hash)
+        return self._is_url_crawled(conn, url, content_hash)
+
+    def iter_crawled_urls(self, batch_size: int = 10000):
+        """Every distinct URL in crawled_urls, streamed in batches"""
+        self.flush()
+        # Consumers may advance the generator from different executor threads
+        with sqlite3.connect(self.db_path, check_same_thread=False) as conn:
+            cursor = conn.execute("SELECT DISTINCT url FROM crawled_urls")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for (url,) in rows:
+                    if url:
+                        yield url
+
+    def url_history(self, url: str, limit: int = 20) -> List[Tuple[str, Optional[str]]]:
+        """The URL's last `limit` visits as (crawl_time, content_hash), oldest first"""
+        if self.url_filter is not None and url not in self.url_filter:
+            return []
+        rows = self.query(
+            "SELECT crawl_time, content_hash FROM crawled_urls WHERE url = ? ORDER BY crawl_time DESC LIMIT ?",
+            (url, limit)
+        )
+        return rows[::-1]
+
+    @staticmethod
+    def _is_url_crawled(conn: sqlite3.Connection, url: str, content_hash: Optional[str]) -> bool:
+        # Two indexed lookups instead of one OR that cannot use a single index
+        if conn.execute("SELECT 1 FROM crawled_urls WHERE url = ? LIMIT 1", (url,)).fetchone():
+            return True
+        if content_hash:
+            return conn.execute(
+                "SELECT 1 FROM crawled_urls WHERE content_hash = ? LIMIT 1", (content_hash,)
+            ).fetchone() is not None
+        return False
 
 
 class WebScraper:
@@ -451,27 +870,84 @@ class WebScraper:
       - url (required)
       - max_depth (int)
       - follow_links (bool)
-      - request_delay (float) seconds between requests
+      - request_delay (float) seconds between requests to one host (default spacing of the rate limiter)
+      - rate_limit_rps (float) per-host requests/second, overrides request_delay (0 = unlimited)
+      - rate_limit_burst (int) requests a host may receive back to back before the rate applies (default 1)
       - dynamic_rendering (bool) (try Playwright if available)
+      - browser_pool_size (int) browser contexts kept alive for dynamic rendering (default 4)
+      - browser_pages_per_context (int) pages rendered before a context is recycled (default 50)
       - allowed_domains (list)
       - allowed_languages (list)  # not enforced by default - placeholder
       - ignore_file_extensions (list)
       - extract_tables (bool)
       - extract_images (bool)
-      - ocr_images (bool)
+      - ocr_images (bool) OCR each distinct image once, in the background
+      - image_store_dir (str) content-addressed image store (default: <tmp>/psense_images)
+      - max_image_bytes (int) images larger than this are skipped (default 5 MB)
+      - image_workers (int) concurrent image downloads (default 8)
+      - ocr_workers (int) / ocr_batch_size (int) background OCR pool size and batch size
       - convert_svg (bool)
       - connection_timeout (float) (requests timeout)
       - retry_tries (int)
       - retry_backoff_seconds (float)
       - output_format (json|text)
       - output_path (str)
-      - noise_keywords (list)
+      - output_mode (tree|ndjson|pages) tree keeps the site in memory and writes it at the end; ndjson streams
+        one JSON line per page to output_path and pages writes one JSON file per page into the output_path
+        directory. Streamed pages reference their parent by ID (normalized URL) and are released once written.
+      - noise_keywords (list) id/class substrings marking content tags as noise; their whole subtree is skipped
+      - parser_backend (bs4|lxml) lxml parses and extracts pages with lxml.html directly, skipping
+        BeautifulSoup (same Document); pages fall back to bs4 when enable_multilingual is on
       - verbose (bool)
       - concurrency (int) number of threads for crawling
+      - per_domain_max (int) in-flight requests per host (default 2)
+      - adaptive_concurrency (bool) replace the fixed per_domain_max with a per-host AIMD limit: it starts at
+        per_domain_max, grows by one per round of healthy responses and halves on 429/503, timeouts or a p95
+        fetch latency above adaptive_latency_tolerance x the host's best p95 (default 2.0)
+      - adaptive_max_per_domain / adaptive_min_per_domain (int) bounds of the adaptive limit (defaults:
+        concurrency / 1)
+      - http_pool_connections / http_pool_maxsize (int) requests connection pools kept and idle connections kept
+        per host; sized from concurrency, per_domain_max and the image/sitemap workers by default
+      - dns_cache_ttl (float) seconds DNS lookups are cached, by the requests adapter and the async crawl's
+        connector (default 300; 0 resolves every new connection)
+      - keepalive_timeout (float) seconds an idle async connection is kept alive (default 30)
       - cache_dir (str) if provided will cache HTML responses
-      - cache_ttl (int) seconds TTL for cache files
+      - cache_ttl (int) seconds TTL for cache files; expired entries are revalidated with ETag/Last-Modified
+      - cache_max_mb (float) page cache size budget; least recently used entries are evicted (default 1024)
+      - cache_compression (str) "zstd" (default when zstandard is installed), "gzip" or "none"
+      - cache_parsed_documents (bool) reuse the cached parse result when a page's content hash is unchanged
       - respect_robots (bool)
       - user_agents (list) optional user-agent rotation
+      - robots_user_agent (str) agent matched against robots.txt rules (default: first of user_agents, else "*")
+      - robots_ttl (float) seconds a host's robots.txt stays cached (default 86400)
+      - sitemaps (list) sitemap URLs to read in addition to those declared in robots.txt
+      - seed_from_sitemaps (bool) sitemap-first crawl: sitemap URLs are queued by their <priority> ahead of
+        discovered links (falls back to /sitemap.xml when none are declared)
+      - sitemap_workers (int) / sitemap_max_urls (int) concurrent child-sitemap readers and an optional URL cap;
+        the recursive crawl holds every sitemap URL as a child of the root, so there the cap defaults to 50
+      - sitemap_frontier_limit (int) pause sitemap seeding while this many URLs are queued (default 10000)
+      - crawl_mode (recursive|frontier) frontier uses an explicit URL queue drained by asyncio workers
+      - frontier_workers (int) number of asyncio workers (max in-flight requests) in frontier mode
+      - persistent_frontier (bool) journal the frontier to SQLite (implies crawl_mode=frontier)
+      - crawl_processes (int) run the crawl in this many worker processes, each owning a consistent-hash shard
+        of the hosts and sharing one SQLite frontier (implies persistent_frontier; tree output becomes ndjson)
+      - checkpoint_interval (float) seconds between dedup-state checkpoints of a persistent frontier
+      - resume (bool) continue session_id from its last checkpoint instead of starting over
+      - persist_simhashes (bool) store page simhashes in the crawl DB so near-duplicate detection spans sessions
+      - incremental (bool) recrawl only URLs that are due according to their change history in crawled_urls
+        (and sitemap <lastmod>); pages whose content is unchanged are logged as "unchanged" visits, not re-parsed.
+        Known URLs of the crawled hosts that are due are seeded from crawled_urls, so they are refetched even
+        when the pages linking to them are not. Implies enable_database and crawl_mode=frontier
+      - recrawl_min_interval / recrawl_max_interval / recrawl_default_interval (float) seconds; bounds on the
+        estimated change interval and the interval used for URLs visited only once (defaults 1h / 30d / 1d)
+      - db_batch_size (int) / db_flush_interval (float) / db_queue_size (int) batched database writer tuning
+      - metrics_file (str) rewrite a JSON snapshot of the live crawl metrics (per-stage and per-host latency
+        histograms, bytes/sec, queue depth, in-flight fetches) every metrics_interval seconds (default 5)
+      - metrics_port (int) serve the same snapshot on http://127.0.0.1:<port>/metrics while crawling
+        (sharded crawls: one file per worker, ports port..port+N-1)
+      - metrics_max_hosts (int) hosts broken out individually in the metrics (default 500)
+      - url_prefilter (bool) preload crawled URLs into an in-memory Bloom filter (default True)
+      - url_filter_error_rate (float) / url_filter_max_mb (float) prefilter false-positive target and memory cap
     """
 
     def __init__(self, config: dict):
@@ -481,6 +957,17 @@ class WebScraper:
         self.follow_links = s.get("follow_links", False)
         self.request_delay = s.get("request_delay", 0.1)
         self.dynamic_rendering = s.get("dynamic_rendering", False)
+        self.browser_pool_size = s.get("browser_pool_size", 4)
+        self.browser_pages_per_context = s.get("browser_pages_per_context", 50)
+        self.browser_pool = None
+        self._async_browser_pool = None
+        if self.dynamic_rendering:
+            if PLAYWRIGHT_AVAILABLE:
+                # One browser for the whole crawl; started on the first render
+                self.browser_pool = BrowserPool(size=self.browser_pool_size,
+                                                pages_per_context=self.browser_pages_per_context)
+            else:
+                logger.warning("dynamic_rendering requested but Playwright is not installed; using plain HTTP")
 
         self.allowed_domains = set(s.get("allowed_domains", []))
         self.allowed_languages = s.get("allowed_languages", [])
@@ -497,8 +984,13 @@ class WebScraper:
 
         self.output_format = s.get("output_format", "json")
         self.output_path = s.get("output_path", "./output.json")
+        self.output_mode = s.get("output_mode", TREE)
+        self.output_sink = None
 
         self.noise_keywords = s.get("noise_keywords", ["nav", "menu", "footer", "header", "sidebar", "cookie", "advert"])
+        self.parser_backend = s.get("parser_backend", "bs4")
+        if self.parser_backend not in ("bs4", "lxml"):
+            raise ValueError(f"parser_backend must be 'bs4' or 'lxml', not {self.parser_backend!r}")
         self.verbose = s.get("verbose", True)
 
         self.concurrency = max(1, int(s.get("concurrency", 1)))
@@ -507,6 +999,26 @@ class WebScraper:
         self.respect_robots = s.get("respect_robots", False)
         self.user_agents = s.get("user_agents", [])
 
+        # Frontier crawl engine
+        self.crawl_mode = s.get("crawl_mode", "recursive")
+        self.frontier_workers = max(1, int(s.get("frontier_workers", 100)))
+        self.resume = s.get("resume", False)
+        self.crawl_processes = max(1, int(s.get("crawl_processes", 1)))
+        # Set (by the coordinator) in the worker processes of a sharded crawl
+        self.shard_index: Optional[int] = s.get("shard_index")
+        self.persistent_frontier = s.get("persistent_frontier", False) or self.resume or self.crawl_processes > 1
+        if self.crawl_processes > 1 and self.output_mode == TREE:
+            logger.info("Sharded crawl cannot assemble one document tree; switching output_mode to 'ndjson'")
+            self.output_mode = NDJSON
+        if self.persistent_frontier and self.crawl_mode != "frontier":
+            logger.info("Persistent frontier requested; switching crawl_mode to 'frontier'")
+            self.crawl_mode = "frontier"
+        self.checkpoint_interval = s.get("checkpoint_interval", 60)
+        self.incremental = s.get("incremental", False)
+        if self.incremental and self.crawl_mode != "frontier":
+            logger.info("Incremental recrawl requested; switching crawl_mode to 'frontier'")
+            self.crawl_mode = "frontier"
+
         # Added for enhancement B: Proxy rotation
         self.proxies = s.get("proxies", [])
         self.proxy_lock = threading.Lock()  # Thread-safe proxy rotation
@@ -514,6 +1026,22 @@ class WebScraper:
         # Added for enhancement C: Domain-aware rate limiting
         self.per_domain_max = s.get("per_domain_max", 2)
         self.domain_semaphores = defaultdict(lambda: threading.Semaphore(self.per_domain_max))
+        # Adaptive mode: per-host limits found at crawl time take the semaphores' place
+        self.concurrency_limiter = None
+        self.host_concurrency_max = self.per_domain_max
+        if s.get("adaptive_concurrency", False):
+            self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+                initial=self.per_domain_max,
+                max_limit=s.get("adaptive_max_per_domain", self.concurrency),
+                min_limit=s.get("adaptive_min_per_domain", 1),
+                latency_tolerance=s.get("adaptive_latency_tolerance", 2.0),
+            )
+            self.host_concurrency_max = self.concurrency_limiter.max_limit
+        # Rate (token bucket per host) is separate from concurrency (semaphores above)
+        self.rate_limiter = HostRateLimiter(
+            rate=s.get("rate_limit_rps", 1.0 / self.request_delay if self.request_delay > 0 else 0.0),
+            burst=s.get("rate_limit_burst", 1)
+        )
 
         # Added for enhancement: Language detection
         self.allowed_languages = s.get("allowed_languages", [])
@@ -525,16 +1053,37 @@ class WebScraper:
             recovery_timeout=s.get("circuit_breaker_timeout", 60),
             expected_exception=requests.exceptions.RequestException
         )
-        self.circuit_breaker = CircuitBreaker(circuit_config) if self.enable_circuit_breaker else None
+        self.circuit_breakers = CircuitBreakerRegistry(circuit_config) if self.enable_circuit_breaker else None
 
         # Phase 2: Content Intelligence
         self.enable_content_classification = s.get("enable_content_classification", True)
         self.content_classifier = ContentClassifier() if self.enable_content_classification else None
 
+        # Stage timings for the whole crawl; published live only when a file or port is configured
+        self.metrics = CrawlMetrics(max_hosts=s.get("metrics_max_hosts", 500))
+        self.metrics_reporter = None
+        if s.get("metrics_file") or s.get("metrics_port") is not None:
+            self.metrics_reporter = MetricsReporter(self.metrics, path=s.get("metrics_file"),
+                                                    interval=s.get("metrics_interval", 5),
+                                                    port=s.get("metrics_port"))
+
         # Phase 3: Database Integration
-        self.enable_database = s.get("enable_database", False)
-        self.db_manager = DatabaseManager(s.get("database_path", "scraper_data.db")) if self.enable_database else None
+        self.enable_database = s.get("enable_database", False) or self.incremental
+        self.db_manager = DatabaseManager(
+            s.get("database_path", "scraper_data.db"),
+            batch_size=s.get("db_batch_size", 500),
+            flush_interval=s.get("db_flush_interval", 0.5),
+            queue_size=s.get("db_queue_size", 10000),
+            metrics=self.metrics
+        ) if self.enable_database else None
         self.session_id = s.get("session_id", f"session_{int(time.time())}")
+        self.recrawl = RecrawlScheduler(
+            self.db_manager.url_history,
+            min_interval=s.get("recrawl_min_interval", 3600),
+            max_interval=s.get("recrawl_max_interval", 30 * 86400),
+            default_interval=s.get("recrawl_default_interval", 86400)
+        ) if self.incremental else None
+        self._root_unchanged = False
 
         # Advanced retry configuration
         self.max_retry_attempts = s.get("max_retry_attempts", 3)
@@ -544,48 +1093,135 @@ class WebScraper:
         # Duplicate detection settings
         self.min_text_len = s.get("min_text_len", 30)
         self.similarity_threshold = s.get("similarity_threshold", 3)
+        self.persist_simhashes = s.get("persist_simhashes", False)
 
         # internal state
         self.visited = set()
-        self.simhashes = set()
+        # similarity_threshold is exclusive: distance < threshold means duplicate
+        self.simhashes = SimhashIndex(max_distance=self.similarity_threshold - 1)
         self.visited_lock = threading.Lock()
         self.simhash_lock = threading.Lock()
         
         # Added for enhancement: Failed URLs tracking
         self.failed_urls = []
         self.failed_urls_lock = threading.Lock()
+        # url -> HTTP status of network fetches awaiting _record_page (only kept when they are logged)
+        self._fetch_status: Dict[str, int] = {}
+
+        # URL frontier; the persistent variant survives crashes and can be resumed
+        self._unsaved_simhashes = []
+        self._config = config
+        if self.persistent_frontier:
+            frontier_db_path = s.get("frontier_db_path", s.get("database_path", "scraper_data.db"))
+            frontier_options = dict(checkpoint_interval=self.checkpoint_interval, config=config,
+                                    state_provider=self._checkpoint_state)
+            if self.shard_index is not None:
+                self.frontier = SharedFrontier(frontier_db_path, self.session_id,
+                                               HostShardRing(self.crawl_processes).shard_for, self.shard_index,
+                                               **frontier_options)
+            else:
+                self.frontier = PersistentFrontier(frontier_db_path, self.session_id, **frontier_options)
+            # A sharding coordinator leaves resuming to its workers
+            if self.resume and not self._is_shard_coordinator():
+                restored = self.frontier.resume()
+                self.visited.update(restored["done_keys"])
+                self.simhashes.update(restored["simhashes"])
+        else:
+            self.frontier = CrawlFrontier()
+        self.metrics.register_gauge("queue_depth", lambda: self.frontier.queued_count)
+        self.metrics.register_gauge("frontier_in_flight", lambda: self.frontier.in_flight_count)
+        self.metrics.register_gauge("pages_visited", lambda: len(self.visited))
+        self.metrics.register_gauge("failed_urls", lambda: len(self.failed_urls))
+
+        # Cross-session near-duplicate detection
+        if self.persist_simhashes:
+            self.simhash_db_path = s.get("frontier_db_path", s.get("database_path", "scraper_data.db"))
+            try:
+                loaded = self.simhashes.load_from_db(self.simhash_db_path)
+                logger.info(f"Loaded {loaded} simhashes from previous sessions")
+            except Exception as e:
+                logger.warning(f"Failed to load persisted simhashes: {e}")
 
         # Prepare network session with retries
         self.session = requests.Session()
         retries = Retry(total=self.retry_tries, backoff_factor=self.retry_backoff_seconds,
                         status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET", "POST"])
-        adapter = HTTPAdapter(max_retries=retries)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # Every thread that shares the session (crawl, images, sitemaps) may hold a connection to one host
+        pool_connections, pool_maxsize = pool_sizes(
+            self.concurrency, self.host_concurrency_max,
+            extra_threads=s.get("sitemap_workers", 4) + (s.get("image_workers", 8) if self.extract_images else 0)
+        )
+        self.dns_cache_ttl = s.get("dns_cache_ttl", 300)
+        self.http_adapter = PooledHTTPAdapter(
+            max_retries=retries,
+            pool_connections=s.get("http_pool_connections", pool_connections),
+            pool_maxsize=s.get("http_pool_maxsize", pool_maxsize),
+            on_connect=lambda host, seconds: self.metrics.observe("connect", seconds, host),
+            dns_cache_ttl=self.dns_cache_ttl
+        )
+        self.session.mount("http://", self.http_adapter)
+        self.session.mount("https://", self.http_adapter)
+        # One aiohttp session per crawl (see _open_async_session)
+        self.keepalive_timeout = s.get("keepalive_timeout", 30)
+        self._async_session = None
+        self._async_pool_stats = ConnectionStats()
 
         # Thread pool used for concurrency (kept alive for recursive submissions)
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency)
 
-        # simple cache folder if requested
-        if self.cache_dir:
-            os.makedirs(self.cache_dir, exist_ok=True)
+        # Image stage: concurrent fetches, crawl-wide dedup, background OCR
+        self.image_pipeline = None
+        if self.extract_images:
+            self.image_pipeline = ImagePipeline(
+                self.session,
+                ImageStore(s.get("image_store_dir", os.path.join(tempfile.gettempdir(), "psense_images"))),
+                max_bytes=s.get("max_image_bytes", 5 * 1024 * 1024),
+                workers=s.get("image_workers", 8),
+                timeout=self.connection_timeout,
+                convert_svg=(lambda data: cairosvg.svg2png(bytestring=data)) if self.convert_svg and CAIROSVG_AVAILABLE else None,
+                ocr_func=self._ocr_image_file if self.ocr_images and DOC_FRAMEWORK_AVAILABLE else None,
+                ocr_workers=s.get("ocr_workers", 1),
+                ocr_batch_size=s.get("ocr_batch_size", 8)
+            )
 
-        # robots.txt and sitemap support
-        self._robots = None
-        self.sitemap_urls = set()  # Added for enhancement: Sitemap support
+        # page cache (bodies + validators) if requested
+        self.page_cache = PageCache(
+            self.cache_dir, self.cache_ttl,
+            max_bytes=int(s.get("cache_max_mb", 1024) * 1024 * 1024),
+            compression=s.get("cache_compression")
+        ) if self.cache_dir else None
+        self.cache_parsed_documents = s.get("cache_parsed_documents", True)
+        # url -> content hash of bodies known to match the cache (fresh hit, 304 or identical refetch)
+        self._unchanged_pages: Dict[str, str] = {}
+
+        # robots.txt (one cached copy per host) and sitemap support
+        self.robots = None
+        self._robots_nonblocking = False
+        # Sitemap locations only; their URLs are streamed when the crawl starts
+        self.sitemap_locations: List[str] = list(s.get("sitemaps", []))
+        self.seed_from_sitemaps = s.get("seed_from_sitemaps", False)
+        self.sitemap_frontier_limit = s.get("sitemap_frontier_limit", 10000)
+        self.sitemap_batch_size = s.get("sitemap_batch_size", 500)
+        self.sitemap_recursive_limit = s.get("sitemap_max_urls", 50)
+        self.sitemap_reader = SitemapReader(
+            http_opener(self.session, timeout=self.connection_timeout, headers_factory=self._make_headers),
+            workers=s.get("sitemap_workers", 4),
+            max_urls=s.get("sitemap_max_urls")
+        )
+        self._active_seeders = 0  # seeding tasks that may still push URLs into the frontier
         if self.respect_robots and ROBOTPARSER_AVAILABLE:
-            try:
-                rp = robotparser_module.RobotFileParser()
-                parsed = urlparse(self.base_url)
-                robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-                rp.set_url(robots_url)
-                rp.read()
-                self._robots = rp
-                # Added for enhancement: Parse sitemaps from robots.txt
-                self._parse_sitemaps_from_robots(robots_url)
-            except Exception as e:
-                logger.warning("Failed to parse robots.txt: %s", e)
-                self._robots = None
+            self.robots = RobotsCache(
+                self._fetch_robots_txt,
+                user_agent=s.get("robots_user_agent", self.user_agents[0] if self.user_agents else "*"),
+                ttl=s.get("robots_ttl", 24 * 3600),
+                timeout=self.connection_timeout,
+                on_crawl_delay=self.rate_limiter.set_crawl_delay,
+                headers_factory=self._make_headers
+            )
+            self.rate_limiter.crawl_delay_provider = self.robots.crawl_delay
+            parsed = urlparse(self.base_url)
+            # Added for enhancement: Parse sitemaps from robots.txt
+            self._parse_sitemaps_from_robots(f"{parsed.scheme}://{parsed.netloc}/robots.txt")
 
         if log_file := s.get("log_file"):
             fh = logging.FileHandler(log_file)
@@ -595,6 +1231,11 @@ class WebScraper:
         # Initialize database session if enabled
         if self.enable_database and self.db_manager:
             self.db_manager.start_session(self.session_id, config)
+            if s.get("url_prefilter", True):
+                self.db_manager.preload_url_filter(
+                    error_rate=s.get("url_filter_error_rate", 0.01),
+                    max_bytes=int(s.get("url_filter_max_mb", 64) * 1024 * 1024)
+                )
 
         # Initialize multilingual processor if available
         self.multilingual_processor = None
@@ -652,69 +1293,80 @@ class WebScraper:
         except Exception:
             return url
 
+    def _fetch_robots_txt(self, robots_url: str) -> Tuple[Optional[int], str]:
+        resp = self.session.get(robots_url, headers=self._make_headers(), timeout=self.connection_timeout)
+        return resp.status_code, resp.text
+
     def _parse_sitemaps_from_robots(self, robots_url: str):
-        """Added for enhancement: Sitemap support from robots.txt"""
+        """Added for enhancement: Sitemap support from robots.txt (read from the robots cache)"""
+        if self.robots is None:
+            return
         try:
-            resp = self.session.get(robots_url, timeout=self.connection_timeout)
-            if resp.status_code == 200:
-                for line in resp.text.split('\n'):
-                    if line.strip().lower().startswith('sitemap:'):
-                        sitemap_url = line.split(':', 1)[1].strip()
-                        self._parse_sitemap(sitemap_url)
+            for sitemap_url in self.robots.sitemaps(robots_url):
+                if sitemap_url not in self.sitemap_locations:
+                    self.sitemap_locations.append(sitemap_url)
         except Exception as e:
             logger.debug(f"Failed to parse sitemaps from robots.txt: {e}")
 
-    def _parse_sitemap(self, sitemap_url: str):
-        """Added for enhancement: Parse XML sitemap"""
-        try:
-            resp = self.session.get(sitemap_url, timeout=self.connection_timeout)
-            if resp.status_code == 200:
-                root = ET.fromstring(resp.content)
-                # Handle sitemap index
-                for sitemap in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}sitemap'):
-                    loc = sitemap.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-                    if loc is not None:
-                        self._parse_sitemap(loc.text)
-                # Handle URL entries
-                for url in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url'):
-                    loc = url.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-                    if loc is not None:
-                        self.sitemap_urls.add(self._normalize_url(loc.text))
-        except Exception as e:
-            logger.debug(f"Failed to parse sitemap {sitemap_url}: {e}")
+    def _crawl_sitemap_locations(self) -> List[str]:
+        """Sitemaps to read for this crawl; /sitemap.xml when seeding and none are declared"""
+        if self.sitemap_locations or not self.seed_from_sitemaps:
+            return list(self.sitemap_locations)
+        parsed = urlparse(self.base_url)
+        return [f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"]
+
+    def _iter_sitemap_links(self):
+        """Added for enhancement: Valid URLs from the sitemaps, streamed"""
+        for entry in self.sitemap_reader.iter_entries(self._crawl_sitemap_locations()):
+            if self._is_valid_link(entry.loc, lastmod=entry.lastmod):
+                yield entry
 
     def _cache_path_for_url(self, url: str) -> str:
         if not self.cache_dir:
             return ""
-        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
-        return os.path.join(self.cache_dir, f"{key}.cache")
+        return self.page_cache.path_for(url)
 
     def _read_cache(self, url: str) -> Optional[str]:
-        if not self.cache_dir:
+        if self.page_cache is None:
             return None
-        p = self._cache_path_for_url(url)
-        if not os.path.exists(p):
+        return self.page_cache.get_fresh(url)
+
+    def _write_cache(self, url: str, content: str, etag: Optional[str] = None,
+                     last_modified: Optional[str] = None) -> Optional[CacheEntry]:
+        if self.page_cache is None:
+            return None
+        return self.page_cache.put(url, content, etag=etag, last_modified=last_modified)
+
+    def _cached_entry(self, url: str) -> Optional[CacheEntry]:
+        """Cache entry for `url` regardless of age (expired ones still carry validators)"""
+        if self.page_cache is None:
             return None
-        age = time.time() - os.path.getmtime(p)
-        if age > self.cache_ttl:
+        try:
+            return self.page_cache.get(url)
+        except Exception as e:
+            logger.debug(f"Unreadable cache entry for {url}: {e}")
             return None
-        with open(p, "r", encoding="utf-8") as f:
-            return f.read()
 
-    def _write_cache(self, url: str, content: str):
-        if not self.cache_dir:
-            return
-        p = self._cache_path_for_url(url)
-        with open(p, "w", encoding="utf-8") as f:
-            f.write(content)
+    def _serve_cached(self, url: str, entry: CacheEntry) -> str:
+        self._unchanged_pages[url] = entry.content_hash
+        return entry.body
+
+    def _store_response(self, url: str, text: str, headers, previous: Optional[CacheEntry]):
+        """Cache a 200 body with its validators; note when it matches what was cached"""
+        entry = self._write_cache(url, text, etag=headers.get("ETag"), last_modified=headers.get("Last-Modified"))
+        if entry is not None and previous is not None and previous.content_hash == entry.content_hash:
+            self._unchanged_pages[url] = entry.content_hash
 
     def _is_allowed_by_robots(self, url: str) -> bool:
-        if not self.respect_robots or self._robots is None:
-            return True
-        try:
-            return self._robots.can_fetch(self._make_headers().get("User-Agent"), url)
-        except Exception:
+        if not self.respect_robots or self.robots is None:
             return True
+        if self._robots_nonblocking:
+            # Link filtering in the asyncio crawl must not block on a robots.txt download;
+            # hosts not seen yet are checked when the URL is fetched (_fetch_async)
+            decision = self.robots.allowed_cached(url)
+            return True if decision is None else decision
+        with self.metrics.timed("robots", url):
+            return self.robots.allowed(url)
 
     # Added for enhancement A: Async fetcher methods
     async def _fetch_async(self, url: str, session: 'ClientSession') -> Optional[str]:
@@ -722,29 +1374,89 @@ class WebScraper:
         if not AIOHTTP_AVAILABLE:
             return None
             
-        # Check cache first
-        if cached := self._read_cache(url):
+        cached = await self._cached_entry_async(url)
+        if cached is not None and cached.age <= self.cache_ttl:
             logger.debug("Cache hit (async): %s", url)
-            return cached
+            return self._serve_cached(url, cached)
+        return await self._fetch_network_async(url, session, cached)
 
-        if not self._is_allowed_by_robots(url):
-            logger.info("Blocked by robots.txt (async): %s", url)
+    async def _cache_io(self, func, *args):
+        """Cache reads and writes are file I/O (and body hashing): keep them off the event loop"""
+        if self.page_cache is None:
             return None
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _cached_entry_async(self, url: str) -> Optional[CacheEntry]:
+        return await self._cache_io(self._cached_entry, url)
+
+    async def _fetch_network_async(self, url: str, session: 'ClientSession',
+                                   cached: Optional[CacheEntry]) -> Optional[str]:
+        """Fetch `url` over the network, revalidating `cached` when there is one"""
+        if self.robots is not None:
+            with self.metrics.timed("robots", url):
+                allowed = await self.robots.allowed_async(url, session)
+            if not allowed:
+                logger.info("Blocked by robots.txt (async): %s", url)
+                return None
 
         headers = self._make_headers()
+        if self._async_browser_pool is not None:
+            try:
+                content = await self._async_browser_pool.render(url, headers=headers, timeout=self.connection_timeout)
+                await self._cache_io(self._write_cache, url, content)
+                return content
+            except Exception as e:
+                logger.debug("Playwright rendering failed (%s), falling back to aiohttp", e)
+        if cached is not None:
+            headers.update(cached.conditional_headers())
         proxy = self._get_proxy()
-        
+        # aiohttp takes the proxy URL itself, not a requests-style mapping
+        proxy_url = proxy["http"] if proxy else None
+
+        breaker = self.circuit_breakers.for_url(url) if self.enable_circuit_breaker and self.circuit_breakers else None
+        trial = recorded = False
+        started = None
         try:
-            async with session.get(url, headers=headers, proxy=proxy, timeout=self.connection_timeout) as resp:
-                resp.raise_for_status()
-                content = await resp.text()
-                self._write_cache(url, content)
-                return content
+            if breaker:
+                trial = breaker.before_call()
+            started = time.monotonic()
+            with self.metrics.timed("fetch", url):
+                async with session.get(url, headers=headers, proxy=proxy_url, timeout=self.connection_timeout) as resp:
+                    resp.raise_for_status()
+                    if resp.status == 304 and cached is not None:
+                        content = None
+                    else:
+                        content = await resp.text()
+                    self._note_fetch_status(url, resp.status)
+                    response_headers = resp.headers
+                    self.metrics.add_bytes(resp.content_length or len(content or ""), url)
+            self._record_fetch_outcome(url, started, status=resp.status)
+            if breaker:
+                breaker.record_success()
+            recorded = True
+            if content is None:
+                logger.debug("Not modified (async): %s", url)
+                await self._cache_io(self.page_cache.touch, url, cached)
+                return self._serve_cached(url, cached)
+            await self._cache_io(self._store_response, url, content, response_headers, cached)
+            return content
         except Exception as e:
+            # Errors after the response (e.g. writing the cache) say nothing about the host
+            if not recorded and started is not None:
+                self._record_fetch_outcome(url, started, error=e)
+            if breaker and not recorded and not isinstance(e, CircuitBreakerOpenError):
+                if breaker.counts_as_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                recorded = True
             logger.warning(f"Async fetch failed for {url}: {e}")
             with self.failed_urls_lock:
                 self.failed_urls.append(url)
             return None
+        finally:
+            if trial and not recorded:
+                breaker.release_trial()  # cancelled mid-request
 
     async def _fetch_async_batch(self, urls: List[str]) -> List[Optional[str]]:
         """Added for enhancement A: Async batch fetcher for API/XHR endpoints"""
@@ -752,10 +1464,12 @@ class WebScraper:
             logger.warning("aiohttp not available, cannot use async batch fetch")
             return [None] * len(urls)
             
-        async with aiohttp.ClientSession(
-            connector=aiohttp.TCPConnector(limit_per_host=self.per_domain_max),
-            timeout=aiohttp.ClientTimeout(total=self.connection_timeout)
-        ) as session:
+        # Reuse the crawl's session (and its kept-alive connections) when called during a crawl
+        session = self._async_session
+        owned = session is None or session.closed
+        if owned:
+            session = self._open_async_session()
+        try:
             tasks = []
             for url in urls:
                 # Apply domain-aware rate limiting with semaphore
@@ -774,17 +1488,32 @@ class WebScraper:
                     processed_results.append(result)
             
             return processed_results
+        finally:
+            if owned:
+                await session.close()
+
+    def _open_async_session(self) -> 'ClientSession':
+        """aiohttp session with a pooled, DNS-caching connector; call on the loop that will use it"""
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max(self.frontier_workers, self.host_concurrency_max),
+                                           limit_per_host=self.host_concurrency_max,
+                                           ttl_dns_cache=self.dns_cache_ttl,
+                                           keepalive_timeout=self.keepalive_timeout),
+            timeout=aiohttp.ClientTimeout(total=self.connection_timeout),
+            trace_configs=[aiohttp_trace_config(self._async_pool_stats), self.metrics.aiohttp_trace_config()]
+        )
 
     def _fetch_with_retry(self, url: str) -> Optional[str]:
         """Enhanced fetch with exponential backoff retry and circuit breaker"""
         for attempt in range(self.max_retry_attempts):
             try:
-                if self.enable_circuit_breaker and self.circuit_breaker:
-                    return self.circuit_breaker(self._fetch_internal)(url)
+                if self.enable_circuit_breaker and self.circuit_breakers:
+                    return self.circuit_breakers.for_url(url)(self._fetch_internal)(url)
                 else:
                     return self._fetch_internal(url)
             except Exception as e:
-                if attempt == self.max_retry_attempts - 1:
+                # Retrying against an open breaker only burns time; fail fast
+                if isinstance(e, CircuitBreakerOpenError) or attempt == self.max_retry_attempts - 1:
                     # Log failed attempt to database
                     if self.enable_database and self.db_manager:
                         self.db_manager.log_failed_url(self.session_id, url, str(e), attempt + 1)
@@ -806,9 +1535,10 @@ class WebScraper:
         if dynamic_rendering==True and Playwright is available. Uses requests.Session (retries configured).
         """
         # cache
-        if cached := self._read_cache(url):
+        cached = self._cached_entry(url)
+        if cached is not None and cached.age <= self.cache_ttl:
             logger.debug("Cache hit: %s", url)
-            return cached
+            return self._serve_cached(url, cached)
 
         if not self._is_allowed_by_robots(url):
             logger.info("Blocked by robots.txt: %s", url)
@@ -818,64 +1548,88 @@ class WebScraper:
         # Added for enhancement B: Proxy rotation
         proxy = self._get_proxy()
         proxies = proxy if proxy else None
-        
+        started = None
+
         try:
-            if self.dynamic_rendering:
-                # try to use Playwright if available
+            if self.browser_pool is not None:
                 try:
-                    from playwright.sync_api import sync_playwright
-                    with sync_playwright() as pw:
-                        browser = pw.chromium.launch(headless=True)
-                        page = browser.new_page()
-                        page.set_extra_http_headers(headers)
-                        page.goto(url, timeout=int(self.connection_timeout * 1000))
-                        content = page.content()
-                        browser.close()
-                        self._write_cache(url, content)
-                        return content
+                    content = self.browser_pool.render(url, headers=headers, timeout=self.connection_timeout)
+                    self._write_cache(url, content)
+                    return content
                 except Exception as e:
-                    logger.debug("Playwright rendering not available or failed (%s), falling back to requests", e)
-
-            resp = self.session.get(url, headers=headers, proxies=proxies, timeout=self.connection_timeout)
+                    logger.debug("Playwright rendering failed (%s), falling back to requests", e)
+
+            if cached is not None:
+                headers.update(cached.conditional_headers())
+            started = time.monotonic()
+            with self.metrics.timed("fetch", url):
+                resp = self.session.get(url, headers=headers, proxies=proxies, timeout=self.connection_timeout)
+            self.metrics.add_bytes(len(resp.content), url)
             resp.raise_for_status()
+            retries = getattr(resp.raw, "retries", None)
+            # Throttling answered by urllib3's own retries still counts against the host
+            retried = [h.status for h in getattr(retries, "history", ()) if getattr(h, "status", None)]
+            self._record_fetch_outcome(url, started, status=resp.status_code, retried_statuses=retried)
+            # Logged to the database by _record_page once the page is parsed
+            self._note_fetch_status(url, resp.status_code)
+            if resp.status_code == 304 and cached is not None:
+                logger.debug("Not modified: %s", url)
+                self.page_cache.touch(url, cached)
+                return self._serve_cached(url, cached)
             text = resp.text
-            self._write_cache(url, text)
-            
-            # Log successful crawl to database
-            if self.enable_database and self.db_manager:
-                content_hash = hashlib.md5(text.encode()).hexdigest()
-                content_type = "unknown"
-                if self.enable_content_classification and self.content_classifier:
-                    soup = BeautifulSoup(text, "lxml")
-                    content_type = self.content_classifier.classify_content(soup, url).value
-                
-                self.db_manager.log_crawled_url(
-                    self.session_id, url, content_type, resp.status_code, 
-                    content_hash, len(text)
-                )
-            
+            self._store_response(url, text, resp.headers, cached)
             return text
         except requests.exceptions.RequestException as e:
+            if started is not None:
+                self._record_fetch_outcome(url, started, error=e)
             logger.warning("Failed to fetch %s : %s", url, e)
             # Added for enhancement: Track failed URLs
             with self.failed_urls_lock:
                 self.failed_urls.append(url)
             raise
 
+    def _record_fetch_outcome(self, url: str, started: float, status: Optional[int] = None,
+                              retried_statuses: Sequence[int] = (), error: Optional[BaseException] = None):
+        """
+        Feed the adaptive concurrency limit of `url`'s host: throttling (429/503) and
+        timeouts cut it, any other answer from the host is a latency sample.
+        Errors that never reached the host (DNS, refused connections) are ignored.
+        """
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            return
+        if error is not None:
+            if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.RetryError,
+                                  asyncio.TimeoutError)):
+                limiter.record_overload(url, started)
+                return
+            response = getattr(error, "response", None)
+            status = getattr(response, "status_code", None) or getattr(error, "status", None)
+            if not isinstance(status, int):
+                return
+        if status in OVERLOAD_STATUSES or any(code in OVERLOAD_STATUSES for code in retried_statuses):
+            limiter.record_overload(url, started)
+        else:
+            limiter.record_success(url, time.monotonic() - started, started)
+
     # high-level wrapper that applies rate limiting and exception handling
     def safe_get(self, url: str) -> Optional[str]:
         """
-        Public wrapper (signature preserved). Uses backoff-decorated _fetch and enforces request_delay.
+        Public wrapper (signature preserved). Uses backoff-decorated _fetch and enforces the per-host rate.
         Returns HTML text or None.
         Enhanced with domain-aware rate limiting.
         """
         # Added for enhancement C: Domain-aware rate limiting
         domain = urlparse(url).netloc
-        semaphore = self.domain_semaphores[domain]
-        
+        if self.concurrency_limiter is not None:
+            semaphore = self.concurrency_limiter.slot(url)
+        else:
+            semaphore = self.domain_semaphores[domain]
+
         try:
+            # Wait for the host's token before taking a concurrency slot, never while holding one
+            self.rate_limiter.acquire(url)
             with semaphore:  # Acquire domain semaphore
-                time.sleep(self.request_delay)
                 html = self._fetch_with_retry(url)
                 return html
         except Exception as e:
@@ -888,9 +1642,18 @@ class WebScraper:
         Entry point to start crawling. Preserves signature.
         Enhanced with failed URLs reporting.
         """
+        if self._is_shard_coordinator():
+            return self._crawl_sharded()
+        if self.metrics_reporter is not None:
+            self.metrics_reporter.start()
         try:
             logger.info("Starting crawl at %s", self.base_url)
-            root = self._crawl_recursive(self.base_url, 0)
+            if self.output_path:
+                self.output_sink = open_output_sink(self.output_mode, self.output_path, append=self.resume)
+            if self.crawl_mode == "frontier":
+                root = self._crawl_frontier()
+            else:
+                root = self._crawl_recursive(self.base_url, 0)
             
             # Added for enhancement: Report failed URLs at the end
             if self.failed_urls:
@@ -900,8 +1663,16 @@ class WebScraper:
                 if len(self.failed_urls) > 10:
                     logger.warning(f"  ... and {len(self.failed_urls) - 10} more")
             
-            if root and self.output_path:
+            if self.image_pipeline is not None:
+                # Let background OCR finish so the output carries its text
+                self.image_pipeline.drain()
+            if self.output_sink is not None:
+                self._emit_image_records()
+                self._close_output_sink()
+            elif root and self.output_path:
                 self.save_output(root)
+
+            self._flush_simhashes()
             
             # End database session if enabled
             if self.enable_database and self.db_manager:
@@ -914,12 +1685,17 @@ class WebScraper:
             if self.enable_database and self.db_manager:
                 self.db_manager.end_session(self.session_id)
             return None
+        finally:
+            if self.metrics_reporter is not None:
+                self.metrics_reporter.stop()
 
-    def _crawl_recursive(self, url: str, depth: int) -> Optional[Document]:
+    def _crawl_recursive(self, url: str, depth: int, parent_id: Optional[str] = None) -> Optional[Document]:
         """
         Core recursive crawler. Preserves signature.
         Uses a thread pool for sibling pages when concurrency > 1.
         Enhanced with URL normalization and sitemap integration.
+        With a streaming output sink, pages are written as they are parsed and
+        only the root document is returned.
         """
         # Added for enhancement: URL normalization
         normalized_url = self._normalize_url(url)
@@ -934,26 +1710,13 @@ class WebScraper:
         if not html:
             return None
 
-        soup = BeautifulSoup(html, "lxml")
-        doc = self._parse_to_document(soup, url)
+        doc, children = self._parse_page(url, html, depth)
         if doc is None:
             return None
+        streamed = self._emit_page(doc, normalized_url, parent_id, depth)
 
         # optionally follow links
         if self.follow_links and depth < self.max_depth:
-            children = []
-            # Regular links
-            for a in soup.find_all("a", href=True):
-                href = urljoin(url, a["href"].split("#")[0])
-                if self._is_valid_link(href):
-                    children.append(href)
-            
-            # Added for enhancement: Include sitemap URLs if we're at root level
-            if depth == 0 and self.sitemap_urls:
-                for sitemap_url in list(self.sitemap_urls)[:50]:  # Limit to prevent overload
-                    if self._is_valid_link(sitemap_url):
-                        children.append(sitemap_url)
-
             if children:
                 # Added for enhancement: Progress monitoring with tqdm
                 if TQDM_AVAILABLE and depth == 0:
@@ -962,8 +1725,19 @@ class WebScraper:
                     children_iter = children
                     
                 if self.concurrency > 1:
-                    futures = [self.executor.submit(self._crawl_recursive, href, depth + 1) for href in children]
-                    
+                    futures = [self.executor.submit(self._crawl_recursive, href, depth + 1, normalized_url)
+                               for href in children]
+                    # A page waiting on children holds a pool worker; children no worker has picked
+                    # up yet are run here instead, so a full pool of waiting parents cannot deadlock
+                    for i in range(len(futures) - 1, -1, -1):
+                        if futures[i].cancel():
+                            inline = concurrent.futures.Future()
+                            try:
+                                inline.set_result(self._crawl_recursive(children[i], depth + 1, normalized_url))
+                            except Exception as e:
+                                inline.set_exception(e)
+                            futures[i] = inline
+
                     if TQDM_AVAILABLE and depth == 0:
                         futures_iter = tqdm.tqdm(concurrent.futures.as_completed(futures), 
                                                total=len(futures), desc="Processing pages")
@@ -980,13 +1754,385 @@ class WebScraper:
                             doc.child_documents.append(child_doc)
                 else:
                     for href in children_iter:
-                        child = self._crawl_recursive(href, depth + 1)
+                        child = self._crawl_recursive(href, depth + 1, normalized_url)
                         if child:
                             doc.child_documents.append(child)
 
+        if streamed and depth > 0:
+            return None  # already written; don't keep it in the parent
         return doc
 
-    def _is_valid_link(self, url: str) -> bool:
+    def _parse_page(self, url: str, html: str, depth: int) -> Tuple[Optional[Document], List[str]]:
+        """
+        Fetched HTML -> (document, child links to follow). When the body is known
+        to be unchanged since it was cached, the cached parse result is reused and
+        the page is not parsed at all.
+        """
+        with self.metrics.timed("parse", url):
+            return self._parse_page_timed(url, html, depth)
+
+    def _parse_page_timed(self, url: str, html: str, depth: int) -> Tuple[Optional[Document], List[str]]:
+        body_hash = self._unchanged_pages.pop(url, None)
+        if self.recrawl is not None:
+            body_hash = body_hash or content_hash(html)
+            if self.recrawl.is_unchanged(self._normalize_url(url), body_hash):
+                return None, self._unchanged_page_links(url, html, body_hash, depth)
+        reuse = self.page_cache is not None and self.cache_parsed_documents
+        if reuse and body_hash:
+            cached = self.page_cache.get_parsed(url, body_hash)
+            if cached is not None:
+                self._log_crawl(url, cached["content_type"], body_hash, len(html))
+                if self.simhashes.check_and_add(cached["simhash"]):
+                    logger.info("Skipping duplicate page: %s", url)
+                    return None, []
+                logger.debug("Unchanged since last crawl, reusing parse: %s", url)
+                children = []
+                if self.follow_links and depth < self.max_depth:
+                    children = self._collect_child_links(cached["links"], depth)
+                return cached["doc"], children
+
+        page = self._new_page(url, html)
+        content_type = self._record_page(page)
+        doc = self._parse_to_document(page.soup if page.parser == "bs4" else None, url, page=page)
+        if doc is None:
+            return None, []
+        if reuse and page.simhash is not None:
+            self.page_cache.put_parsed(url, page.content_hash, {
+                "doc": doc, "links": page.links, "simhash": page.simhash, "content_type": content_type
+            })
+        children = []
+        if self.follow_links and depth < self.max_depth:
+            children = self._collect_child_links(page.links, depth)
+        return doc, children
+
+    def _unchanged_page_links(self, url: str, html: str, body_hash: str, depth: int) -> List[str]:
+        """
+        Incremental mode: log an unchanged page as a cheap "unchanged" visit and
+        return its links (from the cached parse when there is one) so the pages
+        it leads to can still be scheduled. No document is built or emitted.
+        """
+        logger.debug("Unchanged since last crawl: %s", url)
+        if depth == 0:
+            self._root_unchanged = True
+        self._log_crawl(url, UNCHANGED, body_hash, len(html))
+        if not (self.follow_links and depth < self.max_depth):
+            return []
+        cached = self.page_cache.get_parsed(url, body_hash) if self.page_cache is not None else None
+        links = cached["links"] if cached is not None else self._new_page(url, html).links
+        return self._collect_child_links(links, depth)
+
+    def _collect_child_links(self, links: List[str], depth: int) -> List[str]:
+        """Valid links to follow from a page (plus sitemap URLs at the root)"""
+        children = []
+        # Regular links
+        for href in links:
+            if self._is_valid_link(href):
+                children.append(href)
+
+        # Added for enhancement: Include sitemap URLs if we're at root level
+        # (the frontier crawl seeds them separately, see _seed_frontier)
+        if depth == 0 and self.crawl_mode != "frontier":
+            # The root keeps all of these (and their subtrees) in memory: bounded
+            entries = self._iter_sitemap_links()
+            try:
+                for entry in itertools.islice(entries, self.sitemap_recursive_limit):
+                    children.append(entry.loc)
+            finally:
+                entries.close()
+        return children
+
+    # -------------------- Sharded crawl (processes) --------------------
+    def _is_shard_coordinator(self) -> bool:
+        return self.crawl_processes > 1 and self.shard_index is None
+
+    def _crawl_sharded(self) -> Optional[Document]:
+        """
+        Coordinator of a host-sharded crawl: runs crawl_processes worker
+        processes over the shared frontier and waits for them. Pages are
+        streamed by the workers; the returned root only summarizes the run.
+        """
+        logger.info("Starting sharded crawl at %s with %d processes", self.base_url, self.crawl_processes)
+        config = copy.deepcopy(self._config)
+        config.setdefault("scraper", {}).update(session_id=self.session_id, output_mode=self.output_mode)
+        try:
+            self.shard_stats = run_sharded_crawl(config, self.crawl_processes)
+        except Exception as e:
+            logger.exception("Sharded crawl failed: %s", e)
+            return None
+        if not self.shard_stats:
+            return None
+        self.visited.update(SharedFrontier.finished_keys(self.frontier.db_path, self.session_id))
+        for stats in self.shard_stats:
+            self.failed_urls.extend(stats["failed_urls"])
+        logger.info("Sharded crawl finished: %s",
+                    {stats["shard"]: stats["frontier"] for stats in self.shard_stats})
+        return Document(title=f"Sharded crawl {self.session_id}", url=self.base_url, created_date=datetime.now())
+
+    # -------------------- Frontier crawl (asyncio) --------------------
+    def _crawl_frontier(self) -> Optional[Document]:
+        """
+        Frontier-based crawl. URLs are queued with their depth and drained by
+        asyncio workers, so no worker ever blocks on a subtree (unlike the
+        recursive mode, where parents wait in as_completed for their children).
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._crawl_frontier_async())
+        # Already inside an event loop (e.g. a notebook): run on a helper thread
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as runner:
+            return runner.submit(asyncio.run, self._crawl_frontier_async()).result()
+
+    def _use_native_async_fetch(self) -> bool:
+        """aiohttp (plus the async browser pool when rendering) unless safe_get is overridden"""
+        return (AIOHTTP_AVAILABLE and (not self.dynamic_rendering or PLAYWRIGHT_AVAILABLE)
+                and type(self).safe_get is WebScraper.safe_get)
+
+    async def _crawl_frontier_async(self) -> Optional[Document]:
+        root_key = self._normalize_url(self.base_url)
+        self.frontier.push(self.base_url, depth=0, key=root_key)
+        docs: Dict[str, Document] = {}
+        orphans: List[Document] = []
+        wakeup = asyncio.Event()
+        self._async_domain_semaphores = defaultdict(lambda: asyncio.Semaphore(self.per_domain_max))
+
+        session = None
+        if self._use_native_async_fetch():
+            session = self._async_session = self._open_async_session()
+            if self.dynamic_rendering:
+                self._async_browser_pool = AsyncBrowserPool(size=self.browser_pool_size,
+                                                            pages_per_context=self.browser_pages_per_context)
+            # robots.txt for new hosts is fetched on the loop in _fetch_async
+            self._robots_nonblocking = True
+        seeders = []
+        # In a sharded crawl only the first worker reads the sitemaps and the crawl history
+        if self.max_depth >= 1 and not self.shard_index:
+            if self._crawl_sitemap_locations():
+                seeders.append(("sitemaps", self._iter_sitemap_links()))
+            if self.recrawl is not None:
+                seeders.append(("history", self._iter_history_links()))
+        self._active_seeders = len(seeders)
+        seeders = [asyncio.create_task(self._seed_frontier(name, links, root_key, wakeup))
+                   for name, links in seeders]
+        try:
+            workers = [asyncio.create_task(self._frontier_worker(session, docs, orphans, wakeup))
+                       for _ in range(self.frontier_workers)]
+            await asyncio.gather(*workers)
+        finally:
+            for seeder in seeders:
+                seeder.cancel()
+            await asyncio.gather(*seeders, return_exceptions=True)
+            self._robots_nonblocking = False
+            if session is not None:
+                await session.close()
+                self._async_session = None
+            if self._async_browser_pool is not None:
+                await self._async_browser_pool.close()
+                self._async_browser_pool = None
+
+        if self.persistent_frontier:
+            self.frontier.checkpoint()
+        logger.info("Frontier crawl finished: %s", self.frontier.stats())
+        root = docs.get(root_key)
+        if root is None and orphans:
+            # Resumed crawl: the root was fetched in an earlier run
+            root = Document(title=f"Resumed crawl {self.session_id}", url=self.base_url, created_date=datetime.now())
+        elif root is None and self._root_unchanged:
+            # Incremental recrawl whose root page has not changed
+            root = Document(title=f"Incremental crawl {self.session_id}", url=self.base_url,
+                            created_date=datetime.now())
+        if root is not None:
+            root.child_documents.extend(orphans)
+        return root
+
+    async def _frontier_worker(self, session, docs: Dict[str, Document], orphans: List[Document],
+                               wakeup: asyncio.Event):
+        """Pull entries until the frontier is empty and no other worker can add more"""
+        while True:
+            entry = self.frontier.pop()
+            if entry is None:
+                if self.frontier.is_exhausted() and not self._active_seeders:
+                    wakeup.set()
+                    return
+                wakeup.clear()
+                try:
+                    # Sleep until another worker makes progress or a deferred entry is due
+                    await asyncio.wait_for(wakeup.wait(), self.frontier.next_ready_in())
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            throttled_for = self.rate_limiter.delay_for(entry.url)
+            if throttled_for > 0:
+                # Host is out of tokens: park the URL and go fetch another host instead
+                self.frontier.defer(entry, throttled_for)
+                continue
+
+            failed = False
+            try:
+                doc, children = await self._process_frontier_entry(entry, session)
+                if doc is not None:
+                    streamed = self._emit_page(doc, entry.key, entry.parent_key, entry.depth)
+                    if not streamed or entry.parent_key is None:
+                        docs[entry.key] = doc
+                    if not streamed:
+                        parent = docs.get(entry.parent_key) if entry.parent_key else None
+                        if parent is not None:
+                            parent.child_documents.append(doc)
+                        elif entry.parent_key:
+                            orphans.append(doc)
+                # Unchanged pages in an incremental recrawl have links but no document
+                self.frontier.push_many([
+                    FrontierEntry(url=href, depth=entry.depth + 1, parent_key=entry.key,
+                                  key=self._normalize_url(href))
+                    for href in children
+                ])
+            except FetchFailedError:
+                failed = True
+            except Exception as e:
+                failed = True
+                logger.warning("Frontier processing failed for %s: %s", entry.url, e)
+            finally:
+                self.frontier.mark_done(entry, failed=failed)
+                wakeup.set()
+
+    async def _seed_frontier(self, name: str, entries, root_key: str, wakeup: asyncio.Event):
+        """
+        Stream seed URLs (sitemap or crawl-history entries) into the frontier
+        as depth-1 children of the root. Reading and link filtering run off the
+        loop, and seeding pauses while sitemap_frontier_limit URLs are already
+        queued.
+        """
+        loop = asyncio.get_running_loop()
+        # Keeps other crawl processes of a shared frontier from finishing while URLs may still come
+        with self.frontier.producing(name):
+            try:
+                while True:
+                    while self.frontier.queued_count >= self.sitemap_frontier_limit:
+                        await asyncio.sleep(0.05)
+                    batch = await loop.run_in_executor(None, self._next_sitemap_batch, entries, root_key)
+                    if batch is None:
+                        break
+                    if self.frontier.push_many(batch):
+                        wakeup.set()
+            except Exception as e:
+                logger.warning("Seeding from %s failed: %s", name, e)
+            finally:
+                self._active_seeders -= 1
+                wakeup.set()
+                try:
+                    await loop.run_in_executor(None, entries.close)
+                except ValueError:
+                    pass  # cancelled while a batch was still being read
+        if name == "sitemaps":
+            logger.info("Sitemap seeding finished: %s", self.sitemap_reader.stats())
+
+    def _iter_history_links(self):
+        """
+        Due URLs of the crawled hosts from earlier sessions. Without these a
+        page that is not due hides every due page below it, since its links
+        are only read when it is fetched.
+        """
+        root_key = self._normalize_url(self.base_url)
+        hosts = {h.lower() for h in self.allowed_domains} or {urlparse(self.base_url).netloc.lower()}
+        for url in self.db_manager.iter_crawled_urls():
+            if url == root_key:
+                continue  # queued by the crawl itself
+            domain = urlparse(url).netloc.lower()
+            if any(domain.endswith(host) for host in hosts) and self._is_valid_link(url):
+                yield SitemapEntry(loc=url)
+
+    def _next_sitemap_batch(self, entries, root_key: str) -> Optional[List[FrontierEntry]]:
+        """Up to sitemap_batch_size frontier entries, or None once the seed entries are exhausted"""
+        batch = []
+        for entry in entries:
+            # In seed mode the sitemap's own priority orders the crawl ahead of discovered links
+            priority = (entry.priority if entry.priority is not None else 0.5) if self.seed_from_sitemaps else 0.0
+            batch.append(FrontierEntry(url=entry.loc, depth=1, priority=priority, parent_key=root_key,
+                                       key=self._normalize_url(entry.loc), lastmod=entry.lastmod))
+            if len(batch) >= self.sitemap_batch_size:
+                return batch
+        return batch or None
+
+    async def _process_frontier_entry(self, entry: FrontierEntry, session) -> Tuple[Optional[Document], List[str]]:
+        with self.visited_lock:
+            if entry.key in self.visited:
+                return None, []
+            self.visited.add(entry.key)
+
+        loop = asyncio.get_running_loop()
+        if session is not None:
+            html = await self._safe_get_async(entry.url, session)
+        else:
+            html = await loop.run_in_executor(self.executor, self.safe_get, entry.url)
+        if html is None:
+            raise FetchFailedError(entry.url)
+        if not html:
+            return None, []
+        # Parsing is CPU-bound; keep it off the event loop so I/O keeps flowing
+        return await loop.run_in_executor(self.executor, self._parse_frontier_page, html, entry)
+
+    def _parse_frontier_page(self, html: str, entry: FrontierEntry) -> Tuple[Optional[Document], List[str]]:
+        return self._parse_page(entry.url, html, entry.depth)
+
+    def _note_fetch_status(self, url: str, status: int):
+        """Keep a fetch's status for _log_crawl; without a database nothing would ever pop it"""
+        if self.enable_database and self.db_manager:
+            self._fetch_status[url] = status
+
+    def _log_crawl(self, url: str, content_type: str, body_hash: str, size: int):
+        """Log a network fetch (cache hits have no pending status and are not logged)"""
+        status_code = self._fetch_status.pop(url, None)
+        if status_code is None or not (self.enable_database and self.db_manager):
+            return
+        # Normalized, like the keys _is_valid_link and the recrawl scheduler look up
+        self.db_manager.log_crawled_url(self.session_id, self._normalize_url(url), content_type,
+                                        status_code, body_hash, size)
+
+    def _new_page(self, url: str, html: str) -> PageContext:
+        """PageContext for a fetched page, parsed by the configured backend"""
+        # Multilingual extraction works on a BeautifulSoup tree
+        parser = "lxml" if self.parser_backend == "lxml" and not self.enable_multilingual else "bs4"
+        return PageContext(url, html, parser=parser)
+
+    def _record_page(self, page: PageContext) -> str:
+        """Classify and log a freshly fetched page; returns the content type"""
+        content_type = "unknown"
+        if not (self.enable_database and self.db_manager):
+            self._fetch_status.pop(page.url, None)
+            return content_type
+        if page.url not in self._fetch_status:
+            return content_type
+        if self.enable_content_classification and self.content_classifier:
+            try:
+                content_type = self.content_classifier.classify_content(
+                    page.soup if page.parser == "bs4" else None, page.url,
+                    text=page.visible_text, class_tokens=page.class_tokens
+                ).value
+            except Exception as e:
+                logger.debug(f"Content classification failed for {page.url}: {e}")
+        self._log_crawl(page.url, content_type, page.content_hash, len(page.html))
+        return content_type
+
+    async def _safe_get_async(self, url: str, session: 'ClientSession') -> Optional[str]:
+        """Async counterpart of safe_get: domain-aware rate limiting around _fetch_async"""
+        if not AIOHTTP_AVAILABLE:
+            return None
+        # Fresh cache hits cost no request; look them up before taking a rate-limit slot
+        cached = await self._cached_entry_async(url)
+        if cached is not None and cached.age <= self.cache_ttl:
+            logger.debug("Cache hit (async): %s", url)
+            return self._serve_cached(url, cached)
+        domain = urlparse(url).netloc
+        await self.rate_limiter.acquire_async(url)
+        if self.concurrency_limiter is not None:
+            slot = self.concurrency_limiter.slot_async(url)
+        else:
+            slot = self._async_domain_semaphores[domain]
+        async with slot:
+            return await self._fetch_network_async(url, session, cached)
+
+    def _is_valid_link(self, url: str, lastmod: Optional[str] = None) -> bool:
         # basic checks: scheme, visited, domain, extension
         if not url:
             return False
@@ -1003,8 +2149,13 @@ class WebScraper:
         if normalized_url in self.visited:
             return False
         
+        # Incremental recrawl: previously crawled URLs come back once they are due
+        if self.recrawl is not None:
+            if not self.recrawl.is_due(normalized_url, lastmod):
+                logger.debug(f"Not due for recrawl: {normalized_url}")
+                return False
         # Database-based deduplication check
-        if self.enable_database and self.db_manager:
+        elif self.enable_database and self.db_manager:
             if self.db_manager.is_url_crawled(normalized_url):
                 logger.debug(f"URL already crawled in previous session: {normalized_url}")
                 return False
@@ -1034,34 +2185,55 @@ class WebScraper:
         """
         if not html:
             return False
-        soup = BeautifulSoup(html, "lxml")
-        for s in soup(["script", "style"]):
-            s.extract()
-        comments = soup.find_all(string=lambda text: isinstance(text, Comment))
-        for c in comments:
-            c.extract()
-        text = soup.get_text(separator=" ", strip=True)
+        return self._is_duplicate_page(self._new_page("", html))
+
+    def _is_duplicate_page(self, page: PageContext) -> bool:
+        """_is_duplicate on an already parsed page (reuses its visible text)"""
+        with self.metrics.timed("dedup", page.url or None):
+            return self._is_duplicate_page_timed(page)
+
+    def _is_duplicate_page_timed(self, page: PageContext) -> bool:
+        text = page.visible_text
         if len(text) < self.min_text_len:
             return True  # treat tiny pages as duplicate/noise to avoid processing
 
         new_hash = Simhash(text).value
-        with self.simhash_lock:
-            for old in self.simhashes:
-                # use Hamming distance
-                if bin(new_hash ^ old).count("1") < self.similarity_threshold:
-                    logger.debug("Detected duplicate page by simhash")
-                    return True
-            self.simhashes.add(new_hash)
+        page.simhash = new_hash
+        # Banded index lookup: near-constant time, lock held only for the buckets
+        if self.simhashes.check_and_add(new_hash):
+            logger.debug("Detected duplicate page by simhash")
+            return True
+        if self.persistent_frontier or self.persist_simhashes:
+            with self.simhash_lock:
+                self._unsaved_simhashes.append(new_hash)
         return False
 
+    def _checkpoint_state(self) -> Dict[str, Any]:
+        """Dedup state added since the last frontier checkpoint"""
+        with self.simhash_lock:
+            hashes, self._unsaved_simhashes = self._unsaved_simhashes, []
+        return {"simhashes": hashes}
+
+    def _flush_simhashes(self):
+        """Persist new simhashes when no persistent frontier is checkpointing them"""
+        if not self.persist_simhashes or self.persistent_frontier:
+            return
+        hashes = self._checkpoint_state()["simhashes"]
+        try:
+            SimhashIndex.save_to_db(self.simhash_db_path, self.session_id, hashes)
+        except Exception as e:
+            logger.warning(f"Failed to persist simhashes: {e}")
+
     def is_noise(self, tag) -> bool:
         """
         Heuristic noise detection based on id/class attributes and tag name.
         """
         try:
-            id_class = " ".join(filter(None, [*tag.get("class", []), tag.get("id", "")])).lower()
-            if any(k in id_class for k in self.noise_keywords):
+            if self._has_noise_attrs(tag):
                 return True
+            # images carry no text of their own; judge them by id/class only
+            if tag.name == "img":
+                return False
             # very small tags
             txt = tag.get_text(strip=True)
             if not txt or len(txt) < 3:
@@ -1070,17 +2242,30 @@ class WebScraper:
         except Exception:
             return False
 
+    def _has_noise_attrs(self, tag) -> bool:
+        """The id/class half of is_noise (no text needed)"""
+        try:
+            id_class = " ".join(filter(None, [*tag_classes(tag), tag.get("id", "")])).lower()
+            return any(k in id_class for k in self.noise_keywords)
+        except Exception:
+            return False
+
     # -------------------- Parsing --------------------
-    def _parse_to_document(self, soup: BeautifulSoup, url: str) -> Optional[Document]:
+    def _parse_to_document(self, soup: BeautifulSoup, url: str,
+                           page: Optional[PageContext] = None) -> Optional[Document]:
         """
         Convert BeautifulSoup object into Document (using Document/Chapter/Section classes).
         Now includes multilingual processing and enhanced language metadata.
         Preserves signature. Enhanced with language detection.
+        `page` carries the fetched page's cached views so nothing is parsed twice;
+        with an lxml page (parser_backend) `soup` is None and is never built.
         """
-        if soup is None:
-            return None
+        if page is None:
+            if soup is None:
+                return None
+            page = PageContext.from_soup(soup, url)
 
-        if self._is_duplicate(str(soup)):
+        if self._is_duplicate_page(page):
             logger.info("Skipping duplicate/short page: %s", url)
             return None
 
@@ -1090,10 +2275,12 @@ class WebScraper:
         primary_language = "en"  # Default
         
         if self.enable_multilingual and self.multilingual_processor:
+            multilingual_started = time.perf_counter()
             try:
                 # Extract multilingual content from HTML
-                html_content = str(soup)
-                multilingual_content = self.multilingual_processor.extract_multilingual_content(html_content, soup)
+                multilingual_content = self.multilingual_processor.extract_multilingual_content(
+                    page.html, page.soup, main_text=page.visible_text
+                )
                 
                 if multilingual_content:
                     detected_languages = list(multilingual_content.keys())
@@ -1104,7 +2291,7 @@ class WebScraper:
                     logger.info(f"🌐 Detected languages: {detected_languages} (primary: {primary_language})")
                 else:
                     # Fallback to simple text detection
-                    main_text = soup.get_text(strip=True)[:1000]
+                    main_text = page.visible_text[:1000]
                     if main_text:
                         lang_info = self.multilingual_processor.detect_language(main_text)
                         primary_language = lang_info.code
@@ -1112,11 +2299,12 @@ class WebScraper:
                         logger.info(f"🌐 Detected language: {primary_language} (confidence: {lang_info.confidence:.2f})")
             except Exception as e:
                 logger.debug(f"Multilingual processing failed for {url}: {e}")
+            self.metrics.observe("multilingual", time.perf_counter() - multilingual_started, url)
 
         # Legacy language detection if multilingual processor not available
         elif self.allowed_languages and LANGDETECT_AVAILABLE:
             try:
-                text = soup.get_text(strip=True)[:1000]  # Sample first 1000 chars
+                text = page.visible_text[:1000]  # Sample first 1000 chars
                 if text:
                     detected_lang = langdetect.detect(text)
                     if detected_lang not in self.allowed_languages:
@@ -1128,8 +2316,9 @@ class WebScraper:
                 logger.debug(f"Language detection failed for {url}: {e}")
 
         # title
-        title_tag = soup.find("title")
-        title = title_tag.get_text(strip=True) if title_tag else url
+        title = page.title
+        if title is None:
+            title = url
 
         doc = Document(title=title, url=url, created_date=datetime.now())
         
@@ -1155,19 +2344,23 @@ class WebScraper:
         section = Section("Content", [])
         chapter.sections.append(section)
 
-        for tag in soup.find_all(["h1", "h2", "h3", "p", "ul", "ol", "table", "img", "a"]):
-            if self.is_noise(tag) or self._is_in_header_footer(tag):
-                continue
-            self._handle_tag(tag, chapter, section, doc)
+        # One walk: noise, header and footer subtrees are dropped at their root
+        pending_images: List[Tuple[Section, StoredImage]] = []
+        for block in page.content_blocks(self._has_noise_attrs):
+            self._handle_tag(block.tag, chapter, section, doc, pending_images, text=block.text, items=block.items)
+        if pending_images:
+            with self.metrics.timed("image", url):
+                self._resolve_images(pending_images)
 
         return doc
 
-    def _is_in_header_footer(self, tag) -> bool:
-        return bool(tag.find_parent(["header", "footer"]))
-
-    def _handle_tag(self, tag, chapter: Chapter, section: Section, doc: Document):
-        text = tag.get_text(strip=True)
-        name = tag.name.lower()
+    def _handle_tag(self, tag, chapter: Chapter, section: Section, doc: Document,
+                    pending_images: Optional[List[Tuple[Section, StoredImage]]] = None,
+                    text: Optional[str] = None, items: Optional[List[str]] = None):
+        """`text` (and `items`, the li texts of a list) are read from the tag when not given"""
+        if text is None:
+            text = tag_text(tag)
+        name = tag_name(tag).lower()
 
         if name == "h1":
             new_ch = Chapter(text or "Untitled", [], number=len(doc.chapters) + 1)
@@ -1188,8 +2381,10 @@ class WebScraper:
             return
 
         if name in ["ul", "ol"]:
-            for li in tag.find_all("li"):
-                if t := li.get_text(strip=True):
+            if items is None:
+                items = [tag_text(li) for li in find_all_tags(tag, "li")]
+            for t in items:
+                if t:
                     section.content.append(Paragraph(t))
             return
 
@@ -1199,7 +2394,7 @@ class WebScraper:
             return
 
         if name == "img" and self.extract_images:
-            self._process_image(tag, chapter, section, doc)
+            self._process_image(tag, chapter, section, doc, pending_images)
             return
 
         if name == "a":
@@ -1214,61 +2409,59 @@ class WebScraper:
 
     def _extract_table(self, tag) -> Tuple[List[str], List[List[str]]]:
         """
-        Returns headers, rows
+        Returns headers, rows (read straight from the parsed table; pandas only as a fallback)
         """
         try:
-            df = pd.read_html(str(tag), header=0)[0]
-            return list(df.columns), df.values.tolist()
+            return extract_table(tag)
+        except Exception as e:
+            logger.debug(f"Table extraction failed, trying pandas: {e}")
+        try:
+            return read_html_table(tag)
         except Exception:
-            hdr, rows = [], []
-            for i, tr in enumerate(tag.find_all("tr")):
-                if i == 0:
-                    hdr = [th.get_text(strip=True) for th in tr.find_all("th")]
-                else:
-                    rows.append([td.get_text(strip=True) for td in tr.find_all("td")])
-            return hdr, rows
+            return [], []
 
-    def _process_image(self, tag, chapter: Chapter, section: Section, document: Document):
+    def _process_image(self, tag, chapter: Chapter, section: Section, document: Document,
+                       pending_images: Optional[List[Tuple[Section, StoredImage]]] = None):
         """
-        Download and (optionally) convert images. Create Image document objects.
+        Add an image element in document order. Downloading is deferred to
+        _resolve_images, which fetches all of a page's images (those collected
+        in `pending_images`) at once.
         """
         src = tag.get("src") or tag.get("data-src") or tag.get("data-original")
         if not src:
             return
-        url = urljoin(self.base_url, src)
+        url = urljoin(getattr(document, "url", None) or self.base_url, src)
         if not urlparse(url).netloc:
             return
-        try:
-            resp = self.session.get(url, timeout=self.connection_timeout)
-            resp.raise_for_status()
-            data = resp.content
-
-            # convert SVG to PNG optionally
-            if self.convert_svg and url.lower().endswith(".svg") and CAIROSVG_AVAILABLE:
-                try:
-                    png_bytes = cairosvg.svg2png(bytestring=data)
-                    data = png_bytes
-                except Exception as e:
-                    logger.debug("SVG conversion failed: %s", e)
-
-            pil = PILImage.open(BytesIO(data))
-            ext = (pil.format or "PNG").lower()
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=f".{ext}")
-            pil.save(tmp.name)
-            tmp.close()
-
-            img_obj = Image(tmp.name, caption=tag.get("alt", "").strip())
-            # If Image object exposes OCR capabilities, keep them (implementation-dependent)
-            if self.ocr_images and getattr(img_obj, "ocr_data", None):
-                if isinstance(img_obj.ocr_data, list):
-                    img_obj.ocr_data = {"ocr_text": " ".join(sum(img_obj.ocr_data, []))}
-            if getattr(img_obj, "ocr_data", None):
-                section.content.append(img_obj)
+        alt = tag.get("alt", "").strip()
+        element = StoredImage(url, alt=alt, caption=alt, url=url)
+        section.content.append(element)
+        if pending_images is not None:
+            pending_images.append((section, element))
+
+    def _resolve_images(self, pending: List[Tuple[Section, StoredImage]]):
+        """Fetch a page's images concurrently and attach the stored assets; drop failed ones"""
+        if not pending or self.image_pipeline is None:
+            return
+        assets = self.image_pipeline.fetch_many(element.url for _, element in pending)
+        for section, element in pending:
+            asset = assets.get(element.url)
+            if asset is None:
+                section.content.remove(element)
             else:
-                # append at least a reference for non-ocr images
-                section.content.append(img_obj)
-        except (requests.RequestException, UnidentifiedImageError, Exception) as e:
-            logger.warning(f"Image processing failed for {url}: {e}")
+                element.asset = asset
+                element.src = asset.path
+
+    @staticmethod
+    def _ocr_image_file(path: str) -> Optional[str]:
+        """OCR through the document framework's Image (runs in the OCR pool)"""
+        ocr_data = getattr(Image(path), "ocr_data", None)
+        if isinstance(ocr_data, list):
+            return " ".join(" ".join(map(str, item)) if isinstance(item, (list, tuple)) else str(item)
+                            for item in ocr_data)
+        if isinstance(ocr_data, dict):
+            return ocr_data.get("ocr_text")
+        return str(ocr_data) if ocr_data else None
 
     # -------------------- Output --------------------
     def save_output(self, document: Document):
@@ -1278,31 +2471,75 @@ class WebScraper:
         """
         with open(self.output_path, "w", encoding="utf-8") as f:
             if self.output_format == "json":
-                doc_dict = document.to_dict()
-                
-                # Add enhanced multilingual metadata to output
-                if hasattr(document, 'multilingual_data'):
-                    multilingual_data = document.multilingual_data
-                    doc_dict['multilingual_analysis'] = {
-                        'detected_languages': multilingual_data.get('detected_languages', []),
-                        'primary_language': multilingual_data.get('primary_language', 'en'),
-                        'language_analysis': multilingual_data.get('language_analysis', {}),
-                        'content_by_language': {
-                            lang: {
-                                'text_samples': content['texts'][:3] if content.get('texts') else [],  # First 3 text samples
-                                'direction': content.get('direction', 'ltr'),
-                                'script': content.get('script', 'latin'),
-                                'total_segments': len(content.get('texts', []))
-                            } for lang, content in (multilingual_data.get('multilingual_content') or {}).items()
-                        }
-                    }
-                
-                f.write(json.dumps(doc_dict, indent=2, default=str, ensure_ascii=False))
+                f.write(json.dumps(self._document_dict(document), indent=2, default=str, ensure_ascii=False))
             else:
                 f.write(self.print_content(document))
         
         logger.info(f"Output saved to {self.output_path}")
 
+    def _document_dict(self, document: Document) -> Dict[str, Any]:
+        """document.to_dict() plus the multilingual analysis summary"""
+        doc_dict = document.to_dict()
+        
+        # Add enhanced multilingual metadata to output
+        if hasattr(document, 'multilingual_data'):
+            multilingual_data = document.multilingual_data
+            doc_dict['multilingual_analysis'] = {
+                'detected_languages': multilingual_data.get('detected_languages', []),
+                'primary_language': multilingual_data.get('primary_language', 'en'),
+                'language_analysis': multilingual_data.get('language_analysis', {}),
+                'content_by_language': {
+                    lang: {
+                        'text_samples': content['texts'][:3] if content.get('texts') else [],  # First 3 text samples
+                        'direction': content.get('direction', 'ltr'),
+                        'script': content.get('script', 'latin'),
+                        'total_segments': len(content.get('texts', []))
+                    } for lang, content in (multilingual_data.get('multilingual_content') or {}).items()
+                }
+            }
+        return doc_dict
+
+    def _emit_page(self, doc: Document, page_id: str, parent_id: Optional[str], depth: int) -> bool:
+        """
+        Write a parsed page to the streaming sink. Returns True when it was
+        written, in which case the caller should not keep it in the tree.
+        """
+        if self.output_sink is None:
+            return False
+        if self.output_format == "json":
+            content = self._document_dict(doc)
+            content.pop("child_documents", None)
+        else:
+            content = self.print_content(doc)
+        self.output_sink.write({
+            "id": page_id,
+            "parent_id": parent_id,
+            "depth": depth,
+            "url": getattr(doc, "url", None),
+            "document": content,
+        })
+        return True
+
+    def _emit_image_records(self):
+        """OCR finishes after pages are streamed, so OCR text goes out as one record per distinct image"""
+        if self.image_pipeline is None or self.image_pipeline.ocr_func is None:
+            return
+        for asset in self.image_pipeline.assets():
+            self.output_sink.write({
+                "id": f"image:{asset.digest}",
+                "parent_id": None,
+                "depth": None,
+                "url": asset.url,
+                "document": {"type": "image_ocr", "content_hash": asset.digest,
+                             "path": asset.path, "ocr_text": asset.ocr.text},
+            })
+
+    def _close_output_sink(self):
+        sink, self.output_sink = self.output_sink, None
+        if sink is not None:
+            sink.close()
+            logger.info(f"Streamed {sink.count} pages to {sink.path}")
+
     def print_content(self, document: Document) -> str:
         """
         Flatten the Document object to structured text for saving or inspection.
@@ -1319,6 +2556,30 @@ class WebScraper:
             "session_id": self.session_id if hasattr(self, 'session_id') else None,
             "multilingual_enabled": self.enable_multilingual if hasattr(self, 'enable_multilingual') else False,
         }
+
+        # Per-host circuit breaker state
+        if self.enable_circuit_breaker and self.circuit_breakers:
+            stats["circuit_breakers"] = self.circuit_breakers.snapshot()
+        stats["rate_limits"] = self.rate_limiter.snapshot()
+        if self.concurrency_limiter is not None:
+            stats["concurrency_limits"] = self.concurrency_limiter.snapshot()
+        stats["metrics"] = self.metrics.snapshot()
+        stats["http_pool"] = {
+            "pool_connections": self.http_adapter._pool_connections,
+            "pool_maxsize": self.http_adapter._pool_maxsize,
+            "sync": self.http_adapter.stats.snapshot(),
+            "async": self._async_pool_stats.snapshot(),
+        }
+        stats["sitemaps"] = self.sitemap_reader.stats()
+        if self.recrawl is not None:
+            stats["recrawl"] = self.recrawl.stats()
+        if self.robots is not None:
+            stats["robots"] = self.robots.stats()
+
+        if self.page_cache is not None:
+            stats["page_cache"] = self.page_cache.stats()
+        if self.image_pipeline is not None:
+            stats["images"] = self.image_pipeline.stats()
         
         # Add multilingual processing statistics
         if hasattr(self, 'enable_multilingual') and self.enable_multilingual:
@@ -1330,20 +2591,20 @@ class WebScraper:
             }
         
         if self.enable_database and self.db_manager:
-            with sqlite3.connect(self.db_manager.db_path) as conn:
-                # Content type distribution
-                result = conn.execute(
-                    "SELECT content_type, COUNT(*) FROM crawled_urls WHERE session_id = ? GROUP BY content_type",
-                    (self.session_id,)
-                ).fetchall()
-                stats["content_type_distribution"] = dict(result)
-                
-                # Total response size
-                result = conn.execute(
-                    "SELECT SUM(response_size) FROM crawled_urls WHERE session_id = ?",
-                    (self.session_id,)
-                ).fetchone()
-                stats["total_response_size"] = result[0] if result[0] else 0
+            self.db_manager.flush()
+            # Content type distribution
+            result = self.db_manager.query(
+                "SELECT content_type, COUNT(*) FROM crawled_urls WHERE session_id = ? GROUP BY content_type",
+                (self.session_id,)
+            )
+            stats["content_type_distribution"] = dict(result)
+            
+            # Total response size
+            result = self.db_manager.query(
+                "SELECT SUM(response_size) FROM crawled_urls WHERE session_id = ?",
+                (self.session_id,)
+            )[0]
+            stats["total_response_size"] = result[0] if result[0] else 0
         
         return stats
     
@@ -1351,6 +2612,23 @@ class WebScraper:
         """Cleanup resources and close connections"""
         if hasattr(self, 'executor') and self.executor:
             self.executor.shutdown(wait=True)
+
+        self._flush_simhashes()
+
+        if self.browser_pool is not None:
+            self.browser_pool.close()
+
+        if self.image_pipeline is not None:
+            self.image_pipeline.close()
+
+        self._close_output_sink()
+
+        if self.persistent_frontier and not getattr(self, "_frontier_closed", False):
+            self._frontier_closed = True
+            try:
+                self.frontier.close()
+            except Exception as e:
+                logger.warning(f"Failed to checkpoint frontier: {e}")
         
         if self.enable_database and self.db_manager:
             # Ensure session is properly ended
@@ -1358,6 +2636,8 @@ class WebScraper:
                 self.db_manager.end_session(self.session_id)
             except Exception:
                 pass  # Session might already be ended
+            # Flush queued writes and stop the writer thread
+            self.db_manager.close()
         
         logger.info("WebScraper cleanup completed")
     
@@ -0,0 +1,146 @@
+"""
+Host-sharded multi-process crawling.
+
+Fetching is asynchronous, but parsing (BeautifulSoup, _parse_to_document) is
+CPU-bound and one process only ever gets one core's worth of it. A sharded
+crawl runs `crawl_processes` worker processes that share one SQLite frontier
+(see SharedFrontier). Hosts are assigned to workers by consistent hashing of
+the netloc, so a host is only ever fetched by one process and its rate
+limiter, circuit breaker and robots.txt state stay in that process; per-host
+politeness holds exactly as in a single-process crawl.
+
+Each worker streams its pages to its own output (an ndjson part file, or the
+shared per-page directory); the coordinator merges ndjson parts when every
+worker is done.
+"""
+
+from __future__ import annotations
+
+import bisect
+import concurrent.futures
+import copy
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+try:
+    from .output_sink import NDJSON
+except ImportError:
+    from output_sink import NDJSON
+
+logger = logging.getLogger(__name__)
+
+
+class HostShardRing:
+    """
+    Consistent hash ring mapping hosts to `shards` shards, with `replicas`
+    virtual nodes per shard so hosts spread evenly. Adding a shard moves only
+    about 1/shards of the hosts.
+    """
+
+    def __init__(self, shards: int, replicas: int = 64):
+        self.shards = max(1, shards)
+        points = []
+        for shard in range(self.shards):
+            for replica in range(replicas):
+                points.append((self._hash(f"shard-{shard}-{replica}"), shard))
+        points.sort()
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def shard_for_host(self, host: str) -> int:
+        if self.shards == 1:
+            return 0
+        index = bisect.bisect(self._points, self._hash(host.lower())) % len(self._points)
+        return self._owners[index]
+
+    def shard_for(self, url: str) -> int:
+        return self.shard_for_host(urlparse(url).netloc)
+
+
+def part_path(output_path: str, shard_index: int) -> str:
+    """ndjson part file of one worker: out.ndjson -> out.shard0.ndjson"""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.shard{shard_index}{ext or '.ndjson'}"
+
+
+def shard_config(config: Dict[str, Any], shard_index: int, shard_count: int) -> Dict[str, Any]:
+    """Config for one worker process of a sharded crawl"""
+    worker = copy.deepcopy(config)
+    s = worker.setdefault("scraper", {})
+    s["crawl_processes"] = shard_count
+    s["shard_index"] = shard_index
+    s["crawl_mode"] = "frontier"
+    s["persistent_frontier"] = True
+    if s.get("output_mode") == NDJSON and s.get("output_path"):
+        s["output_path"] = part_path(s["output_path"], shard_index)
+    # Each worker publishes its own metrics: one file / consecutive ports
+    if s.get("metrics_file"):
+        s["metrics_file"] = part_path(s["metrics_file"], shard_index)
+    if s.get("metrics_port"):
+        s["metrics_port"] = s["metrics_port"] + shard_index
+    return worker
+
+
+def run_shard(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker process entry point: crawl one shard and return its statistics"""
+    try:
+        from .scraper import WebScraper
+    except ImportError:
+        from scraper import WebScraper
+
+    with WebScraper(config) as scraper:
+        scraper.crawl()
+        return {
+            "shard": scraper.shard_index,
+            "pages": len(scraper.visited),
+            "failed_urls": list(scraper.failed_urls),
+            "frontier": scraper.frontier.stats(),
+        }
+
+
+def merge_parts(output_path: str, shard_count: int):
+    """Concatenate the workers' ndjson parts into output_path and remove them"""
+    with open(output_path, "ab") as out:
+        for shard_index in range(shard_count):
+            part = part_path(output_path, shard_index)
+            if not os.path.exists(part):
+                continue
+            with open(part, "rb") as f:
+                shutil.copyfileobj(f, out)
+            os.remove(part)
+
+
+def run_sharded_crawl(config: Dict[str, Any], shard_count: int) -> List[Dict[str, Any]]:
+    """
+    Run `shard_count` worker processes over one shared frontier and wait for
+    all of them. Returns each worker's statistics, in shard order. `config`
+    must use a streaming output_mode (WebScraper switches tree to ndjson).
+    """
+    s = config.get("scraper", {})
+    # spawn, not fork: the parent holds threads (DB writer, executors) that must not be copied
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=shard_count, mp_context=context) as pool:
+        futures = [pool.submit(run_shard, shard_config(config, shard_index, shard_count))
+                   for shard_index in range(shard_count)]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error("Crawl worker failed: %s", e)
+    output_path = s.get("output_path")
+    # pages mode needs no merge: the workers already share the page directory
+    if output_path and s.get("output_mode") == NDJSON:
+        if not s.get("resume") and os.path.exists(output_path):
+            os.remove(output_path)
+        merge_parts(output_path, shard_count)
+    return results
@@ -0,0 +1,161 @@
+"""
+Banded simhash index for near-duplicate detection.
+
+Follows Manku, Jain & Das Sarma ("Detecting Near-Duplicates for Web
+Crawling"): a 64-bit fingerprint is split into k+1 bands. If two fingerprints
+differ in at most k bits, the pigeonhole principle guarantees at least one
+band is identical, so only fingerprints sharing a band need a Hamming check.
+Lookups touch k+1 small buckets instead of every stored hash.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+SIMHASH_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS crawl_simhashes (
+        session_id TEXT,
+        hash INTEGER
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_simhash_session ON crawl_simhashes(session_id);
+"""
+
+
+def to_sqlite_int(value: int) -> int:
+    """SQLite integers are signed 64-bit; simhashes are unsigned"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def from_sqlite_int(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    x = a ^ b
+    return x.bit_count() if hasattr(x, "bit_count") else bin(x).count("1")
+
+
+class SimhashIndex:
+    """
+    Thread-safe banded index of simhash fingerprints.
+
+    `max_distance` is the largest Hamming distance still treated as a
+    near-duplicate (WebScraper's `similarity_threshold` is exclusive, so it
+    passes threshold - 1). The lock is only held for bucket lookups, never for
+    the simhash computation itself.
+    """
+
+    def __init__(self, max_distance: int = 2, bits: int = 64):
+        self.max_distance = max_distance
+        self.bits = bits
+        self._bands = self._make_bands(max(max_distance, 0) + 1, bits)
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._bands]
+        self._hashes = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_bands(count: int, bits: int) -> List[Tuple[int, int]]:
+        """(shift, mask) pairs splitting `bits` into `count` near-equal bands"""
+        count = min(count, bits)
+        width, extra = divmod(bits, count)
+        bands, shift = [], 0
+        for i in range(count):
+            w = width + (1 if i < extra else 0)
+            bands.append((shift, (1 << w) - 1))
+            shift += w
+        return bands
+
+    def _candidates(self, value: int) -> Iterator[int]:
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            yield from table.get((value >> shift) & mask, ())
+
+    def _find_locked(self, value: int) -> Optional[int]:
+        if value in self._hashes:
+            return value
+        for candidate in self._candidates(value):
+            if hamming_distance(value, candidate) <= self.max_distance:
+                return candidate
+        return None
+
+    def _add_locked(self, value: int):
+        if value in self._hashes:
+            return
+        self._hashes.add(value)
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            table.setdefault((value >> shift) & mask, []).append(value)
+
+    # -------------------- Public API --------------------
+    def find_near(self, value: int) -> Optional[int]:
+        """A stored fingerprint within max_distance of `value`, or None"""
+        if self.max_distance < 0:
+            return None
+        with self._lock:
+            return self._find_locked(value)
+
+    def add(self, value: int):
+        with self._lock:
+            self._add_locked(value)
+
+    def update(self, values: Iterable[int]):
+        with self._lock:
+            for value in values:
+                self._add_locked(value)
+
+    def check_and_add(self, value: int) -> bool:
+        """
+        Atomically test for a near-duplicate and insert if there is none.
+        Returns True when `value` is a near-duplicate (and was not added).
+        """
+        with self._lock:
+            if self.max_distance >= 0 and self._find_locked(value) is not None:
+                return True
+            self._add_locked(value)
+            return False
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, value: int) -> bool:
+        return value in self._hashes
+
+    def __iter__(self) -> Iterator[int]:
+        with self._lock:
+            return iter(list(self._hashes))
+
+    # -------------------- Persistence --------------------
+    @staticmethod
+    def save_hashes(conn: sqlite3.Connection, session_id: str, hashes: Iterable[int]):
+        """Append fingerprints to crawl_simhashes (caller commits)"""
+        conn.executemany(
+            "INSERT INTO crawl_simhashes (session_id, hash) VALUES (?, ?)",
+            [(session_id, to_sqlite_int(h)) for h in hashes]
+        )
+
+    @staticmethod
+    def load_hashes(conn: sqlite3.Connection, session_id: Optional[str] = None) -> List[int]:
+        """Fingerprints of one session, or of every session when session_id is None"""
+        if session_id is None:
+            rows = conn.execute("SELECT hash FROM crawl_simhashes")
+        else:
+            rows = conn.execute("SELECT hash FROM crawl_simhashes WHERE session_id = ?", (session_id,))
+        return [from_sqlite_int(h) for (h,) in rows]
+
+    def load_from_db(self, db_path: str, session_id: Optional[str] = None) -> int:
+        """Seed the index from the crawl DB so dedup spans sessions. Returns the count loaded."""
+        with sqlite3.connect(db_path) as conn:
+            conn.executescript(SIMHASH_SCHEMA)
+            hashes = self.load_hashes(conn, session_id)
+        self.update(hashes)
+        return len(hashes)
+
+    @classmethod
+    def save_to_db(cls, db_path: str, session_id: str, hashes: Iterable[int]):
+        hashes = list(hashes)
+        if not hashes:
+            return
+        with sqlite3.connect(db_path) as conn:
+            conn.executescript(SIMHASH_SCHEMA)
+            cls.save_hashes(conn, session_id, hashes)
@@ -0,0 +1,242 @@
+"""
+Streaming sitemap reader.
+
+Sitemaps used to be downloaded whole, parsed with ET.fromstring and walked
+recursively in the scraper's constructor, so an index listing millions of
+URLs had to fit in memory before the crawl could start. Here each sitemap is
+parsed incrementally with iterparse straight off the HTTP stream (gzip files
+are detected by their magic bytes and decompressed on the fly), every
+processed <url> element is released immediately, and child sitemaps of an
+index are fetched concurrently on a small thread pool. Entries reach the
+consumer through a bounded queue, so a slow consumer pauses the readers
+instead of letting parsed URLs pile up.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import gzip
+import logging
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, ContextManager, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+@dataclass
+class SitemapEntry:
+    """A <url> (or, inside an index, a child <sitemap>) entry"""
+    loc: str
+    lastmod: Optional[str] = None
+    priority: Optional[float] = None
+    changefreq: Optional[str] = None
+
+    @property
+    def lastmod_datetime(self) -> Optional[datetime]:
+        return parse_lastmod(self.lastmod)
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """W3C datetime (as used by <lastmod>) to an aware UTC datetime; None if absent or malformed"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class _PrefixedStream:
+    """Re-attaches sniffed bytes to the front of a stream (HTTP bodies cannot seek back)"""
+
+    def __init__(self, prefix: bytes, stream: BinaryIO):
+        self._prefix = prefix
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._prefix:
+            return self._stream.read(size)
+        if size is None or size < 0:
+            data, self._prefix = self._prefix + self._stream.read(), b""
+            return data
+        data, self._prefix = self._prefix[:size], self._prefix[size:]
+        if len(data) < size:
+            data += self._stream.read(size - len(data))
+        return data
+
+
+def _maybe_gunzip(stream: BinaryIO) -> BinaryIO:
+    head = stream.read(2)
+    prefixed = _PrefixedStream(head, stream)
+    if head == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=prefixed)
+    return prefixed
+
+
+def iter_sitemap(stream: BinaryIO) -> Iterator[Tuple[str, SitemapEntry]]:
+    """
+    Yield ("url", entry) and ("sitemap", entry) pairs from a sitemap or
+    sitemap index read from `stream`. Memory use is independent of the
+    number of entries.
+    """
+    root = None
+    for event, elem in ET.iterparse(_maybe_gunzip(stream), events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        kind = _local(elem.tag)
+        if kind not in ("url", "sitemap") or elem is root:
+            continue
+        fields = {_local(child.tag): (child.text or "").strip() for child in elem}
+        loc = fields.get("loc")
+        if loc:
+            try:
+                priority = float(fields["priority"]) if fields.get("priority") else None
+            except ValueError:
+                priority = None
+            yield kind, SitemapEntry(loc=loc, lastmod=fields.get("lastmod") or None,
+                                     priority=priority, changefreq=fields.get("changefreq") or None)
+        root.clear()
+
+
+def http_opener(session, timeout: float = 30.0,
+                headers_factory: Optional[Callable[[], dict]] = None) -> Callable[[str], ContextManager[BinaryIO]]:
+    """open_url for SitemapReader that streams responses from a requests session"""
+    @contextmanager
+    def open_url(url: str):
+        headers = headers_factory() if headers_factory else None
+        with session.get(url, timeout=timeout, stream=True, headers=headers) as resp:
+            resp.raise_for_status()
+            # Undo Content-Encoding; a .xml.gz file body is gunzipped by iter_sitemap
+            resp.raw.decode_content = True
+            yield resp.raw
+    return open_url
+
+
+_DONE = object()
+
+
+class SitemapReader:
+    """
+    Reads sitemaps and sitemap indexes concurrently.
+
+    `open_url(url)` is a context manager yielding a binary stream. Child
+    sitemaps are fetched on `workers` threads (each sitemap URL at most once,
+    at most `max_sitemaps` in total); at most `queue_size` parsed entries are
+    buffered ahead of the consumer.
+    """
+
+    def __init__(self, open_url: Callable[[str], ContextManager[BinaryIO]], workers: int = 4,
+                 max_urls: Optional[int] = None, max_sitemaps: int = 10000, queue_size: int = 1000):
+        self.open_url = open_url
+        self.workers = max(1, workers)
+        self.max_urls = max_urls
+        self.max_sitemaps = max_sitemaps
+        self.queue_size = max(1, queue_size)
+        self._lock = threading.Lock()
+        self.sitemaps_read = 0
+        self.urls_read = 0
+        self.failures = 0
+
+    def iter_entries(self, sitemap_urls: Iterable[str]) -> Iterator[SitemapEntry]:
+        """
+        URL entries from `sitemap_urls` and every sitemap they index, in no
+        particular order. Closing the generator early stops the readers.
+        """
+        out: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        seen = set()
+        pending = [1]  # guard held until all roots are submitted
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers,
+                                                         thread_name_prefix="sitemaps")
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    out.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def release():
+            with self._lock:
+                pending[0] -= 1
+                finished = pending[0] == 0
+            if finished:
+                put(_DONE)
+
+        def submit(url: str):
+            with self._lock:
+                if stop.is_set() or url in seen or len(seen) >= self.max_sitemaps:
+                    return
+                seen.add(url)
+                pending[0] += 1
+            try:
+                executor.submit(read, url)
+            except RuntimeError:
+                # Pool already shut down (consumer went away)
+                release()
+
+        def read(url: str):
+            try:
+                with self.open_url(url) as stream:
+                    for kind, entry in iter_sitemap(stream):
+                        if stop.is_set():
+                            break
+                        if kind == "sitemap":
+                            submit(entry.loc)
+                        elif not put(entry):
+                            break
+                with self._lock:
+                    self.sitemaps_read += 1
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                logger.debug(f"Failed to read sitemap {url}: {e}")
+            finally:
+                release()
+
+        for url in sitemap_urls:
+            submit(url)
+        release()
+
+        yielded = 0
+        try:
+            while self.max_urls is None or yielded < self.max_urls:
+                item = out.get()
+                if item is _DONE:
+                    break
+                yielded += 1
+                with self._lock:
+                    self.urls_read += 1
+                yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sitemaps_read": self.sitemaps_read,
+                "urls_read": self.urls_read,
+                "failures": self.failures,
+            }
@@ -0,0 +1,158 @@
+"""
+Direct HTML table extraction.
+
+_extract_table used `pd.read_html(str(tag), header=0)`: it serialized the
+table subtree, parsed it again and built a DataFrame only to turn it back
+into lists (and pandas 3 no longer accepts literal HTML there, so every table
+silently took a fallback that dropped the first row when it had no <th>).
+extract_table reads the already parsed table instead, from a BeautifulSoup
+tag or an lxml element:
+
+- rows are the table's own <tr>s (not those of nested tables), grouped like
+  HTML: <thead> first, then the body rows in order, <tfoot> last;
+- rowspan/colspan are expanded into a rectangular grid (a spanned cell's text
+  repeats in every slot it covers; spans never cross row groups);
+- headers come from <thead> (several header rows are joined per column),
+  else from a first row made only of <th> cells, else there are none;
+- ragged rows are padded with "" to the widest row.
+
+Cell text is get_text(strip=True), like paragraphs. read_html_table keeps the
+pandas path as an optional fallback; pandas is only imported when it runs.
+"""
+
+from __future__ import annotations
+
+from io import StringIO
+from typing import Any, Iterator, List, Optional, Tuple
+
+try:
+    from .content_walker import is_lxml_element, tag_html, tag_name, tag_text
+except ImportError:
+    from content_walker import is_lxml_element, tag_html, tag_name, tag_text
+
+ROW_GROUPS = frozenset(["thead", "tbody", "tfoot"])
+CELLS = frozenset(["td", "th"])
+# HTML caps colspan at 1000 and rowspan at 65534
+MAX_COLSPAN = 1000
+MAX_ROWSPAN = 65534
+
+# (text, rowspan or None for "to the end of the group", colspan, is_th)
+Cell = Tuple[str, int, int, bool]
+
+
+def _children(tag) -> Iterator[Any]:
+    """Child elements (no strings or comments) of either kind of element"""
+    if is_lxml_element(tag):
+        return (child for child in tag if isinstance(child.tag, str))
+    return (child for child in tag.children if getattr(child, "name", None))
+
+
+def _span(cell, name: str, limit: int) -> Optional[int]:
+    try:
+        value = int(str(cell.get(name, 1)).strip())
+    except ValueError:
+        return 1
+    return min(value, limit) if value > 0 else (None if value == 0 else 1)
+
+
+def _row_cells(tr) -> List[Cell]:
+    cells = []
+    for cell in _children(tr):
+        name = tag_name(cell)
+        if name in CELLS:
+            cells.append((tag_text(cell), _span(cell, "rowspan", MAX_ROWSPAN),
+                          _span(cell, "colspan", MAX_COLSPAN) or 1, name == "th"))
+    return cells
+
+
+def _row_groups(table) -> Tuple[List[list], List[list], List[list]]:
+    """(thead groups, body groups, tfoot groups), each group a list of rows of cells"""
+    head, body, foot = [], [], []
+    loose: List[List[Cell]] = []  # <tr>s directly under <table> form one group until a section interrupts
+    for child in _children(table):
+        name = tag_name(child)
+        if name == "tr":
+            loose.append(_row_cells(child))
+            continue
+        if loose:
+            body.append(loose)
+            loose = []
+        if name in ROW_GROUPS:
+            rows = [_row_cells(tr) for tr in _children(child) if tag_name(tr) == "tr"]
+            if name == "thead":
+                head.append(rows)
+            elif name == "tfoot":
+                foot.append(rows)
+            else:
+                body.append(rows)
+    if loose:
+        body.append(loose)
+    return head, body, foot
+
+
+def _expand(rows: List[List[Cell]]) -> List[Tuple[List[str], bool]]:
+    """One row group as a grid: (texts, every cell was a <th>) per row"""
+    grid = []
+    carried = {}  # column -> [rows still covered, text] from rowspans above
+    for index, cells in enumerate(rows):
+        out: List[str] = []
+        all_th = bool(cells)
+        col = 0
+        pending = iter(cells)
+        cell = next(pending, None)
+        while cell is not None or any(c >= col for c in carried):
+            span = carried.get(col)
+            if span is not None:
+                out.append(span[1])
+                span[0] -= 1
+                if span[0] == 0:
+                    del carried[col]
+                col += 1
+                continue
+            if cell is None:
+                out.append("")  # gap before a cell carried down further right
+                col += 1
+                continue
+            text, rowspan, colspan, is_th = cell
+            all_th = all_th and is_th
+            if rowspan is None:  # rowspan="0": to the end of the group
+                rowspan = len(rows) - index
+            for _ in range(colspan):
+                out.append(text)
+                if rowspan > 1:
+                    carried[col] = [rowspan - 1, text]
+                col += 1
+            cell = next(pending, None)
+        if out:
+            grid.append((out, all_th))
+    return grid
+
+
+def extract_table(table) -> Tuple[List[str], List[List[str]]]:
+    """(headers, rows) of a <table>; see the module docstring"""
+    head, body, foot = _row_groups(table)
+    header_rows = [row for group in head for row, _ in _expand(group)]
+    rows = [row for group in body + foot for row in _expand(group)]
+    if not header_rows and rows and rows[0][1]:
+        header_rows = [rows.pop(0)[0]]
+    data = [row for row, _ in rows]
+
+    width = max(map(len, header_rows + data), default=0)
+    headers: List[str] = []
+    if header_rows:
+        for col in range(width):
+            parts = []
+            for row in header_rows:
+                text = row[col] if col < len(row) else ""
+                if text and (not parts or parts[-1] != text):
+                    parts.append(text)
+            headers.append(" ".join(parts))
+    return headers, [row + [""] * (width - len(row)) for row in data]
+
+
+def read_html_table(table) -> Tuple[List[str], List[List[str]]]:
+    """The former pandas.read_html path (typed values, NaN for empty cells); needs pandas"""
+    import pandas as pd
+
+    df = pd.read_html(StringIO(tag_html(table)), header=0)[0]
+    return [str(c) for c in df.columns], df.values.tolist()
@@ -0,0 +1,137 @@
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+WORDS = ("tax registration invoice company refund customs excise filing deadline "
+         "penalty return audit threshold exemption zone authority portal guide "
+         "service request payment business individual document record").split()
+
+
+def make_page(index: int, links=(), extra: str = "") -> str:
+    """A small HTML page whose text is unique per index (so simhash sees it as new)"""
+    rng = random.Random(index)
+    body = " ".join(rng.choice(WORDS) for _ in range(80))
+    anchors = "".join(f'<a href="{href}">Link to {href}</a>' for href in links)
+    return (f"<html><head><title>Page {index}</title></head><body>"
+            f"<h1>Page {index}</h1><p>{body}</p>{extra}<div>{anchors}</div></body></html>")
+
+
+class LocalSite:
+    """
+    Serves a dict of path -> html (or (status, headers, body)) on localhost.
+    Set keep_alive to serve HTTP/1.1 persistent connections.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.hits = {}
+        self.keep_alive = False
+        self.lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            @property
+            def protocol_version(self):
+                return "HTTP/1.1" if site.keep_alive else "HTTP/1.0"
+
+            def do_GET(self):
+                with site.lock:
+                    site.hits[self.path] = site.hits.get(self.path, 0) + 1
+                page = site.pages.get(self.path)
+                if page is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status, headers, body = page if isinstance(page, tuple) else (200, {}, page)
+                if callable(body):
+                    status, headers, body = body(self)
+                data = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(status)
+                headers = {"Content-Type": "text/html; charset=utf-8", **headers}
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def page_factory():
+    """make_page, for tests that build their own sites"""
+    return make_page
+
+
+@pytest.fixture
+def local_site():
+    sites = []
+
+    def _start(pages):
+        site = LocalSite(pages)
+        sites.append(site)
+        return site
+
+    yield _start
+    for site in sites:
+        site.close()
+
+
+@pytest.fixture
+def tree_site(local_site):
+    """Root -> 3 children -> 2 grandchildren each (10 pages)"""
+    pages = {}
+    children = [f"/c{i}" for i in range(3)]
+    pages["/"] = make_page(0, children)
+    n = 1
+    for c in children:
+        grand = [f"{c}/g{j}" for j in range(2)]
+        pages[c] = make_page(n, grand)
+        n += 1
+        for g in grand:
+            pages[g] = make_page(n)
+            n += 1
+    return local_site(pages)
+
+
+def _scraper_config(base_url: str, tmp_path, **overrides) -> dict:
+    s = {
+        "url": base_url + "/",
+        "max_depth": 2,
+        "follow_links": True,
+        "request_delay": 0,
+        "respect_robots": False,
+        "extract_images": False,
+        "enable_database": False,
+        "enable_content_classification": False,
+        "retry_tries": 0,
+        "max_retry_attempts": 1,
+        "output_path": str(tmp_path / "out.json"),
+        "verbose": False,
+    }
+    s.update(overrides)
+    return {"scraper": s}
+
+
+@pytest.fixture
+def scraper_config(tmp_path):
+    """Factory for offline-friendly WebScraper configs"""
+    def _make(base_url: str, **overrides) -> dict:
+        return _scraper_config(base_url, tmp_path, **overrides)
+    return _make
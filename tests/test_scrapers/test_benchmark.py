@@ -0,0 +1,93 @@
+import json
+import re
+import urllib.error
+import urllib.request
+
+import pytest
+
+from scrapers.psense.web.benchmark import SiteSpec, SyntheticSite, compare, profile_config, run_benchmark
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url) as resp:
+            return resp.status, resp.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, ""
+
+
+def test_site_links_fan_out_and_duplicates_copy_leaf_pages():
+    spec = SiteSpec(pages=40, fanout=3, duplicate_ratio=0.25, page_kb=2, latency_ms=0, jitter_ms=0)
+    site = SyntheticSite(spec)
+    try:
+        assert len(site.pages) == 41  # and robots.txt
+        status, root = _get(site.base_url + "/")
+        assert status == 200
+        assert re.findall(r'href="(/p\d+)"', root) == ["/p1", "/p2", "/p3"]
+
+        bodies = [re.search(r"</h1>(.*)<ul>", site.pages[SyntheticSite.path(i)].decode()).group(1)
+                  for i in range(spec.pages)]
+        first_leaf = (spec.pages - 2) // spec.fanout + 1
+        assert len(set(bodies)) == spec.pages - int((spec.pages - first_leaf) * spec.duplicate_ratio)
+        # Only pages without links share a body
+        assert all(bodies.count(body) == 1 for body in bodies[:first_leaf])
+    finally:
+        site.close()
+
+
+def test_site_injects_429_and_5xx_but_never_on_robots():
+    site = SyntheticSite(SiteSpec(pages=5, latency_ms=0, jitter_ms=0, rate_429=0.3, rate_5xx=0.2, retry_after=1))
+    try:
+        statuses = [_get(site.base_url + "/p1")[0] for _ in range(200)]
+        assert all(_get(site.base_url + "/robots.txt")[0] == 200 for _ in range(20))
+    finally:
+        site.close()
+    assert 30 <= statuses.count(429) <= 90 and 15 <= statuses.count(503) <= 70
+    assert statuses.count(429) == site.counts["429"] and statuses.count(503) == site.counts["5xx"]
+    assert site.counts["requests"] == 220
+
+
+def test_profile_config_merges_and_isolates_paths(tmp_path):
+    config = {
+        "scraper": {"concurrency": 2, "output_path": "prod.json", "cache_dir": None, "_comment": "x"},
+        "profiles": {"p": {"concurrency": 8, "log_file": "crawl.log", "allowed_domains": ["example.com"],
+                           "_description": "y"}},
+    }
+    merged = profile_config(config, "p", "http://127.0.0.1:1", tmp_path, {"request_delay": 0})["scraper"]
+    assert merged["concurrency"] == 8 and merged["request_delay"] == 0
+    assert merged["url"] == "http://127.0.0.1:1/" and merged["allowed_domains"] == []
+    assert merged["output_path"] == str(tmp_path / "output_path")
+    assert merged["log_file"] == str(tmp_path / "log_file")
+    assert merged["cache_dir"] is None  # not configured, so not created
+    assert not any(key.startswith("_") for key in merged)
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {"profiles": {"a": {"pages_per_sec": 100, "fetch_p99_ms": 50, "peak_rss_mb": 80},
+                             "gone": {"pages_per_sec": 1}}}
+    current = {"profiles": {"a": {"pages_per_sec": 85, "fetch_p99_ms": 54, "peak_rss_mb": 60},
+                            "new": {"pages_per_sec": 1}}}
+    assert compare(baseline, current, tolerance=0.1) == ["a: pages_per_sec 100 -> 85 (-15%)"]
+    assert compare(baseline, current, tolerance=0.2) == []
+
+
+def test_run_benchmark_crawls_the_site_once_per_profile(tmp_path):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({
+        "scraper": {"respect_robots": False, "enable_database": False, "extract_images": False,
+                    "enable_content_classification": False, "request_delay": 0, "retry_tries": 0},
+        "profiles": {"flat": {"max_depth": 1, "follow_links": True, "concurrency": 1},
+                     "deep": {"max_depth": 3, "follow_links": True, "concurrency": 2}},
+    }))
+    spec = SiteSpec(pages=30, fanout=3, duplicate_ratio=0, page_kb=2, latency_ms=0, jitter_ms=0)
+    lines = []
+    results = run_benchmark(spec, config_file=str(config_file), log=lines.append)
+
+    assert list(results["profiles"]) == ["flat", "deep"] and len(lines) == 2
+    flat, deep = results["profiles"]["flat"], results["profiles"]["deep"]
+    assert flat["pages"] == 4 and deep["pages"] == 30
+    assert deep["server"]["requests"] == 30 and deep["failed_urls"] == 0
+    assert deep["pages_per_sec"] > 0 and deep["fetch_p99_ms"] >= deep["fetch_p50_ms"] > 0
+    assert results["site"]["pages"] == 30
@@ -0,0 +1,85 @@
+import asyncio
+
+from scrapers.psense.web.browser_pool import AsyncBrowserPool
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.url = None
+
+    async def set_extra_http_headers(self, headers):
+        self.headers = headers
+
+    async def goto(self, url, timeout=None):
+        if "fail" in url:
+            raise RuntimeError("navigation failed")
+        self.context.browser.active += 1
+        self.context.browser.peak = max(self.context.browser.peak, self.context.browser.active)
+        await asyncio.sleep(0.01)
+        self.context.browser.active -= 1
+        self.url = url
+
+    async def content(self):
+        return f"<html>{self.url}</html>"
+
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.active = 0
+        self.peak = 0
+
+    async def new_context(self):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+
+def test_pool_reuses_and_recycles_contexts():
+    browser = FakeBrowser()
+    pool = AsyncBrowserPool(size=2, pages_per_context=3, browser=browser)
+
+    async def run():
+        pages = await asyncio.gather(*(pool.render(f"http://x/{i}") for i in range(12)))
+        await pool.close()
+        return pages
+
+    pages = asyncio.run(run())
+    assert pages[5] == "<html>http://x/5</html>"
+    assert browser.peak == 2
+    # 12 pages over 2 contexts, each retired after 3 pages
+    assert len(browser.contexts) == 4
+    assert all(c.closed for c in browser.contexts)
+    assert pool.stats()["pages_rendered"] == 12
+
+
+def test_failed_render_replaces_context():
+    browser = FakeBrowser()
+    pool = AsyncBrowserPool(size=1, browser=browser)
+
+    async def run():
+        try:
+            await pool.render("http://x/fail")
+        except RuntimeError:
+            pass
+        return await pool.render("http://x/ok")
+
+    assert asyncio.run(run()) == "<html>http://x/ok</html>"
+    assert browser.contexts[0].closed
+    assert len(browser.contexts) == 2
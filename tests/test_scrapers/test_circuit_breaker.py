@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("simhash")
+requests = pytest.importorskip("requests")
+
+from scrapers.psense.web.scraper import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitBreakerOpenError,
+    CircuitBreakerRegistry,
+    CircuitBreakerState,
+    WebScraper,
+)
+
+
+def _failing():
+    raise requests.exceptions.ConnectionError("boom")
+
+
+def test_breaker_does_not_serialize_calls():
+    breaker = CircuitBreaker(CircuitBreakerConfig())
+    barrier = threading.Barrier(2, timeout=2)
+
+    @breaker
+    def call():
+        barrier.wait()  # only passes if both threads are inside the call at once
+        return True
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(call())) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [True, True]
+
+
+def test_breaker_opens_and_half_opens_with_single_trial():
+    breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=2, recovery_timeout=0.05))
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            breaker(_failing)()
+    assert breaker.state == CircuitBreakerState.OPEN
+    with pytest.raises(CircuitBreakerOpenError):
+        breaker(lambda: None)()
+
+    time.sleep(0.06)
+    breaker.before_call()  # the trial request
+    assert breaker.state == CircuitBreakerState.HALF_OPEN
+    with pytest.raises(CircuitBreakerOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreakerState.CLOSED
+
+
+def test_trial_ending_in_unexpected_error_does_not_wedge_breaker():
+    breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=1, recovery_timeout=0.05))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        breaker(_failing)()
+    time.sleep(0.06)
+
+    def broken():
+        raise ValueError("bad parse")
+
+    with pytest.raises(ValueError):
+        breaker(broken)()
+    assert breaker.state == CircuitBreakerState.OPEN  # counted as a failed trial
+
+    def cancelled():
+        raise KeyboardInterrupt
+
+    time.sleep(0.06)
+    with pytest.raises(KeyboardInterrupt):
+        breaker(cancelled)()
+    assert breaker.state == CircuitBreakerState.HALF_OPEN
+    # The interrupted trial was released: the next call probes and closes the breaker
+    assert breaker(lambda: "ok")() == "ok"
+    assert breaker.state == CircuitBreakerState.CLOSED
+
+
+def test_client_errors_do_not_trip_breaker():
+    response = requests.Response()
+    response.status_code = 404
+    not_found = requests.exceptions.HTTPError("404", response=response)
+    breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=1))
+
+    def missing():
+        raise not_found
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        breaker(missing)()
+    assert breaker.state == CircuitBreakerState.CLOSED
+
+
+def test_registry_isolates_hosts():
+    registry = CircuitBreakerRegistry(CircuitBreakerConfig(failure_threshold=1))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        registry.for_url("http://bad.example/x")(_failing)()
+    assert registry.get("bad.example").state == CircuitBreakerState.OPEN
+    assert registry.for_url("http://good.example/")(lambda: "ok")() == "ok"
+    snapshot = registry.snapshot()
+    assert snapshot["bad.example"]["state"] == "open"
+    assert snapshot["good.example"]["state"] == "closed"
+
+
+def test_crawl_statistics_report_breakers(tree_site, scraper_config):
+    with WebScraper(scraper_config(tree_site.base_url, max_depth=0)) as scraper:
+        scraper.crawl()
+        stats = scraper.get_crawl_statistics()
+    host = tree_site.base_url.split("//", 1)[1]
+    assert stats["circuit_breakers"][host]["state"] == "closed"
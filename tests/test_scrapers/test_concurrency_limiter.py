@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from scrapers.psense.web.concurrency_limiter import AdaptiveConcurrencyLimiter
+
+URL = "http://host.example/page"
+
+
+def test_limit_grows_additively_and_is_cut_multiplicatively():
+    limiter = AdaptiveConcurrencyLimiter(initial=2, max_limit=6, latency_window=4)
+    for _ in range(3):  # still measuring latency
+        limiter.record_success(URL, 0.01, time.monotonic())
+    assert limiter.limit(URL) == 2
+    for _ in range(3):  # 2 -> 2.5 -> 2.9 -> 3.2: about one per round of `limit` responses
+        limiter.record_success(URL, 0.01, time.monotonic())
+    assert limiter.limit(URL) == 3
+    for _ in range(100):
+        limiter.record_success(URL, 0.01, time.monotonic())
+    assert limiter.limit(URL) == 6
+
+    before_cut = time.monotonic()
+    limiter.record_overload(URL, before_cut)
+    assert limiter.limit(URL) == 3
+    limiter.record_overload(URL, before_cut)  # sent under the old limit: already accounted for
+    assert limiter.limit(URL) == 3
+    limiter.record_overload(URL, time.monotonic())
+    limiter.record_overload(URL, time.monotonic())
+    assert limiter.limit(URL) == 1
+    assert limiter.limit("http://other.example/") == 2
+    assert limiter.snapshot()["host.example"]["decreases"] == 3
+
+
+def test_rising_p95_cuts_the_limit_then_becomes_the_baseline():
+    limiter = AdaptiveConcurrencyLimiter(initial=4, max_limit=4, latency_window=5, latency_tolerance=2.0)
+    for _ in range(5):
+        limiter.record_success(URL, 0.010, time.monotonic())
+    limiter.record_success(URL, 0.015, time.monotonic())
+    assert limiter.limit(URL) == 4  # within tolerance
+
+    limiter.record_success(URL, 0.050, time.monotonic())
+    assert limiter.limit(URL) == 2
+    for _ in range(5):
+        limiter.record_success(URL, 0.050, time.monotonic())
+    assert limiter.limit(URL) == 1
+    for _ in range(5):  # still slow at the minimum: the host is slower now
+        limiter.record_success(URL, 0.050, time.monotonic())
+    assert limiter.snapshot()["host.example"]["p95_baseline_ms"] == 50.0
+    limiter.record_success(URL, 0.050, time.monotonic())
+    assert limiter.limit(URL) == 2  # healthy again at the new baseline
+
+
+def test_threads_never_exceed_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial=2, max_limit=2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work():
+        with limiter.slot(URL):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2 and limiter.snapshot()["host.example"]["in_flight"] == 0
+
+
+def test_async_waiters_are_woken_and_cancelled_waiters_free_nothing():
+    limiter = AdaptiveConcurrencyLimiter(initial=1, max_limit=1)
+
+    async def run():
+        await limiter.acquire_async(URL)
+        waiting = asyncio.create_task(limiter.acquire_async(URL))
+        cancelled = asyncio.create_task(limiter.acquire_async(URL))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        cancelled.cancel()
+        # A thread finishing its request wakes the loop's waiter
+        threading.Thread(target=limiter.release, args=(URL,)).start()
+        await asyncio.wait_for(waiting, 1)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        limiter.release(URL)
+
+    asyncio.run(run())
+    assert limiter.snapshot()["host.example"]["in_flight"] == 0
+
+
+@pytest.mark.parametrize("mode", ["recursive", "frontier"])
+def test_crawl_backs_off_a_throttling_host_and_speeds_up_on_a_healthy_one(local_site, page_factory,
+                                                                          scraper_config, mode):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from scrapers.psense.web.scraper import WebScraper
+
+    def site(max_in_flight):
+        state = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def serve(html):
+            def body(handler):
+                with lock:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+                    throttled = max_in_flight and state["active"] > max_in_flight
+                time.sleep(0.02)
+                with lock:
+                    state["active"] -= 1
+                return (429, {}, "") if throttled else (200, {}, html)
+            return body
+
+        children = [f"/p{i}" for i in range(40)]
+        pages = {path: serve(page_factory(i + 1)) for i, path in enumerate(children)}
+        pages["/"] = page_factory(0, children)
+        return local_site(pages), state
+
+    stats = {}
+    for name, max_in_flight in (("fragile", 2), ("healthy", 0)):
+        served, state = site(max_in_flight)
+        config = scraper_config(served.base_url, crawl_mode=mode, max_depth=1, concurrency=8,
+                                frontier_workers=8, per_domain_max=4, adaptive_concurrency=True)
+        with WebScraper(config) as scraper:
+            scraper.crawl()
+            stats[name] = scraper.concurrency_limiter.snapshot()[served.base_url.split("//", 1)[1]]
+        stats[name]["peak"] = state["peak"]
+
+    assert stats["fragile"]["decreases"] >= 1 and stats["fragile"]["limit"] < 4
+    assert stats["healthy"]["decreases"] == 0 and stats["healthy"]["limit"] > 4
+    assert stats["healthy"]["peak"] <= 8
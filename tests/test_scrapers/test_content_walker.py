@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+bs4 = pytest.importorskip("bs4")
+
+from scrapers.psense.web.content_walker import CONTENT_TAGS, walk_content
+
+
+def _menu(tag):
+    return "menu" in tag.get("class", [])
+
+
+def _find_all_blocks(soup):
+    """What the find_all / get_text / find_parent extraction produced"""
+    blocks = []
+    for tag in soup.find_all(sorted(CONTENT_TAGS)):
+        text = tag.get_text(strip=True)
+        if _menu(tag) or (tag.name != "img" and len(text) < 3) or tag.find_parent(["header", "footer"]):
+            continue
+        items = [li.get_text(strip=True) for li in tag.find_all("li")] if tag.name in ("ul", "ol") else None
+        blocks.append((tag, text, items))
+    return blocks
+
+
+def test_blocks_match_find_all_and_get_text():
+    rng = random.Random(7)
+    names = ["div", "p", "a", "ul", "ol", "li", "span", "h1", "h2", "table", "td", "img", "header", "script"]
+    strings = ["hello", "  ", "x", "a\n b", "<!--note-->", "<![CDATA[cd]]>"]
+
+    def fragment(depth):
+        if depth > 5 or rng.random() < 0.3:
+            return rng.choice(strings)
+        name = rng.choice(names)
+        if name == "img":
+            return '<img src="i.png">'
+        return f"<{name}>" + "".join(fragment(depth + 1) for _ in range(rng.randint(0, 4))) + f"</{name}>"
+
+    for _ in range(300):
+        soup = bs4.BeautifulSoup("<body>" + "".join(fragment(0) for _ in range(4)) + "</body>", "lxml")
+        walked = [(b.tag, b.text, b.items) for b in walk_content(soup, _menu)]
+        assert walked == _find_all_blocks(soup)
+
+
+def test_noise_header_and_footer_subtrees_are_pruned():
+    soup = bs4.BeautifulSoup(
+        "<header><p>Site name</p></header>"
+        "<p>Intro <a href='/x'>link one</a></p>"
+        "<ul class='menu'><li><a href='/home'>Home page</a></li></ul>"
+        "<ol><li>first<ol><li>nested</li></ol></li><li></li></ol>"
+        "<p>Aside <span><ul class='menu'><li>hidden</li></ul></span></p>"
+        "<footer><a href='/c'>Contact us</a></footer>",
+        "lxml",
+    )
+    blocks = [(b.tag.name, b.text, b.items) for b in walk_content(soup, _menu)]
+    assert blocks == [
+        ("p", "Introlink one", None),
+        ("a", "link one", None),
+        ("ol", "firstnested", ["firstnested", "nested", ""]),
+        ("ol", "nested", ["nested"]),
+        ("p", "Asidehidden", None),
+    ]
@@ -0,0 +1,61 @@
+import sqlite3
+import threading
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("simhash")
+
+from scrapers.psense.web.scraper import DatabaseManager, WebScraper
+
+
+def _count(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_writes_are_batched_and_flushed(tmp_path):
+    db = str(tmp_path / "crawl.db")
+    manager = DatabaseManager(db, batch_size=50, flush_interval=5.0)
+    manager.start_session("s", {})
+    for i in range(20):
+        manager.log_crawled_url("s", f"http://x/{i}", "article", 200, f"h{i}", 10)
+    assert manager.flush(timeout=5)
+    assert _count(db, "crawled_urls") == 20
+    assert manager.is_url_crawled("http://x/3")
+    assert not manager.is_url_crawled("http://x/99")
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    manager.close()
+
+
+def test_concurrent_writers_and_close_flushes(tmp_path):
+    db = str(tmp_path / "crawl.db")
+    manager = DatabaseManager(db, batch_size=7, queue_size=16)
+
+    def worker(n):
+        for i in range(50):
+            manager.log_failed_url("s", f"http://x/{n}/{i}", "boom", 1)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    manager.close()
+    assert _count(db, "failed_urls") == 400
+
+    # Writes after close still land synchronously
+    manager.end_session("s")
+    manager.log_failed_url("s", "http://late", "boom", 1)
+    assert _count(db, "failed_urls") == 401
+
+
+def test_scraper_cleanup_flushes_crawl_records(tree_site, scraper_config, tmp_path):
+    db = str(tmp_path / "crawl.db")
+    config = scraper_config(tree_site.base_url, enable_database=True, database_path=db, db_flush_interval=10.0)
+    with WebScraper(config) as scraper:
+        scraper.crawl()
+    assert _count(db, "crawled_urls") == 10
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT end_time FROM crawl_sessions").fetchone()[0] is not None
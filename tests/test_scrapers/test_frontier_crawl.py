@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("simhash")
+
+from scrapers.psense.web.frontier import CrawlFrontier
+from scrapers.psense.web.scraper import WebScraper
+
+
+def test_frontier_orders_by_priority_then_depth():
+    frontier = CrawlFrontier()
+    frontier.push("a", depth=2)
+    frontier.push("b", depth=1)
+    frontier.push("c", depth=3, priority=1.0)
+    assert not frontier.push("b", depth=0)  # already seen
+
+    order = []
+    while (entry := frontier.pop()) is not None:
+        order.append(entry.url)
+        frontier.mark_done(entry)
+    assert order == ["c", "b", "a"]
+    assert frontier.is_exhausted()
+    assert frontier.stats()["done"] == 3
+
+
+def test_frontier_tracks_in_flight():
+    frontier = CrawlFrontier()
+    frontier.push("a")
+    entry = frontier.pop()
+    assert frontier.in_flight_count == 1
+    assert not frontier.is_exhausted()
+    frontier.mark_done(entry, failed=True)
+    assert frontier.is_exhausted()
+    assert frontier.stats()["failed"] == 1
+
+
+@pytest.mark.parametrize("mode", ["recursive", "frontier"])
+def test_crawl_modes_visit_whole_tree(tree_site, scraper_config, mode):
+    config = scraper_config(tree_site.base_url, crawl_mode=mode, concurrency=4)
+    with WebScraper(config) as scraper:
+        root = scraper.crawl()
+
+    assert root is not None
+    assert root.title == "Page 0"
+    assert len(scraper.visited) == 10
+    assert len(root.child_documents) == 3
+    assert sorted(len(c.child_documents) for c in root.child_documents) == [2, 2, 2]
+
+
+def test_recursive_mode_does_not_starve_a_small_pool(tree_site, scraper_config):
+    # Two workers, both parked on their children: those children must still run
+    config = scraper_config(tree_site.base_url, crawl_mode="recursive", concurrency=2)
+    with WebScraper(config) as scraper:
+        worker = threading.Thread(target=scraper.crawl, daemon=True)
+        worker.start()
+        worker.join(timeout=30)
+        assert not worker.is_alive()
+    assert len(scraper.visited) == 10
+
+
+def test_frontier_mode_respects_max_depth(tree_site, scraper_config):
+    config = scraper_config(tree_site.base_url, crawl_mode="frontier", max_depth=1)
+    with WebScraper(config) as scraper:
+        root = scraper.crawl()
+    assert len(scraper.visited) == 4
+    assert all(not c.child_documents for c in root.child_documents)
+
+
+def test_frontier_mode_uses_overridden_safe_get(tree_site, scraper_config):
+    calls = []
+
+    class RecordingScraper(WebScraper):
+        def safe_get(self, url):
+            calls.append(url)
+            return super().safe_get(url)
+
+    config = scraper_config(tree_site.base_url, crawl_mode="frontier")
+    with RecordingScraper(config) as scraper:
+        scraper.crawl()
+    assert len(calls) == 10
+
+
+def test_frontier_mode_marks_unfetchable_urls_failed(tree_site, scraper_config):
+    tree_site.pages["/c1"] = (404, {}, "gone")
+    config = scraper_config(tree_site.base_url, crawl_mode="frontier")
+    with WebScraper(config) as scraper:
+        scraper.crawl()
+    stats = scraper.frontier.stats()
+    assert stats["failed"] == 1
+    assert stats["done"] == 7
@@ -0,0 +1,90 @@
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from scrapers.psense.web.http_pool import PooledHTTPAdapter, pool_sizes
+
+
+def test_pool_sizes_cover_every_thread():
+    assert pool_sizes(1, 2) == (10, 10)
+    connections, maxsize = pool_sizes(32, 4, extra_threads=12)
+    assert connections == 32 and maxsize == 44
+
+
+def test_adapter_counts_reuse(tree_site):
+    tree_site.keep_alive = True
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(pool_connections=2, pool_maxsize=2)
+    session.mount("http://", adapter)
+    for path in ("/", "/c0", "/c1"):
+        assert session.get(tree_site.url(path)).ok
+    stats = adapter.stats.snapshot()
+    assert stats["requests"] == 3
+    assert stats["new_connections"] == 1 and stats["reused_connections"] == 2
+    assert stats["discarded_connections"] == 0
+
+
+@pytest.mark.parametrize("mode", ["recursive", "frontier"])
+def test_crawl_reuses_connections(tree_site, scraper_config, mode):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from scrapers.psense.web.scraper import WebScraper
+
+    tree_site.keep_alive = True
+    config = scraper_config(tree_site.base_url, crawl_mode=mode, concurrency=16, per_domain_max=2,
+                            frontier_workers=4)
+    with WebScraper(config) as scraper:
+        scraper.crawl()
+        stats = scraper.get_crawl_statistics()["http_pool"]
+    assert stats["pool_maxsize"] >= 16
+    fetches = stats["async"] if mode == "frontier" else stats["sync"]
+    assert fetches["requests"] == 10
+    # At most one connection per concurrent slot to the host; the rest are kept-alive reuses
+    assert fetches["new_connections"] <= 2 and fetches["reused_connections"] >= 8
+
+
+def test_dns_cache_keeps_addresses_for_the_ttl(monkeypatch):
+    from scrapers.psense.web.http_pool import ConnectionStats, DNSCache
+
+    lookups = []
+
+    def getaddrinfo(host, port, family, type):
+        lookups.append(host)
+        return [(family, type, 6, "", ("10.0.0.1", port)), (family, type, 6, "", ("10.0.0.1", port)),
+                (family, type, 6, "", ("10.0.0.2", port))]
+
+    monkeypatch.setattr("scrapers.psense.web.http_pool.socket.getaddrinfo", getaddrinfo)
+    now = [0.0]
+    stats = ConnectionStats()
+    cache = DNSCache(60, stats, clock=lambda: now[0])
+    assert cache.resolve("a.example", 80) == ["10.0.0.1", "10.0.0.2"]
+    now[0] = 59
+    cache.resolve("a.example", 80)
+    assert lookups == ["a.example"]
+    now[0] = 61
+    cache.resolve("a.example", 80)
+    assert lookups == ["a.example", "a.example"]
+    assert stats.snapshot()["dns_cache_hits"] == 1 and stats.snapshot()["dns_cache_misses"] == 2
+
+
+def test_adapter_resolves_each_host_once_for_new_connections(tree_site, monkeypatch):
+    import socket
+
+    lookups = []
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, *args, **kwargs):
+        lookups.append(host)
+        return real_getaddrinfo(host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(dns_cache_ttl=300)
+    session.mount("http://", adapter)
+    url = tree_site.base_url.replace("127.0.0.1", "localhost")
+    for path in ("/", "/c0", "/c1"):  # no keep-alive: a new connection per request
+        assert session.get(url + path).ok
+    stats = adapter.stats.snapshot()
+    # urllib3 still passes the cached address through getaddrinfo, which needs no DNS query
+    assert stats["new_connections"] == 3 and lookups.count("localhost") == 1
+    assert stats["dns_cache_misses"] == 1 and stats["dns_cache_hits"] == 2
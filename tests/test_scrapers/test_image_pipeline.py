@@ -0,0 +1,99 @@
+import io
+import threading
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("simhash")
+PIL = pytest.importorskip("PIL.Image")
+requests = pytest.importorskip("requests")
+
+from scrapers.psense.web.image_pipeline import ImagePipeline, ImageStore
+from scrapers.psense.web.scraper import WebScraper
+
+
+def _stored_images(doc):
+    return [el for ch in doc.chapters for sec in ch.sections for el in sec.content if getattr(el, "asset", None)]
+
+
+def _png(color) -> bytes:
+    buf = io.BytesIO()
+    PIL.new("RGB", (4, 4), color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def image_site(local_site, page_factory):
+    logo = _png("red")
+    imgs = ('<img src="/logo.png" alt="Logo"><img src="/same-as-logo.png">'
+            '<img src="/photo.png" alt="Photo"><img src="/huge.png"><img src="/missing.png">')
+    pages = {
+        "/": page_factory(0, ["/a", "/b"], extra=imgs),
+        "/a": page_factory(1, extra='<img src="/logo.png" alt="Logo">'),
+        "/b": page_factory(2, extra='<img src="/logo.png" alt="Logo">'),
+        "/logo.png": (200, {"Content-Type": "image/png"}, logo),
+        "/same-as-logo.png": (200, {"Content-Type": "image/png"}, logo),
+        "/photo.png": (200, {"Content-Type": "image/png"}, _png("blue")),
+        "/huge.png": (200, {"Content-Type": "image/png"}, b"\0" * 5000),
+    }
+    return local_site(pages)
+
+
+def test_images_fetched_once_and_stored_by_content(image_site, scraper_config, tmp_path):
+    config = scraper_config(image_site.base_url, extract_images=True, ocr_images=False,
+                            image_store_dir=str(tmp_path / "images"), max_image_bytes=1000)
+    with WebScraper(config) as scraper:
+        root = scraper.crawl()
+        stats = scraper.image_pipeline.stats()
+
+    assert image_site.hits["/logo.png"] == 1
+    assert stats["distinct_images"] == 2
+    assert stats["content_dedup_hits"] == 1
+    assert len(list((tmp_path / "images").rglob("*.png"))) == 2
+
+    images = _stored_images(root)
+    assert [el.alt for el in images] == ["Logo", "", "Photo"]
+    assert images[0].src == images[1].src  # same content, same stored file
+    child_logo = _stored_images(root.child_documents[0])[0]
+    assert child_logo.to_dict()["content_hash"] == images[0].asset.digest
+
+
+def test_ocr_runs_once_per_distinct_image_in_background(tmp_path, image_site):
+    calls = []
+    lock = threading.Lock()
+
+    def fake_ocr(path):
+        with lock:
+            calls.append(path)
+        return "text"
+
+    pipeline = ImagePipeline(requests.Session(), ImageStore(str(tmp_path)), ocr_func=fake_ocr, ocr_batch_size=2)
+    urls = [image_site.url(p) for p in ("/logo.png", "/same-as-logo.png", "/photo.png", "/logo.png")]
+    assets = pipeline.fetch_many(urls)
+    pipeline.drain()
+    assert len(calls) == 2
+    assert assets[urls[0]].ocr.text == "text"
+    pipeline.close()
+
+
+def test_failed_image_is_reported_once(tmp_path, image_site, caplog):
+    pipeline = ImagePipeline(requests.Session(), ImageStore(str(tmp_path)))
+    missing = image_site.url("/missing.png")
+    with caplog.at_level("WARNING", logger="scrapers.psense.web.image_pipeline"):
+        for _ in range(3):
+            assert pipeline.fetch_many([missing]) == {missing: None}
+    assert image_site.hits["/missing.png"] == 1
+    assert sum(missing in r.getMessage() for r in caplog.records) == 1
+    pipeline.close()
+
+
+def test_finished_fetches_keep_no_futures(tmp_path, image_site):
+    pipeline = ImagePipeline(requests.Session(), ImageStore(str(tmp_path)))
+    urls = [image_site.url(p) for p in ("/logo.png", "/same-as-logo.png", "/missing.png")]
+    first = pipeline.fetch_many(urls)
+    assert pipeline._in_flight == {}
+    assert pipeline.fetch_many(urls) == first
+    stats = pipeline.stats()
+    assert stats["urls_seen"] == 3 and stats["url_dedup_hits"] == 3 and stats["downloads"] == 2
+    assert image_site.hits["/logo.png"] == 1 and image_site.hits["/missing.png"] == 1
+    pipeline.close()
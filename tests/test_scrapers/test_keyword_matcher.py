@@ -0,0 +1,86 @@
+import pytest
+
+from scrapers.psense.web import keyword_matcher
+from scrapers.psense.web.keyword_matcher import KeywordMatcher
+
+KEYWORDS = ["tag", "reporter", "api", "post", "aa", "tagged", "report", "sta"]
+TEXTS = [
+    "",
+    "tagged tags, a vintage tag",
+    "the reporterreporter reporteporter",
+    "capital apis: post, repost, postpost, postag",
+    "aaaaa",
+]
+
+
+def _reference_counts(keywords, text):
+    """Leftmost-longest, non-overlapping matches, one position at a time"""
+    counts = {k: 0 for k in keywords}
+    position = 0
+    while position < len(text):
+        found = [k for k in keywords if text.startswith(k, position)]
+        if found:
+            longest = max(found, key=len)
+            counts[longest] += 1
+            position += len(longest)
+        else:
+            position += 1
+    return [counts[k] for k in keywords]
+
+
+class _PurePythonAutomaton:
+    """pyahocorasick's Automaton API by brute force: every match, ordered by end position"""
+
+    def __init__(self):
+        self.words = {}
+
+    def add_word(self, word, value):
+        self.words[word] = value
+
+    def make_automaton(self):
+        pass
+
+    def iter(self, text):
+        for end in range(len(text)):
+            for word, value in self.words.items():
+                if end >= len(word) - 1 and text.startswith(word, end - len(word) + 1):
+                    yield end, value
+
+
+@pytest.fixture(params=["regex", "automaton", "pyahocorasick"])
+def matcher_path(request, monkeypatch):
+    if request.param == "regex":
+        monkeypatch.setattr(keyword_matcher, "AHOCORASICK_AVAILABLE", False)
+    elif request.param == "automaton":
+        # The automaton path's match selection, without needing the package
+        monkeypatch.setattr(keyword_matcher, "ahocorasick", type("fake", (), {"Automaton": _PurePythonAutomaton}))
+        monkeypatch.setattr(keyword_matcher, "AHOCORASICK_AVAILABLE", True)
+    else:
+        pytest.importorskip("ahocorasick")
+        monkeypatch.setattr(keyword_matcher, "AHOCORASICK_AVAILABLE", True)
+    return request.param
+
+
+def test_both_paths_count_leftmost_longest_matches(matcher_path):
+    matcher = KeywordMatcher(KEYWORDS + ["tag", ""])
+    assert matcher.keywords == KEYWORDS
+    assert (matcher._automaton is not None) == (matcher_path != "regex")
+    for text in TEXTS:
+        assert matcher.counts(text) == _reference_counts(KEYWORDS, text), text
+    assert matcher.counts("tagged tags") == [1, 0, 0, 0, 0, 1, 0, 0]
+    assert matcher.counts("aaaaa")[KEYWORDS.index("aa")] == 2
+
+
+def test_classifier_scores_text_and_classes():
+    pytest.importorskip("bs4")
+    from bs4 import BeautifulSoup
+    from scrapers.psense.web.scraper import ContentClassifier, ContentType
+
+    classifier = ContentClassifier()
+    soup = BeautifulSoup("<div class='forum-thread'>Reply</div>", "lxml")
+
+    assert classifier.classify_content(soup, "http://x/", text="Price: buy now, add to cart") == ContentType.PRODUCT
+    assert classifier.classify_content(soup, "http://x/a", text="", class_tokens=[]) == ContentType.UNKNOWN
+    # forum + thread in the class name, reply in the (lowercased) text
+    assert classifier.classify_content(soup, "http://x/a") == ContentType.FORUM
+    assert classifier.classify_content(soup, "http://x/blog/a", text="tag") == ContentType.BLOG
@@ -0,0 +1,113 @@
+"""Parity of the lxml extraction backend (parser_backend="lxml") with the BeautifulSoup path"""
+
+import json
+import random
+import warnings
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("lxml")
+pytest.importorskip("simhash")
+
+from scrapers.psense.web.page_context import PageContext
+from scrapers.psense.web.scraper import WebScraper
+
+PAGE = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html>
+<html><head><title> Tax &amp; Customs </title><style>.x{}</style><script>var a = "<p>no</p>";</script></head>
+<body class="home  page">
+<header><nav><a href="/skip">Skip me</a></nav></header>
+<h1>Registration</h1>
+<p>Companies must <a href="/register#form">register online</a> before filing.<!-- hidden --></p>
+<ul class="nav-menu"><li><a href="/a">Menu item</a></li></ul>
+<ol><li>First step<ol><li>Nested step</li></ol></li><li>Second step</li></ol>
+<h2>Fees</h2>
+<table><tr><th>Service</th><th>Fee</th></tr><tr><td>Filing</td><td>100</td></tr></table>
+<img src="/logo.png" alt="Logo"><img class="advert" src="/ad.png">
+<p>Café &nbsp; <ruby>漢<rt>kan</rt></ruby> <template><p>template text</p></template></p>
+<a href="/guide.pdf">Download the guide</a>
+<footer><p>Contact us</p></footer>
+</body></html>
+"""
+
+
+def _parse(scraper, html, parser):
+    page = PageContext("http://x.example/page", html, parser=parser)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        doc = scraper._parse_to_document(page.soup if parser == "bs4" else None, page.url, page=page)
+        views = (page.title, page.visible_text, page.class_tokens, page.links)
+    if doc is None:
+        return None, views
+    data = doc.to_dict()
+    data.pop("created_date", None)
+    return json.dumps(data, sort_keys=True, default=str), views
+
+
+@pytest.fixture
+def scraper(scraper_config):
+    config = scraper_config("http://x.example", extract_images=True, extract_tables=True, min_text_len=0)
+    with WebScraper(config) as scraper:
+        scraper.image_pipeline = None  # keep image elements without fetching them
+        scraper.simhashes.check_and_add = lambda value: False
+        yield scraper
+
+
+def test_lxml_document_matches_beautifulsoup(scraper):
+    bs4_doc, bs4_views = _parse(scraper, PAGE, "bs4")
+    lxml_doc, lxml_views = _parse(scraper, PAGE, "lxml")
+    assert lxml_views == bs4_views and lxml_doc == bs4_doc
+
+    assert bs4_views[0] == "Tax & Customs"
+    content = json.loads(lxml_doc)["chapters"][0]["sections"][0]["content"]
+    texts = [item.get("text") for item in content]
+    assert "Companies mustregister onlinebefore filing." in texts  # get_text(strip=True) joins without spaces
+    assert "Nested step" in texts and "Menu item" not in texts and "Contact us" not in texts
+    assert [item["src"] for item in content if item["type"] == "image"] == ["http://x.example/logo.png"]
+
+
+def test_lxml_matches_beautifulsoup_on_random_markup(scraper):
+    rng = random.Random(3)
+    names = ["div", "p", "a", "ul", "ol", "li", "span", "h1", "h2", "h3", "table", "tr", "th", "td", "img",
+             "header", "footer", "script", "style", "template", "title", "em", "br"]
+    strings = ["hello", "  ", "x", "a\n b", "&amp; &lt;b&gt;", "<!--c-->", "<![CDATA[cd]]>", "<?pi x?>"]
+
+    def fragment(depth):
+        if depth > 5 or rng.random() < 0.3:
+            return rng.choice(strings)
+        name = rng.choice(names)
+        attrs = rng.choice(["", "", "", ' class="menu x"', ' class=" c1\tc2 "', ' id="sidebar"'])
+        if name == "a":
+            attrs += f' href="/l{rng.randint(0, 9)}#f"'
+        if name in ("img", "br"):
+            return f'<{name} src="/i{rng.randint(0, 3)}.png"{attrs}>'
+        return f"<{name}{attrs}>" + "".join(fragment(depth + 1) for _ in range(rng.randint(0, 4))) + f"</{name}>"
+
+    for i in range(200):
+        html = f"<html><head><title>T{i}</title></head><body>" + "".join(fragment(0) for _ in range(5))
+        assert _parse(scraper, html, "lxml") == _parse(scraper, html, "bs4"), html
+
+
+def test_empty_page(scraper):
+    assert _parse(scraper, "", "lxml") == _parse(scraper, "", "bs4")
+
+
+def test_crawl_output_matches_beautifulsoup(tree_site, scraper_config, tmp_path):
+    outputs = []
+    for backend in ("bs4", "lxml"):
+        path = tmp_path / f"{backend}.ndjson"
+        config = scraper_config(tree_site.base_url, parser_backend=backend, output_mode="ndjson",
+                                output_path=str(path))
+        with WebScraper(config) as scraper:
+            scraper.crawl()
+        records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        for record in records:
+            record["document"].pop("created_date", None)
+        outputs.append(sorted(records, key=lambda r: r["url"]))
+    assert len(outputs[0]) == 10 and outputs[1] == outputs[0]
+
+
+def test_unknown_backend_is_rejected(scraper_config):
+    with pytest.raises(ValueError):
+        WebScraper(scraper_config("http://x.example", parser_backend="html5lib"))
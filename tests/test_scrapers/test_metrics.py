@@ -0,0 +1,101 @@
+import json
+import urllib.request
+
+import pytest
+
+from scrapers.psense.web.metrics import OTHER_HOSTS, CrawlMetrics, LatencyHistogram, MetricsReporter
+
+
+def test_histogram_quantiles():
+    hist = LatencyHistogram()
+    for seconds in [0.002] * 90 + [0.3] * 9 + [12.0]:
+        hist.observe(seconds)
+    data = hist.to_dict()
+    assert data["count"] == 100
+    assert data["p50"] == 0.0025 and data["p95"] == 0.5 and data["max"] == 12.0
+    assert data["buckets"] == {"0.0025": 90, "0.5": 9, "30.0": 1}
+
+
+def test_metrics_per_host_and_gauges():
+    now = [0.0]
+    metrics = CrawlMetrics(max_hosts=2, clock=lambda: now[0])
+    metrics.observe("fetch", 0.1, "http://a.example/x")
+    metrics.observe("fetch", 0.2, "b.example")
+    metrics.observe("fetch", 0.3, "c.example")
+    metrics.register_gauge("queue_depth", lambda: 7)
+    with metrics.timed("parse"):
+        assert metrics.snapshot()["in_progress"] == {"parse": 1}
+    metrics.add_bytes(1000, "http://a.example/x")
+
+    now[0] = 2.0
+    snap = metrics.snapshot()
+    assert snap["stages"]["fetch"]["count"] == 3 and snap["stages"]["parse"]["count"] == 1
+    assert sorted(snap["hosts"]) == [OTHER_HOSTS, "a.example", "b.example"]
+    assert snap["hosts"]["a.example"]["bytes"] == 1000
+    assert snap["bytes_per_sec"] == 500.0
+    assert snap["gauges"] == {"queue_depth": 7} and snap["in_progress"] == {}
+
+
+def test_each_reporter_output_tracks_its_own_recent_rate():
+    now = [0.0]
+    metrics = CrawlMetrics(clock=lambda: now[0])
+    reporter = MetricsReporter(metrics)
+    metrics.add_bytes(1000)
+    now[0] = 2.0
+    assert reporter.snapshot("http")["recent_bytes_per_sec"] == 500.0
+    assert metrics.snapshot() == metrics.snapshot()  # reading has no side effects
+
+    metrics.add_bytes(3000)
+    now[0] = 4.0
+    # The file output has not published yet: its window still starts at 0
+    assert reporter.snapshot("file")["recent_bytes_per_sec"] == 1000.0
+    assert reporter.snapshot("http")["recent_bytes_per_sec"] == 1500.0
+
+
+@pytest.mark.parametrize("mode", ["recursive", "frontier"])
+def test_crawl_publishes_live_metrics(tree_site, scraper_config, tmp_path, mode):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from scrapers.psense.web.scraper import WebScraper
+
+    path = tmp_path / "metrics.json"
+    config = scraper_config(tree_site.base_url, crawl_mode=mode, enable_database=True,
+                            database_path=str(tmp_path / "crawl.db"), metrics_file=str(path), metrics_port=0)
+    served = []
+
+    class PollingScraper(WebScraper):
+        def _parse_to_document(self, soup, url, page=None):
+            if not served:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.metrics_reporter.port}/metrics") as resp:
+                    served.append(json.load(resp))
+            return super()._parse_to_document(soup, url, page=page)
+
+    with PollingScraper(config) as scraper:
+        scraper.crawl()
+
+    assert served and served[0]["stages"]["fetch"]["count"] >= 1
+    snap = json.loads(path.read_text())
+    host = tree_site.base_url.split("//", 1)[1].split(":")[0]
+    assert {"fetch", "parse", "dedup", "connect", "db_write"} <= set(snap["stages"])
+    assert snap["stages"]["fetch"]["count"] == 10 and snap["bytes"] > 0
+    assert snap["hosts"][host]["stages"]["fetch"]["count"] == 10
+    assert snap["gauges"]["pages_visited"] == 10
+
+
+def test_busy_metrics_port_does_not_stop_the_crawl(tree_site, scraper_config, tmp_path):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from scrapers.psense.web.scraper import WebScraper
+
+    busy = HTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+    try:
+        path = tmp_path / "metrics.json"
+        config = scraper_config(tree_site.base_url, metrics_port=busy.server_address[1], metrics_file=str(path),
+                                output_mode="ndjson", output_path=str(tmp_path / "out.ndjson"))
+        with WebScraper(config) as scraper:
+            assert scraper.crawl() is not None
+    finally:
+        busy.server_close()
+    assert len((tmp_path / "out.ndjson").read_text().splitlines()) == 10
+    assert json.loads(path.read_text())["stages"]["fetch"]["count"] == 10
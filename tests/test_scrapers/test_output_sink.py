@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("simhash")
+
+from scrapers.psense.web.scraper import WebScraper
+
+
+@pytest.mark.parametrize("mode", ["recursive", "frontier"])
+def test_ndjson_streams_one_line_per_page(tree_site, scraper_config, tmp_path, mode):
+    out = tmp_path / "crawl.ndjson"
+    config = scraper_config(tree_site.base_url, crawl_mode=mode, output_mode="ndjson", output_path=str(out))
+    with WebScraper(config) as scraper:
+        root = scraper.crawl()
+
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 10
+    by_id = {r["id"]: r for r in records}
+    roots = [r for r in records if r["parent_id"] is None]
+    assert len(roots) == 1 and roots[0]["document"]["title"] == "Page 0"
+    assert all(r["parent_id"] in by_id for r in records if r["parent_id"] is not None)
+    assert sorted(r["depth"] for r in records) == [0, 1, 1, 1, 2, 2, 2, 2, 2, 2]
+    assert all("child_documents" not in r["document"] for r in records)
+    # Streamed pages are released instead of being attached to the tree
+    assert root is not None and root.child_documents == []
+
+
+def test_pages_mode_writes_one_file_per_page(tree_site, scraper_config, tmp_path):
+    out = tmp_path / "pages"
+    config = scraper_config(tree_site.base_url, output_mode="pages", output_path=str(out))
+    with WebScraper(config) as scraper:
+        scraper.crawl()
+    files = sorted(out.glob("*.json"))
+    assert len(files) == 10
+    assert {json.loads(f.read_text(encoding="utf-8"))["depth"] for f in files} == {0, 1, 2}
+
+
+def test_sink_without_write_cannot_be_created(tmp_path):
+    from scrapers.psense.web.output_sink import OutputSink
+
+    class Incomplete(OutputSink):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(str(tmp_path / "out"))
+    with pytest.raises(TypeError):
+        OutputSink(str(tmp_path / "out"))
@@ -0,0 +1,141 @@
+import threading
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("simhash")
+
+from scrapers.psense.web.page_cache import PageCache
+from scrapers.psense.web.scraper import WebScraper
+
+
+@pytest.fixture
+def etag_site(local_site, page_factory):
+    """Root plus three children; every page honours If-None-Match"""
+    conditional = []
+
+    def serve(html, etag):
+        def body(handler):
+            if handler.headers.get("If-None-Match") == etag:
+                conditional.append(handler.path)
+                return 304, {}, b""
+            return 200, {"ETag": etag}, html
+        return 200, {}, body
+
+    pages = {"/": serve(page_factory(0, ["/c0", "/c1", "/c2"]), '"root"')}
+    for i in range(3):
+        pages[f"/c{i}"] = serve(page_factory(i + 1), f'"c{i}"')
+    site = local_site(pages)
+    site.conditional = conditional
+    return site
+
+
+def test_entry_keeps_validators(tmp_path):
+    cache = PageCache(str(tmp_path), ttl=0)
+    cache.put("http://x/", "<html></html>", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    entry = cache.get("http://x/")
+    assert entry.conditional_headers() == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+    assert cache.get_fresh("http://x/") is None  # expired, but still usable for revalidation
+    cache.put_parsed("http://x/", entry.content_hash, {"doc": 1})
+    assert cache.get_parsed("http://x/", entry.content_hash) == {"doc": 1}
+    assert cache.get_parsed("http://x/", "other-hash") is None
+
+
+@pytest.mark.parametrize("mode", ["recursive", "frontier"])
+def test_recrawl_revalidates_and_skips_parsing(etag_site, scraper_config, tmp_path, mode):
+    config = scraper_config(etag_site.base_url, crawl_mode=mode, cache_dir=str(tmp_path / "cache"), cache_ttl=0)
+    with WebScraper(config) as scraper:
+        first = scraper.crawl()
+    assert etag_site.conditional == []
+
+    parsed = []
+
+    class CountingScraper(WebScraper):
+        def _parse_to_document(self, soup, url, page=None):
+            parsed.append(url)
+            return super()._parse_to_document(soup, url, page=page)
+
+    with CountingScraper(config) as scraper:
+        second = scraper.crawl()
+
+    assert sorted(etag_site.conditional) == ["/", "/c0", "/c1", "/c2"]
+    assert parsed == []
+    assert second.title == first.title
+    assert sorted(c.title for c in second.child_documents) == sorted(c.title for c in first.child_documents)
+
+
+def test_cache_is_sharded_compressed_and_bounded(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=20000, compression="gzip")
+    body = "<html>" + "repetitive government page text " * 500 + "</html>"
+    path = cache.path_for("http://x/0")
+    assert path.startswith(str(tmp_path / path.split("/")[-1][:2] / path.split("/")[-1][2:4]))
+
+    cache.put("http://x/0", body)
+    assert cache.total_bytes < len(body) / 10
+    for i in range(1, 200):
+        cache.put(f"http://x/{i}", body + str(i))
+        cache.get("http://x/0")  # keep the first entry hot
+    assert cache.total_bytes <= 20000
+    assert cache.get("http://x/0").body == body
+    assert cache.get("http://x/1") is None
+    assert cache.stats()["evictions"] > 0
+
+    # A fresh instance rebuilds the index from disk
+    reopened = PageCache(str(tmp_path), max_bytes=20000)
+    assert len(reopened) == len(cache)
+    assert reopened.get("http://x/0").body == body
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_async_fetch_keeps_cache_io_off_the_event_loop(etag_site, scraper_config, tmp_path):
+    pytest.importorskip("aiohttp")
+    threads = set()
+
+    class RecordingCache(PageCache):
+        def get(self, url):
+            threads.add(threading.current_thread())
+            return super().get(url)
+
+        def touch(self, url, entry):
+            threads.add(threading.current_thread())
+            return super().touch(url, entry)
+
+    config = scraper_config(etag_site.base_url, crawl_mode="frontier", cache_dir=str(tmp_path / "cache"), cache_ttl=0)
+    for _ in range(2):
+        with WebScraper(config) as scraper:
+            scraper.page_cache = RecordingCache(str(tmp_path / "cache"), ttl=0)
+            scraper.crawl()
+    assert sorted(etag_site.conditional) == ["/", "/c0", "/c1", "/c2"]
+    assert threads and threading.main_thread() not in threads
+
+
+def test_reopening_removes_stale_temp_files_and_counts_under_the_lock(tmp_path):
+    import os
+    import time
+
+    cache = PageCache(str(tmp_path), compression="gzip")
+    cache.put("http://x/0", "<html>page</html>")
+    shard = os.path.dirname(cache.path_for("http://x/0"))
+    stale, fresh = os.path.join(shard, "crashed.tmp"), os.path.join(shard, "writing.tmp")
+    for path in (stale, fresh):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+    old = time.time() - 2 * 3600
+    os.utime(stale, (old, old))
+
+    reopened = PageCache(str(tmp_path))
+    assert not os.path.exists(stale) and os.path.exists(fresh)
+    assert len(reopened) == 1
+
+    def read():
+        for i in range(200):
+            reopened.get("http://x/0" if i % 2 else "http://x/missing")
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert reopened.stats()["hits"] == 800 and reopened.stats()["misses"] == 800
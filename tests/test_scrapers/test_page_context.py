@@ -0,0 +1,58 @@
+import pytest
+
+bs4 = pytest.importorskip("bs4")
+pytest.importorskip("simhash")
+
+from scrapers.psense.web import page_context
+from scrapers.psense.web.page_context import PageContext
+from scrapers.psense.web.scraper import WebScraper
+
+HTML = """<html><head><title>T</title><style>a{}</style><script>var x</script></head>
+<body class="main docs"><!--hidden--><p class="a b">Hi <b>there</b></p>
+<a href="/x#frag">X</a><a href="https://other.example/y">Y</a></body></html>"""
+
+
+def _legacy_visible_text(html):
+    soup = bs4.BeautifulSoup(html, "lxml")
+    for s in soup(["script", "style"]):
+        s.extract()
+    for c in soup.find_all(string=lambda t: isinstance(t, bs4.Comment)):
+        c.extract()
+    return soup.get_text(separator=" ", strip=True)
+
+
+def test_views_match_legacy_extraction():
+    page = PageContext("http://site.test/dir/", HTML)
+    assert page.visible_text == _legacy_visible_text(HTML)
+    assert page.class_tokens == ["main", "docs", "a", "b"]
+    assert page.links == ["http://site.test/x", "https://other.example/y"]
+    assert page.soup is page.soup
+
+
+def test_page_parsed_once_with_all_stages_enabled(tree_site, scraper_config, tmp_path, monkeypatch):
+    parses = []
+    real = page_context.BeautifulSoup
+
+    def counting(*args, **kwargs):
+        parses.append(1)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(page_context, "BeautifulSoup", counting)
+    config = scraper_config(tree_site.base_url, max_depth=0, enable_database=True,
+                            enable_content_classification=True,
+                            database_path=str(tmp_path / "crawl.db"))
+    with WebScraper(config) as scraper:
+        assert scraper.crawl() is not None
+        stats = scraper.get_crawl_statistics()
+
+    assert len(parses) == 1
+    assert sum(stats["content_type_distribution"].values()) == 1
+
+
+@pytest.mark.parametrize("mode", ["recursive", "frontier"])
+def test_fetch_statuses_are_not_kept_without_a_database(tree_site, scraper_config, mode):
+    config = scraper_config(tree_site.base_url, crawl_mode=mode, concurrency=4)
+    with WebScraper(config) as scraper:
+        scraper.crawl()
+        assert len(scraper.visited) == 10
+        assert scraper._fetch_status == {}
@@ -0,0 +1,69 @@
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("simhash")
+
+from scrapers.psense.web.frontier import PersistentFrontier
+from scrapers.psense.web.scraper import WebScraper
+
+
+def test_resume_requeues_in_flight_and_skips_done(tmp_path):
+    db = str(tmp_path / "crawl.db")
+    frontier = PersistentFrontier(db, "s1", state_provider=lambda: {"simhashes": [1, 2 ** 64 - 1]})
+    for url in ("a", "b", "c"):
+        frontier.push(url)
+    done = frontier.pop()
+    frontier.mark_done(done)
+    frontier.pop()  # in flight when the process "dies"
+    frontier.checkpoint()
+
+    resumed = PersistentFrontier(db, "s1")
+    state = resumed.resume()
+    assert state["done_keys"] == ["a"]
+    assert sorted(state["simhashes"]) == [1, 2 ** 64 - 1]
+    assert resumed.queued_count == 2
+    assert not resumed.push("a")
+    assert sorted(e.url for e in (resumed.pop(), resumed.pop())) == ["b", "c"]
+
+
+def test_load_session_config(tmp_path):
+    db = str(tmp_path / "crawl.db")
+    PersistentFrontier(db, "s2", config={"scraper": {"url": "http://x"}}).close()
+    assert PersistentFrontier.load_session_config(db, "s2") == {"scraper": {"url": "http://x"}}
+    assert PersistentFrontier.load_session_config(db, "missing") is None
+
+
+def test_crawl_resumes_without_refetching(tree_site, scraper_config, tmp_path):
+    db = str(tmp_path / "crawl.db")
+    root_key = tree_site.url("")  # normalized form of the root URL
+
+    # Simulate a run that died after the root page, with one child in flight
+    crashed = PersistentFrontier(db, "resume_me")
+    crashed.push(tree_site.url("/"), key=root_key)
+    crashed.mark_done(crashed.pop())
+    for path in ("/c0", "/c1", "/c2"):
+        crashed.push(tree_site.url(path), depth=1, parent_key=root_key)
+    crashed.pop()
+
+    config = scraper_config(tree_site.base_url, session_id="resume_me", resume=True, frontier_db_path=db)
+    with WebScraper(config) as scraper:
+        root = scraper.crawl()
+
+    assert tree_site.hits.get("/", 0) == 0
+    assert all(tree_site.hits[p] == 1 for p in ("/c0", "/c1", "/c2", "/c0/g0", "/c2/g1"))
+    assert root is not None and len(root.child_documents) == 3
+    assert scraper.frontier.stats()["done"] == 10
+
+
+def test_resume_retries_failed_urls(tmp_path):
+    db = str(tmp_path / "crawl.db")
+    frontier = PersistentFrontier(db, "s3")
+    frontier.push("ok")
+    frontier.push("broken")
+    frontier.mark_done(frontier.pop())
+    frontier.mark_done(frontier.pop(), failed=True)
+    frontier.close()
+
+    resumed = PersistentFrontier(db, "s3")
+    assert resumed.resume()["done_keys"] == ["ok"]
+    assert resumed.pop().url == "broken"
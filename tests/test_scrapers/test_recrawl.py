@@ -0,0 +1,92 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scrapers.psense.web.recrawl import RecrawlScheduler, estimate_change_rate
+
+NOW = datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+
+
+def visits(hashes, every_hours=24):
+    start = NOW - timedelta(hours=every_hours * len(hashes))
+    return [((start + timedelta(hours=every_hours * i)).isoformat(), h) for i, h in enumerate(hashes)]
+
+
+def test_change_rate_estimate():
+    assert estimate_change_rate(0, 0, 100) == 0.0
+    assert estimate_change_rate(10, 0, 10 * 86400) == 0.0
+    # Changed on every daily visit: more than once a day, not exactly once
+    assert estimate_change_rate(10, 10, 10 * 86400) > 1 / 86400
+    assert estimate_change_rate(10, 2, 10 * 86400) < estimate_change_rate(10, 5, 10 * 86400)
+
+
+def test_scheduler_uses_history_and_lastmod():
+    history = {
+        "http://a/new": [],
+        "http://a/static": visits(["h"] * 10),
+        "http://a/daily": visits([f"h{i}" for i in range(10)]),
+        "http://a/once": visits(["h"], every_hours=2),
+    }
+    scheduler = RecrawlScheduler(history.__getitem__, min_interval=3600, max_interval=30 * 86400,
+                                 default_interval=86400, clock=lambda: NOW)
+
+    assert scheduler.is_due("http://a/new")
+    assert not scheduler.is_due("http://a/static")
+    assert scheduler.is_due("http://a/daily")
+    assert not scheduler.is_due("http://a/once")
+    assert scheduler.history("http://a/static").interval == 30 * 86400
+
+    assert scheduler.is_due("http://a/static", lastmod=NOW.date().isoformat())
+    assert not scheduler.is_due("http://a/daily", lastmod="2024-01-01")
+
+    assert scheduler.is_unchanged("http://a/static", "h")
+    assert not scheduler.is_unchanged("http://a/daily", "h0")
+    assert not scheduler.is_unchanged("http://a/new", "h")
+    # Each URL is counted once, by its first check
+    assert scheduler.stats() == {"new_urls": 1, "due_urls": 1, "skipped_not_due": 2, "unchanged_pages": 1}
+
+
+def test_incremental_crawl_skips_pages_not_due(tree_site, scraper_config, tmp_path):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from scrapers.psense.web.scraper import WebScraper
+
+    db = str(tmp_path / "crawl.db")
+
+    def run(session_id, **overrides):
+        config = scraper_config(tree_site.base_url, incremental=True, database_path=db,
+                                session_id=session_id, **overrides)
+        with WebScraper(config) as scraper:
+            root = scraper.crawl()
+            return root, scraper.get_crawl_statistics()["recrawl"]
+
+    root, stats = run("first")
+    assert root is not None and stats["new_urls"] == 9
+
+    # Nothing is due a moment later: only the root is refetched, and it is unchanged
+    tree_site.hits.clear()
+    root, stats = run("second")
+    assert root is not None and root.child_documents == []
+    assert tree_site.hits == {"/": 1}
+    assert stats["unchanged_pages"] == 1 and stats["skipped_not_due"] == 9
+
+    # A due page below a page that is not due is still refetched (seeded from the crawl history)
+    with sqlite3.connect(db) as conn:
+        conn.execute("UPDATE crawled_urls SET crawl_time = '2000-01-01 00:00:00' WHERE url = ?",
+                     (tree_site.url("/c1/g0"),))
+    tree_site.hits.clear()
+    root, stats = run("second-b")
+    assert tree_site.hits == {"/": 1, "/c1/g0": 1}
+    assert stats["due_urls"] == 1 and stats["skipped_not_due"] == 8
+
+    # Everything due again: pages are fetched but recorded as unchanged visits, not re-parsed
+    tree_site.hits.clear()
+    tree_site.pages["/c1/g0"] = tree_site.pages["/c1/g0"].replace("<h1>", "<h1>Updated ")
+    root, stats = run("third", recrawl_min_interval=0, recrawl_max_interval=0, recrawl_default_interval=0)
+    assert len(tree_site.hits) == 10
+    assert stats["unchanged_pages"] == 9
+    with sqlite3.connect(db) as conn:
+        rows = dict(conn.execute("SELECT content_type, COUNT(*) FROM crawled_urls "
+                                 "WHERE session_id = 'third' GROUP BY content_type").fetchall())
+    assert rows.pop("unchanged") == 9 and sum(rows.values()) == 1
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from scrapers.psense.web.robots_cache import RobotsCache
+
+ROBOTS = "User-agent: *\nDisallow: /private\nCrawl-delay: 2\nSitemap: http://a.example/sitemap.xml\n"
+
+
+def test_fetches_once_per_host_and_memoizes_decisions():
+    calls = []
+    delays = {}
+
+    def fetch(url):
+        calls.append(url)
+        return 200, ROBOTS
+
+    cache = RobotsCache(fetch, on_crawl_delay=delays.__setitem__)
+    assert cache.allowed("http://a.example/page")
+    assert not cache.allowed("http://a.example/private/x")
+    assert not cache.allowed("http://a.example/private/x")
+    assert cache.allowed("http://b.example/private/x") is False
+    assert calls == ["http://a.example/robots.txt", "http://b.example/robots.txt"]
+    assert delays == {"a.example": 2.0, "b.example": 2.0}
+    assert cache.crawl_delay("a.example") == 2.0
+    assert cache.sitemaps("http://a.example/") == ["http://a.example/sitemap.xml"]
+    assert cache.stats()["decision_cache_hits"] == 1
+    assert cache.allowed_cached("http://c.example/") is None
+
+
+def test_status_handling_and_ttl():
+    responses = {"http://locked.example/robots.txt": (403, ""),
+                 "http://gone.example/robots.txt": (404, "")}
+
+    def fetch(url):
+        if url in responses:
+            return responses[url]
+        raise OSError("unreachable")
+
+    cache = RobotsCache(fetch, ttl=0.05, error_ttl=0.05)
+    assert not cache.allowed("http://locked.example/")
+    assert cache.allowed("http://gone.example/anything")
+    assert cache.allowed("http://down.example/anything")
+
+    responses["http://locked.example/robots.txt"] = (200, "")
+    time.sleep(0.06)
+    assert cache.allowed("http://locked.example/")
+
+
+def test_robots_respected_per_host_in_frontier_crawl(local_site, page_factory, scraper_config):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from scrapers.psense.web.scraper import WebScraper
+
+    robots = (200, {"Content-Type": "text/plain"}, "User-agent: *\nDisallow: /private\n")
+    other = local_site({"/robots.txt": robots, "/ok": page_factory(1), "/private": page_factory(2)})
+    links = ["/private", other.url("/ok"), other.url("/private")]
+    main = local_site({"/robots.txt": robots, "/": page_factory(0, links), "/private": page_factory(3)})
+
+    hosts = [u.split("//", 1)[1] for u in (main.base_url, other.base_url)]
+    config = scraper_config(main.base_url, crawl_mode="frontier", max_depth=1,
+                            respect_robots=True, allowed_domains=hosts)
+    with WebScraper(config) as scraper:
+        scraper.crawl()
+        assert scraper.robots.stats()["origins"] == 2
+
+    assert other.hits.get("/ok") == 1
+    assert "/private" not in main.hits and "/private" not in other.hits
+    assert main.hits["/robots.txt"] == 1 and other.hits["/robots.txt"] == 1
+
+
+def test_async_robots_fetch_sends_the_crawl_user_agent(local_site, page_factory, scraper_config):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from scrapers.psense.web.scraper import WebScraper
+
+    agents = []
+
+    def robots(handler):
+        agent = handler.headers.get("User-Agent")
+        agents.append(agent)
+        # Only the crawl's own agent may read robots.txt; anyone else gets 403 (= disallow all)
+        if agent != "PsenseBot/1.0":
+            return 403, {}, ""
+        return 200, {"Content-Type": "text/plain"}, "User-agent: *\nAllow: /\n"
+
+    allow = (200, {"Content-Type": "text/plain"}, "User-agent: *\nAllow: /\n")
+    # The start host's robots.txt is read synchronously up front; the other host's only by the async crawl
+    other = local_site({"/robots.txt": (200, {}, robots), "/a": page_factory(1)})
+    main = local_site({"/robots.txt": allow, "/": page_factory(0, [other.url("/a")])})
+    hosts = [u.split("//", 1)[1] for u in (main.base_url, other.base_url)]
+    config = scraper_config(main.base_url, crawl_mode="frontier", max_depth=1, respect_robots=True,
+                            allowed_domains=hosts, user_agents=["PsenseBot/1.0"])
+    with WebScraper(config) as scraper:
+        scraper.crawl()
+
+    assert other.hits.get("/a") == 1
+    assert agents == ["PsenseBot/1.0"]
@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("simhash")
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# run_scraper reconfigures stdout and the root logger on import; look at it from a child process
+SELECT = """
+import json, sys
+from scrapers.psense.web.run_scraper import ConfigManager, select_scraper_class
+manager = ConfigManager(sys.argv[1])
+results = {}
+for profile, options in json.loads(sys.argv[2]):
+    config = manager.build_config("https://example.com/", profile, options)
+    cls = select_scraper_class(config["scraper"])
+    results[f"{profile}:{json.dumps(options)}"] = cls.__module__.rsplit(".", 1)[-1]
+print("RESULT " + json.dumps(results))
+"""
+
+
+def _selected(tmp_path, cases):
+    proc = subprocess.run([sys.executable, "-c", SELECT, str(ROOT / "config.json"), json.dumps(cases)],
+                          cwd=tmp_path, env={"PYTHONPATH": str(ROOT), "PATH": ""}, capture_output=True,
+                          text=True, timeout=120)
+    line = [l for l in proc.stdout.splitlines() if l.startswith("RESULT ")]
+    assert line, proc.stdout + proc.stderr
+    return json.loads(line[-1][len("RESULT "):])
+
+
+def test_options_only_the_full_scraper_implements_select_it(tmp_path):
+    profiles = json.loads((ROOT / "config.json").read_text(encoding="utf-8"))["profiles"]
+    adaptive = [name for name, profile in profiles.items() if profile.get("adaptive_concurrency")]
+    assert adaptive
+    cases = [[name, {}] for name in adaptive] + [
+        ["quick", {}],
+        ["quick", {"adaptive_concurrency": True}],
+        ["quick", {"parser_backend": "lxml"}],
+        ["quick", {"metrics_port": 9108}],
+        ["quick", {"metrics_file": "metrics.ndjson"}],
+    ]
+    selected = _selected(tmp_path, cases)
+    assert selected.pop("quick:{}") == "standalone_scraper"
+    assert set(selected.values()) == {"scraper"}, selected
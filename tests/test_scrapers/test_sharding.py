@@ -0,0 +1,105 @@
+import json
+import multiprocessing
+
+import pytest
+
+from scrapers.psense.web.frontier import FrontierEntry, SharedFrontier
+from scrapers.psense.web.sharding import HostShardRing, part_path
+
+
+def test_ring_is_stable_and_spreads_hosts():
+    hosts = [f"host{i}.example" for i in range(2000)]
+    ring = HostShardRing(4)
+    owners = [ring.shard_for_host(h) for h in hosts]
+    assert owners == [HostShardRing(4).shard_for_host(h) for h in hosts]
+    assert ring.shard_for("http://HOST1.example/a?b") == ring.shard_for_host("host1.example")
+    assert all(owners.count(shard) > 300 for shard in range(4))
+
+    grown = HostShardRing(5)
+    moved = sum(1 for h, owner in zip(hosts, owners) if grown.shard_for_host(h) != owner)
+    assert moved < len(hosts) * 0.35
+    assert part_path("out/site.ndjson", 2) == "out/site.shard2.ndjson"
+
+
+def _by_host(url):
+    return 0 if "//a/" in url else 1
+
+
+def _push_duplicates_and_hold(db, pushed, release):
+    """Other crawl process: push keys that already exist, then keep its connection open"""
+    frontier = SharedFrontier(db, "s", _by_host, 1)
+    pushed.put(frontier.push_many([FrontierEntry("http://a/root"), FrontierEntry("http://b/1")]))
+    release.wait(30)
+    frontier.close()
+
+
+def test_ignored_pushes_do_not_hold_the_write_lock_across_processes(tmp_path):
+    db = str(tmp_path / "crawl.db")
+    frontier = SharedFrontier(db, "s", _by_host, 0)
+    frontier.push_many([FrontierEntry("http://a/root"), FrontierEntry("http://b/1")])
+
+    context = multiprocessing.get_context("spawn")
+    pushed, release = context.Queue(), context.Event()
+    other = context.Process(target=_push_duplicates_and_hold, args=(db, pushed, release))
+    other.start()
+    try:
+        assert pushed.get(timeout=30) == 0
+        # Would fail with "database is locked" if the other process kept its transaction open
+        frontier._conn.execute("PRAGMA busy_timeout=0")
+        entry = frontier.pop()
+        frontier.mark_done(entry)
+        assert entry.url == "http://a/root"
+    finally:
+        release.set()
+        other.join(30)
+    frontier.close()
+
+
+def test_shared_frontier_routes_by_shard_and_dedups(tmp_path):
+    db = str(tmp_path / "crawl.db")
+    first = SharedFrontier(db, "s", _by_host, 0, poll_interval=0.01)
+    second = SharedFrontier(db, "s", _by_host, 1, poll_interval=0.01)
+
+    assert first.push_many([FrontierEntry("http://a/1"), FrontierEntry("http://b/1")]) == 2
+    assert second.push_many([FrontierEntry("http://b/1"), FrontierEntry("http://b/2")]) == 1
+
+    entry = first.pop()
+    assert entry.url == "http://a/1" and first.pop() is None
+    assert sorted(second.pop().url for _ in range(2)) == ["http://b/1", "http://b/2"]
+    assert second.pop() is None
+
+    # Shard 1 is idle locally, but shard 0 still has work in flight
+    assert not second.is_exhausted()
+    first.mark_done(entry)
+    for frontier in (first, second):
+        frontier._last_active_check = 0.0
+    assert not first.is_exhausted()  # shard 1's entries are still in flight
+    for key in ("http://b/1", "http://b/2"):
+        second.mark_done(FrontierEntry(key))
+    first._last_active_check = 0.0
+    assert first.is_exhausted()
+
+    with first.producing("sitemaps"):
+        second._last_active_check = 0.0
+        assert not second.is_exhausted()
+    assert sorted(SharedFrontier.finished_keys(db, "s")) == ["http://a/1", "http://b/1", "http://b/2"]
+    first.close()
+    second.close()
+
+
+def test_sharded_crawl_fetches_each_page_once(tree_site, scraper_config, tmp_path):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from scrapers.psense.web.scraper import WebScraper
+
+    config = scraper_config(tree_site.base_url, crawl_processes=2, frontier_db_path=str(tmp_path / "crawl.db"),
+                            frontier_workers=4)
+    with WebScraper(config) as scraper:
+        root = scraper.crawl()
+
+    assert root is not None and len(scraper.visited) == 10
+    assert len(tree_site.hits) == 10 and set(tree_site.hits.values()) == {1}
+    with open(tmp_path / "out.json", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert sorted(r["url"] for r in records) == sorted(tree_site.url(p) for p in tree_site.hits)
+    assert not (tmp_path / "out.shard0.json").exists()
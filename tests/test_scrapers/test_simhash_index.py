@@ -0,0 +1,81 @@
+import random
+import threading
+
+import pytest
+
+from scrapers.psense.web.simhash_index import SimhashIndex, hamming_distance
+
+
+def _flip(value: int, bits) -> int:
+    for b in bits:
+        value ^= 1 << b
+    return value
+
+
+def test_index_matches_linear_scan():
+    rng = random.Random(7)
+    index = SimhashIndex(max_distance=2)
+    stored = []
+    for _ in range(2000):
+        h = rng.getrandbits(64)
+        index.add(h)
+        stored.append(h)
+
+    for _ in range(500):
+        base = rng.choice(stored)
+        probe = _flip(base, rng.sample(range(64), rng.randint(0, 4)))
+        expected = any(hamming_distance(probe, h) <= 2 for h in stored)
+        assert (index.find_near(probe) is not None) == expected
+
+
+def test_check_and_add_is_atomic_across_threads():
+    index = SimhashIndex(max_distance=2)
+    value = random.Random(1).getrandbits(64)
+    near = [_flip(value, [i]) for i in range(16)]
+    results = []
+    threads = [threading.Thread(target=lambda h=h: results.append(index.check_and_add(h))) for h in near]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Exactly one of a cluster of mutual near-duplicates is accepted
+    assert results.count(False) == 1
+    assert len(index) == 1
+
+
+def test_zero_threshold_never_flags_duplicates():
+    index = SimhashIndex(max_distance=-1)
+    assert not index.check_and_add(42)
+    assert not index.check_and_add(42)
+
+
+def test_persistence_round_trip(tmp_path):
+    db = str(tmp_path / "crawl.db")
+    hashes = [1, 2 ** 63, 2 ** 64 - 1]
+    SimhashIndex.save_to_db(db, "s1", hashes)
+    SimhashIndex.save_to_db(db, "s2", [5])
+
+    index = SimhashIndex(max_distance=0)
+    assert index.load_from_db(db) == 4
+    assert all(h in index for h in hashes + [5])
+
+    only_s2 = SimhashIndex(max_distance=0)
+    assert only_s2.load_from_db(db, "s2") == 1
+
+
+def test_scraper_dedups_across_sessions(tree_site, scraper_config, tmp_path):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from scrapers.psense.web.scraper import WebScraper
+
+    db = str(tmp_path / "crawl.db")
+    first = scraper_config(tree_site.base_url, max_depth=0, persist_simhashes=True,
+                           database_path=db, session_id="one")
+    with WebScraper(first) as scraper:
+        assert scraper.crawl() is not None
+
+    second = scraper_config(tree_site.base_url, max_depth=0, persist_simhashes=True,
+                            database_path=db, session_id="two")
+    with WebScraper(second) as scraper:
+        assert len(scraper.simhashes) == 1
+        assert scraper.crawl() is None  # the only page is a near-duplicate of session one
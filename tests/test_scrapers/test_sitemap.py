@@ -0,0 +1,108 @@
+import gzip
+import io
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pytest
+
+from scrapers.psense.web.sitemap import SitemapReader, iter_sitemap, parse_lastmod
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(locs, priority=None):
+    items = "".join(
+        f"<url><loc>{loc}</loc><lastmod>2024-05-01</lastmod>"
+        + (f"<priority>{priority(i)}</priority>" if priority else "") + "</url>"
+        for i, loc in enumerate(locs)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{items}</urlset>'
+
+
+def sitemap_index(locs):
+    items = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>{items}</sitemapindex>'
+
+
+def test_iter_sitemap_reads_gzip_and_fields():
+    xml = urlset(["http://a.example/1", "http://a.example/2"], priority=lambda i: 0.9 - i / 10)
+    entries = list(iter_sitemap(io.BytesIO(gzip.compress(xml.encode()))))
+    assert [kind for kind, _ in entries] == ["url", "url"]
+    first = entries[0][1]
+    assert first.loc == "http://a.example/1" and first.priority == 0.9
+    assert first.lastmod_datetime == datetime(2024, 5, 1, tzinfo=timezone.utc)
+    assert parse_lastmod("2024-05-01T10:00:00+02:00") == datetime(2024, 5, 1, 8, tzinfo=timezone.utc)
+    assert parse_lastmod("yesterday") is None
+
+
+def test_reader_follows_indexes_concurrently_and_stops_early():
+    files = {
+        "index": sitemap_index(["part1", "part2.gz", "part1"]),
+        "part1": urlset([f"http://a.example/p1/{i}" for i in range(300)]),
+        "part2.gz": gzip.compress(urlset([f"http://a.example/p2/{i}" for i in range(300)]).encode()),
+    }
+    opened = []
+
+    @contextmanager
+    def open_url(url):
+        opened.append(url)
+        data = files[url]
+        yield io.BytesIO(data if isinstance(data, bytes) else data.encode())
+
+    reader = SitemapReader(open_url, workers=2, queue_size=10)
+    locs = [entry.loc for entry in reader.iter_entries(["index"])]
+    assert len(locs) == len(set(locs)) == 600
+    assert sorted(opened) == ["index", "part1", "part2.gz"]
+
+    capped = SitemapReader(open_url, max_urls=25, queue_size=10)
+    assert len(list(capped.iter_entries(["index"]))) == 25
+
+
+def test_sitemap_first_frontier_crawl(local_site, page_factory, scraper_config):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from scrapers.psense.web.scraper import WebScraper
+
+    order = []
+
+    def tracked(i):
+        def body(handler):
+            order.append(handler.path)
+            return 200, {}, page_factory(i)
+        return 200, {}, body
+
+    pages = {f"/p{i}": tracked(i + 1) for i in range(80)}
+    pages["/"] = page_factory(0)
+    site = local_site(pages)
+    xml = gzip.compress(urlset([site.url(f"/p{i}") for i in range(80)], priority=lambda i: 1.0 if i == 79 else 0.5).encode())
+    site.pages["/sitemap.xml"] = (200, {"Content-Type": "application/xml"}, xml)
+
+    config = scraper_config(site.base_url, crawl_mode="frontier", max_depth=1, frontier_workers=1,
+                            seed_from_sitemaps=True)
+    with WebScraper(config) as scraper:
+        scraper.crawl()
+        assert scraper.sitemap_reader.stats()["urls_read"] == 80
+
+    assert len(order) == 80
+    assert order[0] == "/p79"
+
+
+def test_recursive_crawl_caps_sitemap_children(local_site, page_factory, scraper_config):
+    pytest.importorskip("bs4")
+    pytest.importorskip("simhash")
+    from scrapers.psense.web.scraper import WebScraper
+
+    pages = {f"/p{i}": page_factory(i + 1) for i in range(80)}
+    pages["/"] = page_factory(0)
+    site = local_site(pages)
+    site.pages["/sitemap.xml"] = (200, {"Content-Type": "application/xml"},
+                                  urlset([site.url(f"/p{i}") for i in range(80)]).encode())
+
+    config = scraper_config(site.base_url, max_depth=1, sitemaps=[site.url("/sitemap.xml")])
+    with WebScraper(config) as scraper:
+        root = scraper.crawl()
+    assert len(root.child_documents) == 50
+
+    with WebScraper(scraper_config(site.base_url, max_depth=1, sitemaps=[site.url("/sitemap.xml")],
+                                   sitemap_max_urls=10)) as scraper:
+        assert len(scraper.crawl().child_documents) == 10
@@ -0,0 +1,65 @@
+import pytest
+
+bs4 = pytest.importorskip("bs4")
+lxml_html = pytest.importorskip("lxml.html")
+
+from scrapers.psense.web.table_extractor import extract_table
+
+
+def _tables(html):
+    """The first <table> parsed by BeautifulSoup and by lxml"""
+    return bs4.BeautifulSoup(html, "lxml").find("table"), lxml_html.document_fromstring(html).find(".//table")
+
+
+@pytest.mark.parametrize("backend", [0, 1])
+def test_thead_spans_and_ragged_rows(backend):
+    html = """<table>
+      <thead>
+        <tr><th rowspan="2">Service</th><th colspan="2">Fee</th></tr>
+        <tr><th>2023</th><th>2024</th></tr>
+      </thead>
+      <tbody>
+        <tr><td rowspan="2">Filing</td><td>100</td><td>120</td></tr>
+        <tr><td>90</td></tr>
+        <tr><td colspan="3">All <b>fees</b> in AED</td></tr>
+        <tr><td>Audit</td><td><table><tr><td>nested</td></tr></table></td><td>1</td><td>extra</td></tr>
+      </tbody>
+      <tfoot><tr><td>Total</td></tr></tfoot>
+    </table>"""
+    headers, rows = extract_table(_tables(html)[backend])
+    assert headers == ["Service", "Fee 2023", "Fee 2024", ""]
+    assert rows == [
+        ["Filing", "100", "120", ""],
+        ["Filing", "90", "", ""],
+        ["Allfeesin AED", "Allfeesin AED", "Allfeesin AED", ""],
+        ["Audit", "nested", "1", "extra"],
+        ["Total", "", "", ""],
+    ]
+
+
+@pytest.mark.parametrize("backend", [0, 1])
+def test_header_detection_without_thead(backend):
+    th_first = "<table><tr><th>A</th><th>B</th></tr><tr><th>row</th><td>1</td></tr></table>"
+    assert extract_table(_tables(th_first)[backend]) == (["A", "B"], [["row", "1"]])
+
+    # A first row of <td>s is data, not a header
+    td_only = "<table><tr><td>a</td><td>b</td></tr><tr><td>c</td></tr></table>"
+    assert extract_table(_tables(td_only)[backend]) == ([], [["a", "b"], ["c", ""]])
+
+    spans = '<table><tr><td rowspan="0">x</td><td colspan="0">y</td></tr><tr><td>z</td></tr><tr></tr></table>'
+    assert extract_table(_tables(spans)[backend]) == ([], [["x", "y"], ["x", "z"], ["x", ""]])
+
+
+def test_scraper_tables_skip_pandas(scraper_config, monkeypatch):
+    pytest.importorskip("simhash")
+    from scrapers.psense.web import scraper as scraper_module
+    from scrapers.psense.web.scraper import WebScraper
+
+    def no_pandas(table):
+        raise AssertionError("pandas fallback used")
+
+    monkeypatch.setattr(scraper_module, "read_html_table", no_pandas)
+    with WebScraper(scraper_config("http://x.example")) as scraper:
+        soup = bs4.BeautifulSoup("<table><tr><th>k</th><th>v</th></tr><tr><td>a</td><td>1</td></tr></table>",
+                                 "lxml")
+        assert scraper._extract_table(soup.find("table")) == (["k", "v"], [["a", "1"]])
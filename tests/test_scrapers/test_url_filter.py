@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("simhash")
+
+from scrapers.psense.web.scraper import DatabaseManager, WebScraper
+from scrapers.psense.web.url_filter import UrlBloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_error():
+    bloom = UrlBloomFilter(10000, error_rate=0.01)
+    urls = [f"http://example.com/page/{i}" for i in range(10000)]
+    bloom.update(urls)
+    assert all(url in bloom for url in urls)
+    false_hits = sum(f"http://other.example/{i}" in bloom for i in range(10000))
+    assert false_hits < 300
+    # ~9.6 bits per URL at 1%: 10M URLs would need about 12 MB
+    assert bloom.size_bytes < 10000 * 10 / 8 * 1.1
+
+
+def test_max_bytes_caps_memory():
+    bloom = UrlBloomFilter(10_000_000, error_rate=0.001, max_bytes=1024)
+    assert bloom.size_bytes == 1024
+
+
+def test_database_only_consulted_on_filter_hit(tmp_path):
+    db = str(tmp_path / "crawl.db")
+    manager = DatabaseManager(db)
+    manager.log_crawled_url("old", "http://x/seen", "article", 200, "h1", 1)
+    manager.preload_url_filter()
+
+    queries = []
+    manager._read_conn().set_trace_callback(queries.append)
+    assert not manager.is_url_crawled("http://x/new")
+    assert queries == []
+    assert manager.is_url_crawled("http://x/seen")
+    assert queries
+    assert manager.is_url_crawled("http://x/other", content_hash="h1")
+    manager.close()
+
+
+def test_previous_session_urls_are_skipped(tree_site, scraper_config, tmp_path):
+    db = str(tmp_path / "crawl.db")
+    previous = DatabaseManager(db)
+    previous.log_crawled_url("old", tree_site.url("/c1"), "article", 200, "h", 1)
+    previous.close()
+
+    config = scraper_config(tree_site.base_url, enable_database=True, database_path=db)
+    with WebScraper(config) as scraper:
+        scraper.crawl()
+    assert "/c1" not in tree_site.hits
+    assert tree_site.hits["/c0"] == 1